@@ -3,6 +3,7 @@ from datetime import datetime
 import pytest
 
 from django.contrib.auth.models import Group
+from django.core.cache import cache
 from rest_framework.authtoken.models import Token
 from rest_framework.test import APIClient
 from django.utils import timezone
@@ -10,6 +11,8 @@ from rest_framework.test import APIRequestFactory
 
 from concerts.models import Concert, ConcertDonorClubMember, Ticket, ConcertDonorClubPackage
 from plants.models import Family, Genus, Species
+from plants.in_bloom import _cached_in_bloom
+from plants.species_autolinks import _cached_autolinkers, clear_species_autolinker_memo
 
 
 @pytest.fixture
@@ -181,4 +184,30 @@ def genus(family):
 def species(genus):
     species, _ = Species.objects.get_or_create(genus=genus, name='species', full_name='Genus species',
                                                vernacular_name='vernacular_name')
-    return species
\ No newline at end of file
+    return species
+
+@pytest.fixture
+def locmem_cache(settings):
+    # Testing settings use DummyCache; give plant caching tests a real backend
+    settings.CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'plants-tests',
+        }
+    }
+    cache.clear()
+    yield cache
+    cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def clear_species_autolinkers():
+    # Linkers are cached per process; don't let one test's species leak into the next
+    _cached_autolinkers.clear()
+    clear_species_autolinker_memo()
+
+
+@pytest.fixture(autouse=True)
+def clear_in_bloom_index():
+    # Kept per process too; don't let one test's bloom events leak into the next
+    _cached_in_bloom.clear()
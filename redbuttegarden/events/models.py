@@ -131,6 +131,9 @@ class SingleListImage(blocks.StructBlock):
         help_text=_("If provided, the link will be applied to the image"),
     )
 
+    # Child blocks autolinked by clean(), for the autolink_species_rich_text command
+    species_autolink_child_blocks = ("text",)
+
     def clean(self, value):
         cleaned_value = super().clean(value)
         autolinker = SpeciesAutoLinker.for_rich_text_storage()
@@ -11,6 +11,23 @@ class MediaStorage(S3Boto3Storage):
     location = 'media'
     file_overwrite = False
 
+    def get_object_parameters(self, name):
+        params = super().get_object_parameters(name) or {}
+
+        key = name.lower()
+
+        # Published plant map geojson: hashed snapshots never change, the manifest always does
+        snapshot_prefix = getattr(settings, 'PLANT_MAP_SNAPSHOT_PREFIX', 'plants/geojson').strip('/')
+        if f'{self.location}/{snapshot_prefix}/' in f'/{key}':
+            if key.endswith('latest.json'):
+                params.update({
+                    'CacheControl': 'no-cache, must-revalidate, max-age=0',
+                })
+            else:
+                params.setdefault('CacheControl', 'max-age=31536000, public, immutable')
+
+        return params
+
 
 class StaticStorage(ManifestFilesMixin, S3Boto3Storage):
     """
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from sitemaps.publish import publish_sitemaps
+
+
+class Command(BaseCommand):
+    help = (
+        'Renders the sitemap index and sections to gzipped XML files in the default storage, '
+        'which the sitemap views then serve. Only sections whose content changed since they '
+        'were last published are rendered again.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Render every section, even those that have not changed.',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            manifest, rendered = publish_sitemaps(force=options['force'])
+        except Exception as e:
+            raise CommandError(f'Broken: {e}')
+
+        pages = sum(len(manifest['sections'][section]['pages']) for section in rendered)
+        self.stdout.write(self.style.SUCCESS(
+            f'Rendered {len(rendered)} of {len(manifest["sections"])} sitemap sections '
+            f'({pages} files): {", ".join(rendered) or "none changed"}'
+        ))
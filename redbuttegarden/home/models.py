@@ -60,6 +60,9 @@ logger = logging.getLogger(__name__)
 
 
 class SpeciesAutolinkRichTextBlock(blocks.RichTextBlock):
+    # Found by the autolink_species_rich_text command
+    species_autolink = True
+
     def clean(self, value):
         cleaned_value = super().clean(value)
         if hasattr(cleaned_value, "source"):
@@ -207,6 +210,9 @@ class AlignedParagraphBlock(blocks.StructBlock):
         "embed",
     ], help_text='Headings must be used sequentially. In other words, if you want to use an h3 it must appear after an h2 and be part of the same context/section. Do not use heading tags (e.g. h2, h3) to emphasize text. Lead (Ld) can be used to make slightly larger text for emphasis.')
 
+    # Child blocks autolinked by clean(), for the autolink_species_rich_text command
+    species_autolink_child_blocks = ("paragraph",)
+
     def clean(self, value):
         cleaned_value = super().clean(value)
         if hasattr(cleaned_value["paragraph"], "source"):
@@ -275,6 +281,9 @@ class SingleListImageDropdownInfo(blocks.StructBlock):
     )
     text = blocks.RichTextBlock(label="Text")
 
+    # Child blocks autolinked by clean(), for the autolink_species_rich_text command
+    species_autolink_child_blocks = ("text",)
+
     def clean(self, value):
         cleaned_value = super().clean(value)
         autolinker = SpeciesAutoLinker.for_rich_text_storage()
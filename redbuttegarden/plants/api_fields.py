@@ -0,0 +1,143 @@
+"""
+Query planning and sparse fieldsets for the plant REST API.
+
+Nested serializers (Collection -> Species -> Genus -> Family, ...) read a
+related object for every row unless the queryset joins or prefetches it.
+get_related_paths() walks a serializer's fields and returns the
+select_related and prefetch_related paths they need, so views don't have to
+keep a hand-written list in step with the serializers.
+
+Clients can ask for a subset of fields with ?fields=, using dots for nested
+fields, e.g. ?fields=id,full_name,genus.name. Only the requested fields are
+serialized and only the relations they use are joined.
+"""
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+
+FIELDS_QUERY_PARAM = "fields"
+
+
+def parse_fields(value):
+    """
+    Parse "id,genus.name,genus.family" into {"id": None, "genus": {"name":
+    None, "family": None}}, where None means the whole field.
+    """
+    tree = {}
+    for path in filter(None, (path.strip() for path in value.split(","))):
+        node = tree
+        *parents, leaf = path.split(".")
+        for part in parents:
+            if part in node and node[part] is None:
+                break  # the whole field is already requested
+            node = node.setdefault(part, {})
+        else:
+            node[leaf] = None
+    return tree
+
+
+def _nested(field):
+    """The serializer a field renders with, or None for plain fields."""
+    if isinstance(field, serializers.ListSerializer):
+        field = field.child
+    return field if isinstance(field, serializers.BaseSerializer) else None
+
+
+def prune_fields(serializer, tree, prefix=""):
+    """
+    Drop the fields of serializer that are not in the parse_fields tree.
+    Raises ValidationError for names the serializer does not have.
+    """
+    unknown = [f"{prefix}{name}" for name in tree if name not in serializer.fields]
+    if unknown:
+        raise ValidationError({FIELDS_QUERY_PARAM: [f"Unknown field: {name}" for name in unknown]})
+
+    for name in list(serializer.fields):
+        if name not in tree:
+            serializer.fields.pop(name)
+        elif tree[name] is not None:
+            nested = _nested(serializer.fields[name])
+            if nested is None:
+                raise ValidationError({FIELDS_QUERY_PARAM: [f"{prefix}{name} has no nested fields."]})
+            prune_fields(nested, tree[name], prefix=f"{prefix}{name}.")
+
+
+def _follow(model, parts, prefix, prefetching, select, prefetch):
+    """
+    Record the relations along a field source. Returns (model, prefix,
+    prefetching) for the object the source ends on, or None if it leaves
+    the model's relations.
+    """
+    for part in parts:
+        try:
+            field = model._meta.get_field(part)
+        except FieldDoesNotExist:
+            return None
+        if not field.is_relation:
+            return None
+        path = f"{prefix}__{part}" if prefix else part
+        if (field.many_to_one or field.one_to_one) and not prefetching:
+            select.add(path)
+        else:
+            # Anything below a to-many relation is fetched with the prefetch
+            prefetching = True
+            prefetch.add(path)
+        model, prefix = field.related_model, path
+    return model, prefix, prefetching
+
+
+def get_related_paths(serializer, model=None, prefix="", prefetching=False, select=None, prefetch=None):
+    """
+    Return (select_related paths, prefetch_related paths) needed to render
+    serializer's current fields for instances of model.
+    """
+    select = set() if select is None else select
+    prefetch = set() if prefetch is None else prefetch
+    model = model or serializer.Meta.model
+
+    for field in serializer.fields.values():
+        if field.write_only or field.source == "*" or isinstance(field, serializers.SerializerMethodField):
+            continue
+        parts = field.source.split(".")
+        if isinstance(field, serializers.PrimaryKeyRelatedField):
+            parts = parts[:-1]  # the id is read from the foreign key column
+        end = _follow(model, parts, prefix, prefetching, select, prefetch)
+        nested = _nested(field)
+        if nested is not None and end is not None:
+            get_related_paths(nested, *end, select=select, prefetch=prefetch)
+
+    return select, prefetch
+
+
+class SerializerQueryMixin:
+    """
+    For generic API views: join or prefetch whatever the serializer needs,
+    and honour ?fields= on reads.
+    """
+
+    def get_requested_fields(self):
+        request = getattr(self, "request", None)
+        if request is None or request.method not in ("GET", "HEAD"):
+            return None
+        value = request.query_params.get(FIELDS_QUERY_PARAM)
+        return parse_fields(value) if value else None
+
+    def apply_requested_fields(self, serializer):
+        tree = self.get_requested_fields()
+        if tree:
+            prune_fields(_nested(serializer), tree)
+        return serializer
+
+    def get_serializer(self, *args, **kwargs):
+        return self.apply_requested_fields(super().get_serializer(*args, **kwargs))
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        # An unbound serializer is enough to see which fields will be rendered
+        serializer = self.apply_requested_fields(self.get_serializer_class()())
+        select, prefetch = get_related_paths(serializer)
+        if select:
+            queryset = queryset.select_related(*sorted(select))
+        if prefetch:
+            queryset = queryset.prefetch_related(*sorted(prefetch))
+        return queryset
@@ -0,0 +1,46 @@
+"""
+Worker process entry points for the autolink_species_rich_text command.
+
+Workers are spawned rather than forked so they never share the parent's
+database connections, and a spawned worker imports this module before Django
+is set up, so nothing here may import models at module level. Workers don't
+query the database: the autolinker is built from matches the parent read once.
+"""
+import django
+from django.apps import apps
+
+# Set in each process that autolinks rows, by init_worker
+_autolinker = None
+
+
+def init_worker(matches):
+    global _autolinker
+    if not apps.ready:
+        django.setup()
+
+    from .species_autolinks import SpeciesAutoLinker
+
+    _autolinker = SpeciesAutoLinker(matches, link_renderer=SpeciesAutoLinker._render_rich_text_link)
+
+
+def autolink_rows(model_label, field_names, rows):
+    """
+    Re-autolink a chunk of (pk, raw stream data...) rows. Returns the changed
+    rows as (pk, {field name: raw stream data}, changed rich text count).
+    """
+    from .species_autolinks import autolink_raw_block_value
+
+    model = apps.get_model(model_label)
+    changed_rows = []
+    for pk, *raw_values in rows:
+        updates = {}
+        changed = 0
+        for name, raw_value in zip(field_names, raw_values):
+            stream_block = model._meta.get_field(name).stream_block
+            value, field_changed = autolink_raw_block_value(stream_block, raw_value, _autolinker)
+            if field_changed:
+                updates[name] = value
+                changed += field_changed
+        if updates:
+            changed_rows.append((pk, updates, changed))
+    return changed_rows
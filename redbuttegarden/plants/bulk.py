@@ -0,0 +1,321 @@
+"""
+Set-based upserts for batches of BRAHMS collection records.
+
+upsert_collections() applies the same get_or_create/update_or_create rules as
+CollectionSerializer.create, but resolves every Family, Genus, Species,
+Location and GardenArea for a chunk of records with a handful of queries and
+bulk writes instead of six round trips per record.
+"""
+import logging
+from decimal import Decimal, InvalidOperation
+
+from django.db import DatabaseError, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .caching import invalidate_facet_choices, invalidate_geojson_cache
+from .models import Collection, Family, GardenArea, Genus, Location, Species
+from .search import update_search_vectors
+from .species_autolinks import invalidate_species_autolinkers
+
+logger = logging.getLogger(__name__)
+
+BULK_CHUNK_SIZE = 1000
+
+SPECIES_KEY_FIELDS = ("name", "subspecies", "variety", "subvariety", "forma", "subforma", "cultivar")
+# The fields CollectionSerializer.create passes as update_or_create defaults
+SPECIES_DEFAULT_FIELDS = (
+    "full_name",
+    "vernacular_name",
+    "habit",
+    "hardiness",
+    "water_regime",
+    "exposure",
+    "bloom_time",
+    "plant_size",
+    "flower_color",
+    "utah_native",
+    "plant_select",
+    "deer_resist",
+    "bee_friend",
+    "high_elevation",
+    "arborist_rec",
+)
+COLLECTION_UPDATE_FIELDS = (
+    "location",
+    "garden",
+    "species",
+    "plant_date",
+    "commemoration_category",
+    "commemoration_person",
+    "last_modified",
+)
+LOCATION_QUANTUM = Decimal("0.000001")
+
+
+class RecordError(Exception):
+    pass
+
+
+def _species_key(genus_id, species_data):
+    return (genus_id,) + tuple(species_data.get(field) for field in SPECIES_KEY_FIELDS)
+
+
+def _location_key(location_data):
+    """
+    Normalize a location to the Decimal values the database stores, or None if
+    the record has no location.
+    """
+    if not (location_data.get("longitude") and location_data.get("latitude")):
+        return None
+    try:
+        key = tuple(
+            Decimal(str(location_data[field])).quantize(LOCATION_QUANTUM)
+            for field in ("latitude", "longitude")
+        )
+    except InvalidOperation:
+        raise RecordError({"location": ["Invalid latitude or longitude."]})
+    if any(abs(value) >= 1000 for value in key):
+        raise RecordError({"location": ["Invalid latitude or longitude."]})
+    return key
+
+
+def _create_missing(model, wanted, existing, fetch):
+    """
+    Insert the instances in wanted whose key is not in existing, then re-read
+    them so rows inserted concurrently are picked up too.
+    """
+    missing = {key: obj for key, obj in wanted.items() if key not in existing}
+    if missing:
+        model.objects.bulk_create(missing.values(), ignore_conflicts=True)
+        existing.update(fetch(missing))
+    return existing
+
+
+def _resolve_families(records):
+    def fetch(keys):
+        return {f.name: f for f in Family.objects.filter(name__in=list(keys))}
+
+    wanted = {}
+    for record in records.active():
+        family_data = record.data["species"]["genus"].get("family")
+        if not family_data:
+            record.fail({"species": {"genus": {"family": ["This field is required."]}}})
+            continue
+        wanted.setdefault(family_data["name"], Family(**family_data))
+
+    families = _create_missing(Family, wanted, fetch(wanted), fetch)
+    for record in records.active():
+        family_data = record.data["species"]["genus"]["family"]
+        family = families.get(family_data["name"])
+        # get_or_create matches on every supplied field
+        if family is None or any(getattr(family, k) != v for k, v in family_data.items()):
+            record.fail({"species": {"genus": {"family": ["Family with this name already exists."]}}})
+        else:
+            record.family = family
+
+
+def _resolve_genera(records):
+    def fetch(keys):
+        family_ids = {family_id for family_id, _ in keys}
+        return {
+            (g.family_id, g.name): g for g in Genus.objects.filter(family_id__in=family_ids)
+        }
+
+    wanted = {}
+    for record in records.active():
+        key = (record.family.pk, record.data["species"]["genus"]["name"])
+        wanted.setdefault(key, Genus(family=record.family, name=key[1]))
+
+    genera = _create_missing(Genus, wanted, fetch(wanted), fetch)
+    for record in records.active():
+        record.genus = genera[(record.family.pk, record.data["species"]["genus"]["name"])]
+
+
+def _resolve_species(records):
+    def fetch(keys):
+        genus_ids = {key[0] for key in keys}
+        return {
+            _species_key(s.genus_id, {f: getattr(s, f) for f in SPECIES_KEY_FIELDS}): s
+            for s in Species.objects.filter(genus_id__in=genus_ids)
+        }
+
+    wanted = {}
+    for record in records.active():
+        species_data = record.data["species"]
+        key = _species_key(record.genus.pk, species_data)
+        if key not in wanted:
+            wanted[key] = Species(
+                genus=record.genus,
+                **{f: species_data.get(f) for f in SPECIES_KEY_FIELDS},
+                **{f: species_data[f] for f in SPECIES_DEFAULT_FIELDS if f in species_data},
+            )
+
+    existing = fetch(wanted)
+    created_keys = set(wanted) - set(existing)
+    species = _create_missing(Species, wanted, existing, fetch)
+
+    # Apply defaults in record order so the last record for a species wins,
+    # as it would with sequential update_or_create calls
+    changed = {}
+    for record in records.active():
+        species_data = record.data["species"]
+        obj = species[_species_key(record.genus.pk, species_data)]
+        for field in SPECIES_DEFAULT_FIELDS:
+            if field in species_data and getattr(obj, field) != species_data[field]:
+                setattr(obj, field, species_data[field])
+                changed[obj.pk] = obj
+        record.species = obj
+
+    if changed:
+        Species.objects.bulk_update(changed.values(), SPECIES_DEFAULT_FIELDS)
+
+    # bulk writes bypass Species.save(), which maintains the search vector
+    touched = set(changed) | {species[key].pk for key in created_keys}
+    if touched:
+        update_search_vectors(Species.objects.filter(pk__in=touched))
+
+
+def _resolve_locations(records):
+    def fetch(keys):
+        latitudes = {latitude for latitude, _ in keys}
+        return {
+            (l.latitude, l.longitude): l for l in Location.objects.filter(latitude__in=latitudes)
+        }
+
+    wanted = {}
+    for record in records.active():
+        try:
+            key = _location_key(record.data["location"])
+        except RecordError as e:
+            record.fail(e.args[0])
+            continue
+        record.location_key = key
+        if key is not None and key not in wanted:
+            location = Location(latitude=key[0], longitude=key[1])
+            # bulk_create bypasses Location.save()
+            location.spatial_key = location.compute_spatial_key()
+            wanted[key] = location
+
+    locations = _create_missing(Location, wanted, fetch(wanted), fetch)
+    for record in records.active():
+        record.location = locations[record.location_key] if record.location_key else None
+
+
+def _resolve_gardens(records):
+    def garden_key(garden_data):
+        return tuple(garden_data.get(field) for field in ("area", "name", "code"))
+
+    def fetch(keys):
+        codes = {code for _, _, code in keys if code is not None}
+        gardens = GardenArea.objects.filter(Q(code__in=codes) | Q(code__isnull=True))
+        return {(g.area, g.name, g.code): g for g in gardens}
+
+    wanted = {}
+    for record in records.active():
+        garden_data = record.data["garden"]
+        wanted.setdefault(garden_key(garden_data), GardenArea(**garden_data))
+
+    gardens = _create_missing(GardenArea, wanted, fetch(wanted), fetch)
+    for record in records.active():
+        garden = gardens.get(garden_key(record.data["garden"]))
+        if garden is None:
+            # Inserting it conflicted with a garden area using the same code
+            record.fail({"garden": {"code": ["Garden area with this code already exists."]}})
+        else:
+            record.garden = garden
+
+
+def _upsert(records):
+    by_plant_id = {}
+    for record in records.active():
+        # Later records for a plant_id overwrite earlier ones, as sequential posts would
+        by_plant_id[record.data["plant_id"]] = record
+
+    existing = dict(
+        Collection.objects.filter(plant_id__in=list(by_plant_id)).values_list("plant_id", "species_id")
+    )
+    collections = [
+        Collection(
+            plant_id=plant_id,
+            location=record.location,
+            garden=record.garden,
+            species=record.species,
+            plant_date=record.data.get("plant_date"),
+            commemoration_category=record.data.get("commemoration_category"),
+            commemoration_person=record.data.get("commemoration_person"),
+        )
+        for plant_id, record in by_plant_id.items()
+    ]
+    Collection.objects.bulk_create(
+        collections,
+        update_conflicts=True,
+        unique_fields=["plant_id"],
+        update_fields=COLLECTION_UPDATE_FIELDS,
+    )
+
+    # bulk writes skip the signals that touch the species shown on detail pages
+    touched_species = set(existing.values()) | {collection.species_id for collection in collections}
+    Species.objects.filter(pk__in=touched_species).update(last_modified=timezone.now())
+
+    ids = {collection.plant_id: collection.pk for collection in collections}
+    for record in records.active():
+        plant_id = record.data["plant_id"]
+        record.succeed(ids[plant_id], created=plant_id not in existing)
+
+
+class _Record:
+    def __init__(self, index, plant_id, data, errors):
+        self.data = data
+        self.result = {"index": index, "plant_id": plant_id}
+        if errors:
+            self.fail(errors)
+
+    @property
+    def active(self):
+        return "status" not in self.result
+
+    def fail(self, errors):
+        self.result.update({"status": "error", "errors": errors})
+
+    def succeed(self, pk, created):
+        self.result.update({"status": "created" if created else "updated", "id": pk})
+
+
+class _Records(list):
+    def active(self):
+        return [record for record in self if record.active]
+
+
+def upsert_collections(items, chunk_size=BULK_CHUNK_SIZE):
+    """
+    Upsert (index, plant_id, validated_data, errors) items, where items that
+    failed validation have errors and no validated_data. Each chunk is
+    committed in its own transaction. Returns one result dict per item, in
+    order, with a status of "created", "updated" or "error".
+    """
+    results = []
+    for start in range(0, len(items), chunk_size):
+        records = _Records(_Record(*item) for item in items[start:start + chunk_size])
+        try:
+            with transaction.atomic():
+                if records.active():
+                    _resolve_families(records)
+                    _resolve_genera(records)
+                    _resolve_species(records)
+                    _resolve_locations(records)
+                    _resolve_gardens(records)
+                    _upsert(records)
+        except DatabaseError as e:
+            logger.exception("Bulk collection upsert failed for chunk starting at %s", start)
+            for record in records:
+                if record.result.get("status") != "error":
+                    record.result.pop("id", None)
+                    record.fail({"non_field_errors": [f"Database error: {e}"]})
+        results.extend(record.result for record in records)
+
+    # Bulk writes skip the model signals that keep the plant caches fresh
+    invalidate_geojson_cache()
+    invalidate_facet_choices()
+    invalidate_species_autolinkers()
+    return results
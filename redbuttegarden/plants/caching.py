@@ -0,0 +1,118 @@
+import hashlib
+import time
+from decimal import Decimal, ROUND_CEILING, ROUND_FLOOR
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import caches
+
+from .utils import clean_querydict
+
+GEOJSON_CACHE_SECONDS = 60 * 60  # 1 hour
+GEOJSON_VERSION_KEY = "plants:geojson:version"
+
+# Saves invalidate these sooner; the short expiry bounds how long a change
+# made without signals (e.g. a queryset update or bulk import) stays hidden
+FACET_CHOICES_CACHE_SECONDS = 60 * 15  # 15 minutes
+FACET_CHOICES_VERSION_KEY = "plants:facet-choices:version"
+
+# Filtered list totals; keyed on the GeoJSON version, so plant changes reset them
+FILTER_COUNT_CACHE_SECONDS = 60 * 60  # 1 hour
+
+# Detail page fragments are keyed on what they show, so they never go stale
+DETAIL_FRAGMENT_CACHE_SECONDS = 60 * 60 * 24  # 1 day
+
+# Keyed on the image file hash, so a new file gets a new entry. Keep it below
+# the expiry of signed storage URLs if those are turned on
+IMAGE_URL_CACHE_SECONDS = 60 * 60 * 24  # 1 day
+
+# bbox edges are snapped outward to this grid (~100m) so small pans reuse entries
+BBOX_QUANTUM = Decimal("0.001")
+
+
+def get_plants_cache_alias():
+    return getattr(settings, "PLANTS_CACHE_ALIAS", "default")
+
+
+def get_plants_cache():
+    """
+    Cache used for plant map data. Point settings.PLANTS_CACHE_ALIAS at a shared
+    backend so entries and invalidations are seen by every process.
+    """
+    return caches[get_plants_cache_alias()]
+
+
+def _new_cache_version():
+    # Never a value used before, even if the version key was culled; a
+    # counter restarting at 1 would serve entries cached under old versions
+    return time.time_ns()
+
+
+def get_cache_version(version_key):
+    cache = get_plants_cache()
+    version = cache.get(version_key)
+    if version is None:
+        version = _new_cache_version()
+        if not cache.add(version_key, version, timeout=None):
+            # Another process set it first
+            version = cache.get(version_key, version)
+    return version
+
+
+def bump_cache_version(version_key):
+    get_plants_cache().set(version_key, _new_cache_version(), timeout=None)
+
+
+def quantize_bbox(west, south, east, north):
+    """
+    Snap a bbox outward to BBOX_QUANTUM so it always covers the requested area.
+    """
+    return (
+        west.quantize(BBOX_QUANTUM, rounding=ROUND_FLOOR),
+        south.quantize(BBOX_QUANTUM, rounding=ROUND_FLOOR),
+        east.quantize(BBOX_QUANTUM, rounding=ROUND_CEILING),
+        north.quantize(BBOX_QUANTUM, rounding=ROUND_CEILING),
+    )
+
+
+def get_filter_cache_key(prefix, querydict, bbox=None):
+    """
+    Build a cache key from the canonical filter querystring and the quantized
+    bbox, scoped to the current GeoJSON cache version so that any plant data
+    change invalidates it.
+    """
+    cleaned = clean_querydict(querydict)
+    params = sorted(
+        (key, value)
+        for key in cleaned.keys()
+        if key != "bbox"
+        for value in cleaned.getlist(key)
+    )
+    canonical = urlencode(params)
+    if bbox:
+        canonical += "|" + ",".join(str(edge) for edge in bbox)
+
+    digest = hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+    version = get_cache_version(GEOJSON_VERSION_KEY)
+    return f"{prefix}:{version}:{digest}"
+
+
+def get_geojson_cache_key(querydict, bbox=None):
+    return get_filter_cache_key("plants:geojson", querydict, bbox)
+
+
+def invalidate_geojson_cache():
+    bump_cache_version(GEOJSON_VERSION_KEY)
+
+
+def get_facet_choices_cache_key():
+    version = get_cache_version(FACET_CHOICES_VERSION_KEY)
+    return f"plants:facet-choices:{version}"
+
+
+def invalidate_facet_choices():
+    bump_cache_version(FACET_CHOICES_VERSION_KEY)
+
+
+def get_image_url_cache_key(image):
+    return f"plants:image-url:{image.pk}:{image.file_hash}"
@@ -18,7 +18,8 @@ from wagtail.snippets.views.chooser import (
     SnippetChosenView,
 )
 
-from .models import Collection, Species
+from .models import Collection, GardenArea, Genus, Species
+from .search import species_name_q
 from .species_autolinks import SpeciesAutoLinker
 
 
@@ -33,13 +34,15 @@ class SpeciesLinkChooserFilterForm(BaseFilterForm):
         objects = super().filter(objects)
         search_query = self.cleaned_data.get("q")
         if search_query:
+            # Forward foreign keys cannot duplicate rows, so no .distinct() is needed
+            matching_genera = Genus.objects.filter(
+                Q(name__icontains=search_query) | Q(family__name__icontains=search_query)
+            )
             objects = objects.filter(
-                Q(full_name__icontains=search_query)
-                | Q(vernacular_name__icontains=search_query)
-                | Q(genus__name__icontains=search_query)
-                | Q(genus__family__name__icontains=search_query)
+                species_name_q(search_query)
                 | Q(autolink_aliases__icontains=search_query)
-            ).distinct()
+                | Q(genus__in=matching_genera)
+            )
             self.is_searching = True
             self.search_query = search_query
         return objects
@@ -56,14 +59,19 @@ class CollectionLinkChooserFilterForm(BaseFilterForm):
         objects = super().filter(objects)
         search_query = self.cleaned_data.get("q")
         if search_query:
+            # Match species and gardens in subqueries so each side can use its own
+            # indexes and the collection rows are never duplicated
+            matching_species = Species.objects.filter(species_name_q(search_query))
+            matching_gardens = GardenArea.objects.filter(
+                Q(area__icontains=search_query)
+                | Q(name__icontains=search_query)
+                | Q(code__icontains=search_query)
+            )
             objects = objects.filter(
                 Q(plant_id__icontains=search_query)
-                | Q(species__full_name__icontains=search_query)
-                | Q(species__vernacular_name__icontains=search_query)
-                | Q(garden__area__icontains=search_query)
-                | Q(garden__name__icontains=search_query)
-                | Q(garden__code__icontains=search_query)
-            ).distinct()
+                | Q(species__in=matching_species)
+                | Q(garden__in=matching_gardens)
+            )
             self.is_searching = True
             self.search_query = search_query
         return objects
@@ -224,7 +232,7 @@ class SpeciesAutolinkTermsView(View):
         return JsonResponse(
             {
                 "terms": sorted(
-                    SpeciesAutoLinker.get_unique_matches_from_database().keys(),
+                    SpeciesAutoLinker.for_rich_text_storage().matches.keys(),
                     key=len,
                     reverse=True,
                 )
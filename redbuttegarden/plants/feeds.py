@@ -1,21 +1,123 @@
+import hashlib
 import logging
+from datetime import datetime, time, timedelta
 
+from django.conf import settings
 from django.contrib.syndication.views import Feed
+from django.db.models import Count, Max, Prefetch
+from django.db.models.functions import Coalesce, TruncDate
+from django.http import HttpResponse
 from django.urls import reverse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
 from django_ical.views import ICalFeed
 
-from .models import BloomEvent
+from .caching import get_plants_cache
+from .models import BloomEvent, Collection
 
 logger = logging.getLogger(__name__)
 
+BLOOM_FEED_CACHE_SECONDS = 60 * 60  # 1 hour, bounds staleness from related plant changes
+BLOOM_FEED_MAX_DAYS = 10 * 365
 
-class GardenBloomFeed(Feed):
+
+def get_bloom_feed_days(request):
+    """
+    The ?days= window of a bloom feed request, or settings.PLANTS_BLOOM_FEED_DAYS
+    (all events by default) if it is missing or invalid.
+    """
+    try:
+        days = int(request.GET["days"])
+    except (KeyError, ValueError):
+        return getattr(settings, "PLANTS_BLOOM_FEED_DAYS", None)
+    return min(days, BLOOM_FEED_MAX_DAYS) if days > 0 else None
+
+
+def get_bloom_events(days=None):
+    """
+    Bloom events for the feeds, newest first, with everything the feed items
+    read fetched up front. With days, only events that bloomed (or, without
+    dates, were created) in the last that many days or are still to come.
+    """
+    events = BloomEvent.objects.select_related("species", "area").prefetch_related(
+        Prefetch("collections", queryset=Collection.objects.select_related("location").order_by("pk"))
+    )
+    if days:
+        cutoff = timezone.localdate() - timedelta(days=days)
+        events = events.annotate(
+            bloom_date=Coalesce("bloom_end", "bloom_start", TruncDate("created_on"))
+        ).filter(bloom_date__gte=cutoff)
+    return events.order_by('-bloom_start', '-created_on')
+
+
+def _first_collection(item, with_location=False):
+    for collection in item.collections.all():
+        if collection.location or not with_location:
+            return collection
+    return None
+
+
+class CachedBloomFeedMixin:
+    """
+    Serve a bloom feed from the plants cache, with an ETag and Last-Modified
+    taken from the newest change to a BloomEvent or its collections, so
+    polling calendar clients get a 304 or a cached body instead of a rebuilt
+    feed.
+    """
+
+    def get_object(self, request, *args, **kwargs):
+        return get_bloom_feed_days(request)
+
+    def __call__(self, request, *args, **kwargs):
+        days = get_bloom_feed_days(request)
+        # The count catches deletions, which leave max(last_modified) alone.
+        # Items show their collections' species and locations, so their
+        # changes count too
+        stats = BloomEvent.objects.aggregate(
+            last_modified=Max("last_modified"),
+            collections_modified=Max("collections__last_modified"),
+            count=Count("id", distinct=True),
+        )
+        last_modified = max(
+            filter(None, (stats["last_modified"], stats["collections_modified"])), default=None
+        )
+        key_parts = (type(self).__name__, days, last_modified, stats["count"])
+        if days:
+            # A rolling window changes at midnight even if no event does
+            today_local = timezone.localdate()
+            key_parts += (today_local,)
+            midnight = timezone.make_aware(datetime.combine(today_local, time.min))
+            last_modified = max(last_modified, midnight) if last_modified else midnight
+        digest = hashlib.sha1(repr(key_parts).encode("utf-8")).hexdigest()
+        etag = quote_etag(digest)
+        last_modified = int(last_modified.timestamp()) if last_modified else None
+
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            cache = get_plants_cache()
+            cache_key = f"plants:bloom-feed:{digest}"
+            cached = cache.get(cache_key)
+            if cached is None:
+                response = super().__call__(request, *args, **kwargs)
+                cache.set(cache_key, (response.content, dict(response.items())), BLOOM_FEED_CACHE_SECONDS)
+            else:
+                content, headers = cached
+                response = HttpResponse(content, headers=headers)
+
+        response["ETag"] = etag
+        if last_modified:
+            response["Last-Modified"] = http_date(last_modified)
+        return response
+
+
+class GardenBloomFeed(CachedBloomFeedMixin, Feed):
     title = "What's Blooming Now @ Red Butte Garden"
     link = "/whats-blooming-now/"
     description = "Bloom events to describe which plants are blooming at Red Butte Garden."
 
-    def items(self):
-        bloom_events = BloomEvent.objects.order_by('-bloom_start', '-created_on')[:25]
+    def items(self, days):
+        bloom_events = get_bloom_events(days)[:25]
 
         return bloom_events
 
@@ -39,15 +141,17 @@ class GardenBloomFeed(Feed):
 
     # item_link is only needed if NewsItem has no get_absolute_url method.
     def item_link(self, item):
-        if item.species:
-            return reverse('plants:species-detail', args=[item.species.id])
-        elif item.collections:
-            return reverse('plants:collection-detail', args=[item.collections.first().id])
+        if item.species_id:
+            return reverse('plants:species-detail', args=[item.species_id])
+
+        collection = _first_collection(item)
+        if collection:
+            return reverse('plants:collection-detail', args=[collection.id])
         else:
             return reverse('plants:plant-map')
 
 
-class GardenBloomICalFeed(ICalFeed):
+class GardenBloomICalFeed(CachedBloomFeedMixin, ICalFeed):
     """
     iCal version of the Garden Bloom Feed.
     """
@@ -55,8 +159,8 @@ class GardenBloomICalFeed(ICalFeed):
     timezone = 'MST'
     file_name = "bloom_events.ics"
 
-    def items(self):
-        return BloomEvent.objects.all().order_by('-bloom_start', '-created_on')
+    def items(self, days):
+        return get_bloom_events(days)
 
     def item_title(self, item):
         return item.title
@@ -85,20 +189,13 @@ class GardenBloomICalFeed(ICalFeed):
         return item.bloom_end
 
     def item_link(self, item):
-        if item.species:
-            return reverse('plants:species-detail', args=[item.species.id])
-        elif item.collections:
-            # Prioritize returning the first collection with a location the link matches up with the geolocation.
-            collection_to_link = None
-            for collection in item.collections.all():
-                if collection.location:
-                    collection_to_link = collection
-                    break
-
-            if collection_to_link:
-                return reverse('plants:collection-detail', args=[collection_to_link.id])
-            else:
-                return reverse('plants:collection-detail', args=[item.collections.first().id])
+        if item.species_id:
+            return reverse('plants:species-detail', args=[item.species_id])
+
+        # Prioritize returning the first collection with a location the link matches up with the geolocation.
+        collection_to_link = _first_collection(item, with_location=True) or _first_collection(item)
+        if collection_to_link:
+            return reverse('plants:collection-detail', args=[collection_to_link.id])
         else:
             return reverse('plants:plant-map')
 
@@ -112,7 +209,6 @@ class GardenBloomICalFeed(ICalFeed):
         """
         If the item has collections with a location, return the first latitude and longitude it finds.
         """
-        if item.collections:
-            for collection in item.collections.all():
-                if collection.location:
-                    return collection.location.latitude, collection.location.longitude
+        collection = _first_collection(item, with_location=True)
+        if collection:
+            return collection.location.latitude, collection.location.longitude
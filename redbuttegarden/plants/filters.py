@@ -2,16 +2,62 @@ from collections import OrderedDict
 
 import django_filters
 from django import forms
+from django.db.models import Q
 from django.http import QueryDict
-from django.contrib.postgres.search import SearchQuery, SearchVector
 from django.utils.dates import MONTHS
 
+from .caching import FACET_CHOICES_CACHE_SECONDS, get_facet_choices_cache_key, get_plants_cache
+from .in_bloom import get_in_bloom_index
 from .models import Collection, Species, GardenArea, Family
+from .search import species_search_query
 
 
 TRUE_VALUES = {"1", "true", "t", "yes", "y", "on"}
 
 
+def _distinct_choices(queryset, field):
+    values = queryset.order_by(field).values_list(field, flat=True).distinct()
+    return [(v, v) for v in values if v]
+
+
+def compute_facet_choices():
+    """
+    Query the database for every CollectionFilter choice list.
+    """
+    # Flower colors: split, strip, unique, sorted
+    split_colors = []
+    for s in Species.objects.values_list("flower_color", flat=True).distinct():
+        if not s:
+            continue
+        split_colors.extend([c.strip() for c in s.split(",") if c.strip()])
+    unique_colors = sorted(OrderedDict.fromkeys(split_colors))
+
+    return {
+        "family_name": list(Family.objects.order_by("name").values_list("id", "name")),
+        "garden_name": _distinct_choices(GardenArea.objects.all(), "name"),
+        "habits": _distinct_choices(Species.objects.all(), "habit"),
+        "exposures": _distinct_choices(Species.objects.all(), "exposure"),
+        "water_needs": _distinct_choices(Species.objects.all(), "water_regime"),
+        "bloom_months": [(v, v) for _, v in MONTHS.items()],
+        "flower_colors": [(c, c) for c in unique_colors],
+        "memorial_person": _distinct_choices(Collection.objects.all(), "commemoration_person"),
+    }
+
+
+def get_facet_choices():
+    """
+    CollectionFilter choice lists, computed once per cache version and shared
+    by every process using the plants cache. Plant saves bump the version.
+    """
+    cache = get_plants_cache()
+    key = get_facet_choices_cache_key()
+    choices = cache.get(key)
+    if choices is None:
+        choices = compute_facet_choices()
+        cache.set(key, choices, FACET_CHOICES_CACHE_SECONDS)
+    return choices
+
+
 class CollectionFilter(django_filters.FilterSet):
     """
     Backward/forward compatible FilterSet.
@@ -157,6 +203,11 @@ class CollectionFilter(django_filters.FilterSet):
         widget=forms.CheckboxInput(),
         label="Available memorial",
     )
+    in_bloom = django_filters.BooleanFilter(
+        method="filter_in_bloom",
+        widget=forms.CheckboxInput(),
+        label="In bloom today",
+    )
 
     # ---------- Aliases: accept other param names without duplicating logic ----------
     PARAM_ALIASES = {
@@ -188,6 +239,7 @@ class CollectionFilter(django_filters.FilterSet):
             "bee_friendly",
             "high_elevation",
             "available_memorial",
+            "in_bloom",
         ]
 
     def __init__(self, data=None, *args, **kwargs):
@@ -206,66 +258,20 @@ class CollectionFilter(django_filters.FilterSet):
         # IMPORTANT: do NOT prepend ("", "") to choices.
         # Let Django render the default "---------" empty option consistently.
 
-        # Families
-        family_choices = Family.objects.order_by("name").values_list("id", "name")
-        self.form.fields["family_name"].choices = [
-            (fid, name) for fid, name in family_choices
-        ]
+        # Choices come from a shared cache so building the filter costs no queries
+        choices = get_facet_choices()
+        self.form.fields["family_name"].choices = choices["family_name"]
         _set_empty_label(self.form.fields["family_name"])
-
-        # Garden names
-        garden_choices = (
-            GardenArea.objects.order_by("name")
-            .values_list("name", flat=True)
-            .distinct()
-        )
-        self.form.fields["garden_name"].choices = [(g, g) for g in garden_choices if g]
-
-        # Habit / exposure / water regime
-        habit_choices = (
-            Species.objects.order_by("habit").values_list("habit", flat=True).distinct()
-        )
-        self.form.fields["habits"].choices = [(h, h) for h in habit_choices if h]
-
-        exposure_choices = (
-            Species.objects.order_by("exposure")
-            .values_list("exposure", flat=True)
-            .distinct()
-        )
-        self.form.fields["exposures"].choices = [(e, e) for e in exposure_choices if e]
-
-        water_choices = (
-            Species.objects.order_by("water_regime")
-            .values_list("water_regime", flat=True)
-            .distinct()
-        )
-        self.form.fields["water_needs"].choices = [(w, w) for w in water_choices if w]
-
-        # Bloom months
-        self.form.fields["bloom_months"].choices = [(v, v) for _, v in MONTHS.items()]
-
-        # Flower colors: split, strip, unique, sorted
-        raw_colors = (
-            Species.objects.order_by("flower_color")
-            .values_list("flower_color", flat=True)
-            .distinct()
-        )
-        split_colors = []
-        for s in raw_colors:
-            if not s:
-                continue
-            split_colors.extend([c.strip() for c in s.split(",") if c.strip()])
-
-        unique_colors = sorted(list(OrderedDict.fromkeys(split_colors)))
-        self.form.fields["flower_colors"].choices = [(c, c) for c in unique_colors]
-
-        # Memorial people
-        people = (
-            Collection.objects.order_by("commemoration_person")
-            .values_list("commemoration_person", flat=True)
-            .distinct()
-        )
-        self.form.fields["memorial_person"].choices = [(p, p) for p in people if p]
+        for name in (
+            "garden_name",
+            "habits",
+            "exposures",
+            "water_needs",
+            "bloom_months",
+            "flower_colors",
+            "memorial_person",
+        ):
+            self.form.fields[name].choices = choices[name]
 
         # Widget class tweaks
         for field in self.form.fields.values():
@@ -315,9 +321,7 @@ class CollectionFilter(django_filters.FilterSet):
     def filter_common_name(self, qs, name, value):
         if not value:
             return qs
-        vector = SearchVector("species__cultivar", "species__vernacular_name")
-        query = SearchQuery(value)
-        return qs.annotate(_search=vector).filter(_search=query)
+        return qs.filter(species__search_vector=species_search_query(value))
 
     def filter_bloom_month(self, qs, name, value):
         if not value:
@@ -340,6 +344,16 @@ class CollectionFilter(django_filters.FilterSet):
             value = value.strip().lower() in TRUE_VALUES
         return qs.filter(commemoration_category="Available") if value else qs
 
+    def filter_in_bloom(self, qs, name, value):
+        if value in (None, "", False):
+            return qs
+        if isinstance(value, str):
+            value = value.strip().lower() in TRUE_VALUES
+        if not value:
+            return qs
+        index = get_in_bloom_index()
+        return qs.filter(Q(pk__in=index.collection_ids) | Q(species_id__in=index.species_ids))
+
 
 class TopTreesSpeciesFilter(django_filters.FilterSet):
     # allow filtering by full name (scientific), common name, and habit (example)
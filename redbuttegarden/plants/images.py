@@ -0,0 +1,102 @@
+"""
+Helpers for attaching BRAHMS photos to species.
+
+Uploads are matched to existing Wagtail images by the hash of their contents
+(Wagtail's indexed Image.file_hash) before falling back to the title, so a
+photo that is re-sent under a new filename is not stored, uploaded or
+rendered a second time.
+"""
+from wagtail.images.models import Image
+from wagtail.models import Collection as WagtailCollection
+from wagtail.utils.file import hash_filelike
+
+from .caching import IMAGE_URL_CACHE_SECONDS, get_image_url_cache_key, get_plants_cache
+from .models import SpeciesImage
+
+BRAHMS_COLLECTION_NAME = "BRAHMS Data"
+BRAHMS_TAG = "BRAHMS"
+
+
+def get_brahms_collection():
+    """
+    Raises WagtailCollection.DoesNotExist if the collection is missing.
+    """
+    return WagtailCollection.objects.get(name=BRAHMS_COLLECTION_NAME)
+
+
+def get_or_create_brahms_image(uploaded_file, collection=None, file_hash=None):
+    """
+    Return (image, created) for an uploaded file, reusing an image with the same
+    contents or, failing that, the same title.
+    """
+    file_hash = file_hash or hash_filelike(uploaded_file)
+    uploaded_file.seek(0)
+    image = Image.objects.filter(file_hash=file_hash).order_by("pk").first()
+    if image is not None:
+        return image, False
+
+    image, created = Image.objects.get_or_create(
+        title=uploaded_file.name,
+        defaults={
+            "file": uploaded_file,
+            "file_hash": file_hash,
+            "file_size": uploaded_file.size,
+            "collection": collection or get_brahms_collection(),
+        },
+    )
+    if created:
+        image.tags.add(BRAHMS_TAG)
+    return image, created
+
+
+def get_or_create_species_image(species, image, copyright_text):
+    return SpeciesImage.objects.get_or_create(
+        species=species,
+        image=image,
+        copyright=copyright_text,
+        defaults={"caption": species.full_name},
+    )
+
+
+def get_or_create_brahms_images(uploaded_files, collection=None):
+    """
+    Return {name: (image, created)} for a mapping of names to uploaded files.
+    Each file is hashed once and all of them are looked up in one query;
+    files with identical contents share a single image.
+    """
+    hashes = {name: hash_filelike(f) for name, f in uploaded_files.items()}
+    existing = {}
+    for image in Image.objects.filter(file_hash__in=set(hashes.values())).order_by("-pk"):
+        existing[image.file_hash] = image  # the oldest image wins, as in get_or_create_brahms_image
+
+    images = {}
+    for name, uploaded_file in uploaded_files.items():
+        file_hash = hashes[name]
+        if file_hash in existing:
+            images[name] = (existing[file_hash], False)
+            continue
+        image, created = get_or_create_brahms_image(
+            uploaded_file, collection=collection, file_hash=file_hash
+        )
+        existing[file_hash] = image
+        images[name] = (image, created)
+    return images
+
+
+def get_image_urls(images):
+    """
+    Return {image id: file URL, or None without a file} for images. Building
+    a URL can be slow with remote storage such as S3, so URLs are kept in the
+    plants cache and looked up together.
+    """
+    images = list(images)
+    keys = {get_image_url_cache_key(image): image for image in images if image.file}
+    cache = get_plants_cache()
+    cached = cache.get_many(keys)
+    missing = {key: image.file.url for key, image in keys.items() if key not in cached}
+    if missing:
+        cache.set_many(missing, IMAGE_URL_CACHE_SECONDS)
+
+    urls = {image.pk: None for image in images}
+    urls.update({keys[key].pk: url for key, url in {**cached, **missing}.items()})
+    return urls
@@ -0,0 +1,102 @@
+"""
+Precomputed "in bloom today" index.
+
+The ids of the species and collections with a BloomEvent covering a day are
+built once and stored in the plants cache, so detail pages and the map
+filters check membership instead of querying bloom events. Each process also
+keeps the index in memory, checked against a shared version like the species
+autolinkers.
+
+Run the refresh_in_bloom command just after midnight so the new day's index
+is built ahead of the first request; BloomEvent changes refresh it too. If
+neither has happened the index is built on first use.
+"""
+from django.utils import timezone
+
+from .caching import bump_cache_version, get_cache_version, get_plants_cache, invalidate_geojson_cache
+from .models import BloomEvent
+
+IN_BLOOM_CACHE_SECONDS = 60 * 60 * 48  # 2 days, the key includes the date
+IN_BLOOM_VERSION_KEY = "plants:in-bloom:version"
+
+# Indexes used by this process, keyed by date, as (in-bloom version, index)
+_cached_in_bloom = {}
+
+
+class InBloomIndex:
+    def __init__(self, day, species_ids, collection_ids, generated_at):
+        self.day = day
+        self.species_ids = frozenset(species_ids)
+        self.collection_ids = frozenset(collection_ids)
+        self.generated_at = generated_at
+
+    def as_dict(self):
+        return {
+            "date": self.day.isoformat(),
+            "generated_at": self.generated_at.isoformat(),
+            "species": sorted(self.species_ids),
+            "collections": sorted(self.collection_ids),
+        }
+
+
+def get_in_bloom_cache_key(day):
+    return f"plants:in-bloom:{day.isoformat()}"
+
+
+def build_in_bloom_index(day=None):
+    """
+    Query the species and collections with a bloom event covering day.
+    """
+    day = day or timezone.localdate()
+    events = BloomEvent.objects.filter(bloom_start__lte=day, bloom_end__gte=day)
+    species_ids = events.exclude(species=None).values_list("species_id", flat=True)
+    collection_ids = BloomEvent.collections.through.objects.filter(
+        bloomevent__in=events
+    ).values_list("collection_id", flat=True)
+    return InBloomIndex(day, set(species_ids), set(collection_ids), timezone.now())
+
+
+def get_in_bloom_index(day=None):
+    """
+    The InBloomIndex for day (default today), from this process's memory,
+    then the shared cache, building it if neither has it.
+    """
+    day = day or timezone.localdate()
+    version = get_cache_version(IN_BLOOM_VERSION_KEY)
+    cached = _cached_in_bloom.get(day)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    cache = get_plants_cache()
+    key = get_in_bloom_cache_key(day)
+    index = cache.get(key)
+    if index is None:
+        index = build_in_bloom_index(day)
+        cache.set(key, index, IN_BLOOM_CACHE_SECONDS)
+    _cached_in_bloom.clear()  # only one day is wanted at a time
+    _cached_in_bloom[day] = (version, index)
+    return index
+
+
+def refresh_in_bloom_index(day=None):
+    """
+    Rebuild and store the index for day (default today) and move the shared
+    version on so every process reads the new one.
+    """
+    index = build_in_bloom_index(day)
+    get_plants_cache().set(get_in_bloom_cache_key(index.day), index, IN_BLOOM_CACHE_SECONDS)
+    _cached_in_bloom.clear()
+    bump_cache_version(IN_BLOOM_VERSION_KEY)
+    # Cached map results for the in_bloom filter were built from the old index
+    invalidate_geojson_cache()
+    return index
+
+
+def invalidate_in_bloom_index():
+    """
+    Drop today's index so the next lookup rebuilds it.
+    """
+    _cached_in_bloom.clear()
+    get_plants_cache().delete(get_in_bloom_cache_key(timezone.localdate()))
+    bump_cache_version(IN_BLOOM_VERSION_KEY)
+    invalidate_geojson_cache()
@@ -0,0 +1,172 @@
+import multiprocessing
+import os
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import JSONField
+from django.db.models.functions import Cast
+from wagtail.fields import StreamField
+
+from plants.autolink_workers import autolink_rows, init_worker
+from plants.species_autolinks import SpeciesAutoLinker, has_autolinked_blocks
+
+
+class Command(BaseCommand):
+    help = (
+        'Re-runs the species autolinker over all stored StreamField rich text, so '
+        'changes to species names or aliases reach existing pages without resaving '
+        'them. Only rows whose content changes are written.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report how many rows and rich text values would change without writing them.',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count() or 1,
+            help='Number of worker processes. With 1, rows are processed in this process.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=200,
+            help='Number of rows read from the database and sent to a worker at a time.',
+        )
+        parser.add_argument(
+            '--model',
+            action='append',
+            dest='models',
+            help='Only process this model (app_label.ModelName). May be given more than once.',
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1.')
+
+        try:
+            targets = self._get_targets(options['models'])
+            matches = SpeciesAutoLinker.get_unique_match_targets_from_database()
+
+            pool = None
+            if options['workers'] > 1:
+                pool = ProcessPoolExecutor(
+                    max_workers=options['workers'],
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=init_worker,
+                    initargs=(matches,),
+                )
+            else:
+                init_worker(matches)
+
+            totals = Counter()
+            try:
+                for model, field_names in targets:
+                    counts = self._process_model(model, field_names, pool, options)
+                    totals.update(counts)
+                    self.stdout.write(
+                        f'{model._meta.label}: {counts["rows"]} rows scanned, '
+                        f'{counts["changed_rows"]} changed ({counts["changed_values"]} rich text values)'
+                    )
+            finally:
+                if pool:
+                    pool.shutdown()
+        except CommandError:
+            raise
+        except Exception as e:
+            raise CommandError(f'Broken: {e}')
+
+        verb = 'Would update' if options['dry_run'] else 'Updated'
+        self.stdout.write(self.style.SUCCESS(
+            f'{verb} {totals["changed_rows"]} of {totals["rows"]} rows '
+            f'({totals["changed_values"]} rich text values).'
+        ))
+
+    def _get_targets(self, labels):
+        """
+        Return (model, [stream field names]) for every concrete model with a
+        StreamField that can hold autolinked rich text.
+        """
+        if labels:
+            try:
+                models = [apps.get_model(label) for label in labels]
+            except (LookupError, ValueError) as e:
+                raise CommandError(str(e))
+        else:
+            models = apps.get_models()
+
+        targets = []
+        for model in models:
+            if model._meta.proxy:
+                continue
+            # local fields only, so multi-table children don't rescan parent rows
+            field_names = [
+                field.name
+                for field in model._meta.local_concrete_fields
+                if isinstance(field, StreamField) and has_autolinked_blocks(field.stream_block)
+            ]
+            if field_names:
+                targets.append((model, field_names))
+        return targets
+
+    def _process_model(self, model, field_names, pool, options):
+        """
+        Stream the model's rows in batches to the workers, keeping a bounded
+        number of batches in flight, and write back the rows that changed.
+        """
+        counts = Counter(rows=0, changed_rows=0, changed_values=0)
+        # Read the raw JSON rather than letting StreamField build StreamValues
+        raw_fields = {f'_raw_{name}': Cast(name, output_field=JSONField()) for name in field_names}
+        rows = (
+            model._base_manager.order_by('pk')
+            .annotate(**raw_fields)
+            .values_list('pk', *raw_fields)
+            .iterator(chunk_size=options['batch_size'])
+        )
+        label = model._meta.label
+        max_in_flight = 2 * options['workers']
+        in_flight = deque()
+
+        def collect(result):
+            changed_rows = result.result() if pool else result
+            for _, _, changed in changed_rows:
+                counts['changed_rows'] += 1
+                counts['changed_values'] += changed
+            if not options['dry_run'] and changed_rows:
+                self._write(model, changed_rows)
+
+        for batch in _batched(rows, options['batch_size']):
+            counts['rows'] += len(batch)
+            if pool is None:
+                collect(autolink_rows(label, field_names, batch))
+                continue
+            in_flight.append(pool.submit(autolink_rows, label, field_names, batch))
+            if len(in_flight) >= max_in_flight:
+                collect(in_flight.popleft())
+
+        while in_flight:
+            collect(in_flight.popleft())
+        return counts
+
+    @staticmethod
+    def _write(model, changed_rows):
+        with transaction.atomic():
+            for pk, updates, _ in changed_rows:
+                model._base_manager.filter(pk=pk).update(**updates)
+
+
+def _batched(iterable, size):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
@@ -0,0 +1,90 @@
+import random
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Q
+
+from plants.models import Location
+from plants.spatial import MAX_COVERING_TILES, covering_key_ranges, spatial_key
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare query plans for Location bbox lookups using raw latitude/longitude "
+        "predicates versus spatial key range scans over a synthetic dataset. "
+        "All synthetic rows are rolled back when the command finishes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--count", type=int, default=200_000, help="Synthetic locations to create.")
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--repeat", type=int, default=20, help="Timed runs per query.")
+        parser.add_argument(
+            "--max-tiles", type=int, default=MAX_COVERING_TILES, help="Covering tiles per bbox."
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self._populate(options["count"], options["seed"])
+            with connection.cursor() as cursor:
+                cursor.execute(f"ANALYZE {Location._meta.db_table}")
+
+            # Roughly one map viewport at zoom 17 over the garden
+            west, south, east, north = (
+                Decimal("-111.826"), Decimal("40.765"), Decimal("-111.822"), Decimal("40.768")
+            )
+            bounds_q = Q(
+                longitude__gte=west, longitude__lte=east, latitude__gte=south, latitude__lte=north
+            )
+            spatial_q = Q()
+            for lo, hi in covering_key_ranges(west, south, east, north, options["max_tiles"]):
+                spatial_q |= Q(spatial_key__gte=lo, spatial_key__lt=hi)
+
+            queries = {
+                "latitude/longitude predicates": Location.objects.filter(bounds_q),
+                "spatial key ranges": Location.objects.filter(spatial_q).filter(bounds_q),
+            }
+            for label, queryset in queries.items():
+                self._report(label, queryset, options["repeat"])
+
+            transaction.set_rollback(True)
+
+    def _populate(self, count, seed):
+        rng = random.Random(seed)
+        batch = []
+        for _ in range(count):
+            latitude = Decimal(rng.uniform(40.70, 40.83)).quantize(Decimal("0.000001"))
+            longitude = Decimal(rng.uniform(-111.90, -111.75)).quantize(Decimal("0.000001"))
+            batch.append(
+                Location(
+                    latitude=latitude,
+                    longitude=longitude,
+                    spatial_key=spatial_key(longitude, latitude),
+                )
+            )
+            if len(batch) >= 5000:
+                Location.objects.bulk_create(batch, ignore_conflicts=True)
+                batch = []
+        if batch:
+            Location.objects.bulk_create(batch, ignore_conflicts=True)
+
+        self.stdout.write(f"Locations in table: {Location.objects.count()}")
+
+    def _report(self, label, queryset, repeat):
+        self.stdout.write(self.style.MIGRATE_HEADING(f"\n{label}"))
+        self.stdout.write(queryset.explain(analyze=True))
+
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            rows = len(list(queryset.values_list("id", flat=True)))
+            timings.append((time.perf_counter() - start) * 1000)
+
+        timings.sort()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{rows} rows | median {timings[len(timings) // 2]:.2f} ms | best {timings[0]:.2f} ms"
+            )
+        )
@@ -1,21 +1,94 @@
 from django.core.management.base import BaseCommand, CommandError
-
-from geojson import dump
+from django.db.models import Count, Max
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 
 from plants.models import Collection
-from plants.utils import get_feature_collection
+from plants.snapshots import publish_geojson, read_manifest, write_manifest
+from plants.utils import iter_feature_collection_json
 
 
 class Command(BaseCommand):
-    help = 'Generates geojson file of Collection objects'
+    help = (
+        'Publishes a compressed, content-hashed geojson snapshot of Collection objects '
+        'to the default storage and points the "latest" manifest at it. With --since, '
+        'publishes a delta of collections modified after that time instead.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--since',
+            help='ISO 8601 datetime, or "latest" to use the watermark of the current manifest '
+                 'snapshot. Only collections modified after this time are written.',
+        )
+        parser.add_argument(
+            '--output',
+            help='Also write the uncompressed geojson to this local path.',
+        )
 
     def handle(self, *args, **options):
         try:
+            manifest = read_manifest()
+            since = self._get_since(options['since'], manifest)
+            if since and not (manifest and manifest.get('snapshot')):
+                raise CommandError('Publish a full snapshot before publishing a delta.')
+
             # Get all collections with Locations
-            feature_collection = get_feature_collection(Collection.objects.exclude(location=None))
+            collections = Collection.objects.exclude(location=None)
+            if since:
+                collections = collections.filter(last_modified__gt=since)
+            # Taken before reading rows; anything saved meanwhile is repeated in the next delta
+            stats = collections.aggregate(watermark=Max('last_modified'), count=Count('id'))
+            watermark = stats['watermark'] or since
+            count = stats['count']
+
+            chunks = iter_feature_collection_json(collections.order_by('id'))
+            if options['output']:
+                chunks = self._tee_to_file(chunks, options['output'])
+
+            entry = publish_geojson('delta' if since else 'collections', chunks)
+            entry.update({
+                'count': count,
+                'generated_at': timezone.now().isoformat(),
+                'watermark': watermark.isoformat() if watermark else None,
+            })
 
-            with open('collections.geojson', 'w') as f:
-                dump(feature_collection, f)
+            if since:
+                entry['since'] = since.isoformat()
+                manifest['delta'] = entry
+            else:
+                manifest = {'snapshot': entry, 'delta': None}
+
+            write_manifest(manifest)
+        except CommandError:
+            raise
         except Exception as e:
             raise CommandError(f'Broken: {e}')
 
+        kind = 'delta' if since else 'snapshot'
+        self.stdout.write(self.style.SUCCESS(
+            f'Published {kind} of {count} collections: {entry["files"]["gz"]["name"]}'
+        ))
+
+    def _get_since(self, value, manifest):
+        if not value:
+            return None
+
+        if value == 'latest':
+            value = (manifest or {}).get('snapshot', {}).get('watermark')
+            if not value:
+                raise CommandError('No published snapshot to take a watermark from.')
+
+        since = parse_datetime(value)
+        if since is None:
+            raise CommandError(f'Invalid --since value: {value}')
+        if timezone.is_naive(since):
+            since = timezone.make_aware(since)
+        return since
+
+    @staticmethod
+    def _tee_to_file(chunks, path):
+        with open(path, 'wb') as f:
+            for chunk in chunks:
+                f.write(chunk)
+                yield chunk
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from plants.in_bloom import refresh_in_bloom_index
+
+
+class Command(BaseCommand):
+    help = (
+        'Rebuilds the cached index of species and collections in bloom. Schedule it to run '
+        'shortly after midnight so the new day\'s index is ready before the first request.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--date',
+            help='ISO 8601 date to build the index for. Defaults to today.',
+        )
+
+    def handle(self, *args, **options):
+        day = None
+        if options['date']:
+            try:
+                day = parse_date(options['date'])
+            except ValueError:
+                day = None
+            if day is None:
+                raise CommandError(f'Invalid --date value: {options["date"]}')
+
+        try:
+            index = refresh_in_bloom_index(day)
+        except Exception as e:
+            raise CommandError(f'Broken: {e}')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{index.day}: {len(index.species_ids)} species and '
+            f'{len(index.collection_ids)} collections in bloom'
+        ))
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from plants.models import Species
+from plants.search import update_search_vectors
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the stored full text search vector of every Species'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Species updated per statement.')
+        parser.add_argument('--missing', action='store_true', help='Only fill species without a vector.')
+
+    def handle(self, *args, **options):
+        species = Species.objects.order_by('pk')
+        if options['missing']:
+            species = species.filter(search_vector__isnull=True)
+
+        ids = list(species.values_list('pk', flat=True))
+        batch_size = options['batch_size']
+        updated = 0
+        for start in range(0, len(ids), batch_size):
+            updated += update_search_vectors(Species.objects.filter(pk__in=ids[start:start + batch_size]))
+
+        self.stdout.write(self.style.SUCCESS(f'Updated search vectors for {updated} species'))
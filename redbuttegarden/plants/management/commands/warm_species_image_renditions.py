@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from plants.models import SpeciesImage
+from plants.renditions import get_rendition_filters, get_rendition_workers, render_images
+
+
+class Command(BaseCommand):
+    help = (
+        'Creates the renditions species images are displayed with, skipping those that '
+        'already exist.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=None,
+            help='Number of threads rendering images; 0 renders in this thread. '
+                 'Defaults to settings.PLANTS_RENDITION_WORKERS.',
+        )
+
+    def handle(self, *args, **options):
+        workers = options['workers']
+        if workers is None:
+            workers = get_rendition_workers()
+        if workers < 0:
+            raise CommandError('--workers must not be negative.')
+
+        try:
+            image_ids = set(SpeciesImage.objects.values_list('image_id', flat=True))
+            created = render_images(image_ids, workers=workers)
+        except Exception as e:
+            raise CommandError(f'Broken: {e}')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Created {created} renditions ({", ".join(get_rendition_filters())}) '
+            f'for {len(image_ids)} species images'
+        ))
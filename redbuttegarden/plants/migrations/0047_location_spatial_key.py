@@ -0,0 +1,52 @@
+import math
+
+from django.db import migrations, models
+
+# Frozen copy of plants.spatial.spatial_key as it was when this migration was written
+SPATIAL_KEY_ZOOM = 24
+MAX_LATITUDE = 85.05112878
+
+
+def spatial_key(longitude, latitude, zoom=SPATIAL_KEY_ZOOM):
+    n = 1 << zoom
+    latitude = max(-MAX_LATITUDE, min(MAX_LATITUDE, float(latitude)))
+    lat_rad = math.radians(latitude)
+    x = int((float(longitude) + 180.0) / 360.0 * n)
+    y = int((1.0 - math.asinh(math.tan(lat_rad)) / math.pi) / 2.0 * n)
+    x, y = min(max(x, 0), n - 1), min(max(y, 0), n - 1)
+
+    key = 0
+    for i in range(zoom - 1, -1, -1):
+        key = (key << 2) | (((y >> i) & 1) << 1) | ((x >> i) & 1)
+    return key
+
+
+def populate_spatial_keys(apps, schema_editor):
+    Location = apps.get_model("plants", "Location")
+
+    locations = []
+    for location in Location.objects.only("id", "latitude", "longitude").iterator(chunk_size=2000):
+        location.spatial_key = spatial_key(location.longitude, location.latitude)
+        locations.append(location)
+        if len(locations) >= 2000:
+            Location.objects.bulk_update(locations, ["spatial_key"])
+            locations = []
+
+    if locations:
+        Location.objects.bulk_update(locations, ["spatial_key"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("plants", "0046_species_autolink_controls"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="location",
+            name="spatial_key",
+            field=models.BigIntegerField(blank=True, db_index=True, editable=False, null=True),
+        ),
+        migrations.RunPython(populate_spatial_keys, migrations.RunPython.noop),
+    ]
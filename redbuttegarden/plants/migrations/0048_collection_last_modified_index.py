@@ -0,0 +1,18 @@
+# Generated by Django 5.2.13 on 2026-10-18 08:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('plants', '0047_location_spatial_key'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='collection',
+            name='last_modified',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.13 on 2026-10-18 08:29
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.conf import settings
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+from django.db.models import OuterRef, Subquery
+
+
+def populate_search_vectors(apps, schema_editor):
+    # Frozen copy of plants.search.update_search_vectors as it was when this migration was written
+    Species = apps.get_model('plants', 'Species')
+    config = getattr(settings, 'PLANTS_SEARCH_CONFIG', 'english')
+    vector = (
+        SearchVector('full_name', weight='A', config=config)
+        + SearchVector('vernacular_name', 'cultivar', 'autolink_aliases', weight='B', config=config)
+        + SearchVector('genus__name', weight='C', config=config)
+        + SearchVector('genus__family__name', weight='D', config=config)
+    )
+    vectors = Species.objects.filter(pk=OuterRef('pk')).annotate(vector=vector).values('vector')
+    Species.objects.update(search_vector=Subquery(vectors))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('plants', '0048_collection_last_modified_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='species',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='species',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='species_search_vector_gin'),
+        ),
+        migrations.RunPython(populate_search_vectors, migrations.RunPython.noop),
+    ]
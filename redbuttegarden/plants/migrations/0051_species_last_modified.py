@@ -0,0 +1,20 @@
+# Generated by Django 5.2.13 on 2026-10-18 14:02
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('plants', '0050_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='species',
+            name='last_modified',
+            field=models.DateTimeField(auto_now=True, db_index=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.13 on 2026-10-18 09:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('plants', '0051_species_last_modified'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='collection',
+            index=models.Index(fields=['created_on', 'id'], name='collection_created_on_id'),
+        ),
+    ]
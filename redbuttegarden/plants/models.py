@@ -2,9 +2,11 @@ import logging
 import urllib.parse
 
 from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVectorField
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.db import models
-from django.db.models.functions import Length
+from django.db.models.functions import Length, Upper
 from django.utils.dates import MONTHS
 from django.utils.translation import gettext_lazy as _
 from django.urls import reverse
@@ -14,6 +16,9 @@ from wagtail.admin.panels import InlinePanel
 from wagtail.admin.panels import FieldPanel
 from wagtail.models import Orderable
 
+from .search import update_search_vectors
+from .spatial import spatial_key
+
 models.CharField.register_lookup(Length)
 
 logger = logging.getLogger(__name__)
@@ -83,6 +88,14 @@ class Species(ClusterableModel):
         blank=True,
         help_text=_("Optional additional link names, one per line. The scientific full name is always included while auto-linking is enabled."),
     )
+    # Maintained by save() and the Genus/Family signals, see plants.search
+    search_vector = SearchVectorField(null=True, editable=False)
+    # Also touched when the species' images, collections or bloom events change, see plants.signals
+    last_modified = models.DateTimeField(auto_now=True, db_index=True)
+
+    search_vector_fields = {'full_name', 'vernacular_name', 'cultivar', 'autolink_aliases', 'genus', 'genus_id'}
+    # Changes to these rebuild the cached species autolinkers, see plants.signals
+    autolink_fields = {'full_name', 'autolink_enabled', 'autolink_aliases'}
 
     panels = [
         InlinePanel('species_images', label='Species Images'),
@@ -123,6 +136,13 @@ class Species(ClusterableModel):
     def get_rich_text_link_title(self):
         return self.full_name
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or self.search_vector_fields & set(update_fields):
+            update_search_vectors(Species.objects.filter(pk=self.pk))
+
     def get_autolink_terms(self):
         terms = [self.full_name]
         terms.extend(self.autolink_aliases.splitlines())
@@ -145,6 +165,12 @@ class Species(ClusterableModel):
             models.CheckConstraint(check=models.Q(vernacular_name__length__gt=0), name='vernacular_name_not_empty'),
             models.CheckConstraint(check=models.Q(full_name__length__gt=0), name='full_name_not_empty')
         ]
+        indexes = [
+            GinIndex(fields=['search_vector'], name='species_search_vector_gin'),
+            # Trigram indexes on UPPER(column) serve Django's icontains lookups, see plants.search
+            GinIndex(OpClass(Upper('full_name'), name='gin_trgm_ops'), name='species_full_name_trgm'),
+            GinIndex(OpClass(Upper('vernacular_name'), name='gin_trgm_ops'), name='species_vernacular_trgm'),
+        ]
 
 
 class SpeciesImage(Orderable):
@@ -165,6 +191,8 @@ class SpeciesImage(Orderable):
 class Location(models.Model):
     latitude = models.DecimalField(max_digits=9, decimal_places=6)
     longitude = models.DecimalField(max_digits=9, decimal_places=6)
+    # Quadkey of the point as an integer, used for bbox range scans. See plants.spatial
+    spatial_key = models.BigIntegerField(blank=True, null=True, db_index=True, editable=False)
 
     class Meta:
         unique_together = ['latitude', 'longitude']
@@ -172,6 +200,20 @@ class Location(models.Model):
     def __str__(self):
         return ', '.join([str(self.latitude), str(self.longitude)])
 
+    def save(self, *args, **kwargs):
+        self.spatial_key = self.compute_spatial_key()
+
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'latitude', 'longitude'} & set(update_fields):
+            kwargs['update_fields'] = set(update_fields) | {'spatial_key'}
+
+        super().save(*args, **kwargs)
+
+    def compute_spatial_key(self):
+        if self.latitude is None or self.longitude is None:
+            return None
+        return spatial_key(self.longitude, self.latitude)
+
 
 class GardenArea(models.Model):
     area: str = models.CharField(max_length=255, blank=True, null=True)  # Garden Area/Zone in BRAHMS
@@ -191,10 +233,15 @@ class Collection(models.Model):
     commemoration_category = models.CharField(max_length=255, null=True, blank=True)
     commemoration_person = models.CharField(max_length=255, null=True, blank=True)
     created_on = models.DateTimeField(auto_now_add=True)
-    last_modified = models.DateTimeField(auto_now=True)
+    last_modified = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         ordering = ['-created_on']
+        indexes = [
+            GinIndex(OpClass(Upper('plant_id'), name='gin_trgm_ops'), name='collection_plant_id_trgm'),
+            # Keyset pagination of the collection list (plants.pagination)
+            models.Index(fields=['created_on', 'id'], name='collection_created_on_id'),
+        ]
 
     def __str__(self):
         return self.plant_id
@@ -248,3 +295,22 @@ class BloomEvent(models.Model):
                 self.url = f'https://redbuttegarden.org/plants/plant-map/?species_full_name={urllib.parse.quote(self.species.full_name)}'
 
         super().save(*args, **kwargs)
+
+
+class Tombstone(models.Model):
+    """
+    Record of a deleted collection or species, kept so API clients syncing
+    changes with ?since= learn about deletions. See plants.sync.
+    """
+    model = models.CharField(max_length=100)  # model_name of the deleted object
+    object_id = models.BigIntegerField()
+    key = models.CharField(max_length=255, blank=True)  # plant_id or full_name
+    deleted_on = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['model', 'deleted_on', 'id'], name='tombstone_model_deleted_on'),
+        ]
+
+    def __str__(self):
+        return f'{self.model} {self.object_id} deleted {self.deleted_on}'
@@ -0,0 +1,246 @@
+"""
+Keyset (cursor) pagination of collections, newest first.
+
+Pages are found by filtering on the (created_on, id) position of the last row
+of the previous page rather than with OFFSET, so every page costs the same
+index range scan however deep it is. The cursor also carries the offset of
+the page so the list can still show "Showing 51–100".
+"""
+import base64
+import binascii
+import json
+
+from django.db import connection
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, CursorPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from .caching import FILTER_COUNT_CACHE_SECONDS, get_filter_cache_key, get_plants_cache
+
+KEYSET_ORDERING = ("-created_on", "-id")
+
+# Below this many rows (by the planner's estimate) an exact count is cheap enough
+COUNT_ESTIMATE_THRESHOLD = 10000
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+class KeysetPage:
+    def __init__(self, object_list, start, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.start = start  # offset of the first row in the whole list
+        self.next_cursor = next_cursor
+        # "" when the previous page is the first page
+        self.previous_cursor = previous_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+
+def dump_cursor(position):
+    """Encode a JSON-serializable position as an opaque, URL-safe cursor."""
+    raw = json.dumps(position, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def load_cursor(cursor):
+    """
+    Decode a cursor from dump_cursor. Raises InvalidCursor if it cannot be read.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        return json.loads(raw)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise InvalidCursor(cursor)
+
+
+def parse_cursor_datetime(value):
+    """
+    Parse a datetime stored in a cursor. Raises InvalidCursor if it is not one.
+    """
+    try:
+        parsed = parse_datetime(value)
+    except (TypeError, ValueError):
+        parsed = None
+    if parsed is None:
+        raise InvalidCursor(value)
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def encode_cursor(obj, offset, reverse=False):
+    position = {"c": obj.created_on.isoformat(), "i": obj.pk, "o": offset}
+    if reverse:
+        position["r"] = 1
+    return dump_cursor(position)
+
+
+def decode_cursor(cursor):
+    """
+    Return (created_on, id, offset, reverse) for a cursor from encode_cursor.
+    Raises InvalidCursor if it cannot be read.
+    """
+    position = load_cursor(cursor)
+    try:
+        created_on = parse_cursor_datetime(position["c"])
+        pk, offset = int(position["i"]), int(position["o"])
+        reverse = bool(position.get("r"))
+    except (ValueError, TypeError, KeyError):
+        raise InvalidCursor(cursor)
+    if offset < 0:
+        raise InvalidCursor(cursor)
+    return created_on, pk, offset, reverse
+
+
+def paginate_keyset(queryset, cursor, per_page):
+    """
+    Return the KeysetPage of queryset, ordered by KEYSET_ORDERING, that
+    starts after the cursor position (or ends before it, for a cursor to a
+    previous page). With no cursor, return the first page.
+    """
+    position = decode_cursor(cursor) if cursor else None
+    if position is None:
+        offset, reverse = 0, False
+        queryset = queryset.order_by(*KEYSET_ORDERING)
+    else:
+        created_on, pk, offset, reverse = position
+        # The redundant created_on bound lets Postgres use it as an index condition
+        if reverse:
+            queryset = queryset.filter(
+                Q(created_on__gte=created_on) & (Q(created_on__gt=created_on) | Q(id__gt=pk))
+            ).order_by("created_on", "id")
+        else:
+            queryset = queryset.filter(
+                Q(created_on__lte=created_on) & (Q(created_on__lt=created_on) | Q(id__lt=pk))
+            ).order_by(*KEYSET_ORDERING)
+
+    rows = list(queryset[:per_page + 1])
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+
+    if reverse:
+        rows.reverse()
+        has_next, has_previous = True, has_more
+        if not has_more:
+            offset = 0  # walked back to the first page
+    else:
+        has_next, has_previous = has_more, position is not None
+
+    if not rows:
+        return KeysetPage(rows, offset)
+    return KeysetPage(
+        rows,
+        offset,
+        next_cursor=encode_cursor(rows[-1], offset + len(rows)) if has_next else None,
+        previous_cursor=_previous_cursor(rows[0], offset, per_page) if has_previous else None,
+    )
+
+
+def _previous_cursor(first_row, offset, per_page):
+    if offset <= per_page:
+        return ""  # the previous page is the first one, which needs no cursor
+    return encode_cursor(first_row, offset - per_page, reverse=True)
+
+
+def estimate_row_count(model):
+    """
+    The planner's estimate of the number of rows in model's table, from
+    pg_class.reltuples, or None if the table has not been analyzed yet.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT reltuples FROM pg_class WHERE oid = %s::regclass",
+            [connection.ops.quote_name(model._meta.db_table)],
+        )
+        row = cursor.fetchone()
+    if row is None or row[0] < 0:
+        return None
+    return int(row[0])
+
+
+def get_approximate_count(queryset, filter_params):
+    """
+    Return (count, approximate) for queryset, which is filtered by the
+    querydict filter_params. Unfiltered lists of large tables use the planner
+    estimate; anything else is counted once per filter and cached until plant
+    data changes.
+    """
+    if not filter_params:
+        estimate = estimate_row_count(queryset.model)
+        if estimate is not None and estimate >= COUNT_ESTIMATE_THRESHOLD:
+            return estimate, True
+
+    cache_key = get_filter_cache_key(f"plants:count:{queryset.model._meta.model_name}", filter_params)
+    return get_plants_cache().get_or_set(cache_key, queryset.count, FILTER_COUNT_CACHE_SECONDS), False
+
+
+class CollectionCursorPagination(BasePagination):
+    """
+    DRF pagination using paginate_keyset, with "next" and "previous" links
+    like CursorPagination.
+    """
+
+    page_size = 100
+    cursor_query_param = "cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        try:
+            self.page = paginate_keyset(
+                queryset, request.query_params.get(self.cursor_query_param), self.page_size
+            )
+        except InvalidCursor:
+            raise NotFound("Invalid cursor")
+        return self.page.object_list
+
+    def get_link(self, cursor):
+        if cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        if not cursor:
+            return remove_query_param(url, self.cursor_query_param)
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "next": self.get_link(self.page.next_cursor),
+                "previous": self.get_link(self.page.previous_cursor),
+                "results": data,
+            }
+        )
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+
+class SpeciesImageCursorPagination(CursorPagination):
+    """
+    Large cursor pages, so clients can walk every species image in a few
+    requests. Ties on species are broken by offset within the cursor.
+    """
+
+    page_size = 100
+    page_size_query_param = "page_size"
+    max_page_size = 1000
+    ordering = ("species_id", "sort_order", "id")
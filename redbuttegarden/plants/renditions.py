@@ -0,0 +1,117 @@
+"""
+Pre-generation of the renditions species images are shown with.
+
+Wagtail creates a rendition the first time a template asks for it, so the
+first view of a new photo waits while the original is downloaded, resized
+and the result uploaded, once per size. Images attached to species are
+rendered here instead once the attaching transaction has committed, each in
+its own asynchronous Lambda invocation (see zappa.asynchronous.task), or in
+the committing process when not running on Lambda. The
+warm_species_image_renditions command, scheduled through zappa_schedule,
+renders whatever is still missing, e.g. for images added before this or
+invocations that failed.
+"""
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connections, transaction
+from wagtail.images import get_image_model
+from zappa.asynchronous import task
+
+logger = logging.getLogger(__name__)
+
+# As used by plants/species_detail.html and the Wagtail admin image chooser
+SPECIES_IMAGE_RENDITION_FILTERS = ("max-500x500", "height-100", "original", "max-165x165")
+
+
+def get_rendition_filters():
+    return tuple(getattr(settings, "PLANTS_SPECIES_IMAGE_RENDITIONS", SPECIES_IMAGE_RENDITION_FILTERS))
+
+
+def get_rendition_workers():
+    return getattr(settings, "PLANTS_RENDITION_WORKERS", 4)
+
+
+def get_missing_renditions(image_ids, filters=None):
+    """
+    Return {image id: [filter specs]} of the renditions image_ids lack.
+    """
+    filters = filters or get_rendition_filters()
+    Rendition = get_image_model().get_rendition_model()
+    existing = set(
+        Rendition.objects.filter(image_id__in=image_ids, filter_spec__in=filters)
+        .values_list("image_id", "filter_spec")
+    )
+    missing = {}
+    for image_id in image_ids:
+        specs = [spec for spec in filters if (image_id, spec) not in existing]
+        if specs:
+            missing[image_id] = specs
+    return missing
+
+
+def render_image(image_id, filters=None):
+    """
+    Create the missing renditions of one image. Returns how many were made.
+    """
+    specs = get_missing_renditions([image_id], filters).get(image_id)
+    if not specs:
+        return 0
+    image = get_image_model().objects.filter(pk=image_id).first()
+    if image is None:
+        return 0
+    # Opens the original once for all of the sizes
+    image.get_renditions(*specs)
+    return len(specs)
+
+
+def _render_image_in_thread(image_id, filters=None):
+    try:
+        return render_image(image_id, filters)
+    except Exception:
+        logger.exception(f"Failed to create renditions for image {image_id}")
+        return 0
+    finally:
+        # Each pool thread opens its own connection; don't leave it behind
+        connections.close_all()
+
+
+def render_images(image_ids, filters=None, workers=None):
+    """
+    Create the missing renditions of image_ids using a pool of workers
+    threads, or in this thread if workers is 0. Returns how many were made.
+    """
+    missing = get_missing_renditions(list(image_ids), filters)
+    workers = get_rendition_workers() if workers is None else workers
+    if not workers:
+        return sum(render_image(image_id, specs) for image_id, specs in missing.items())
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="plants-renditions") as pool:
+        return sum(pool.map(_render_image_in_thread, missing.keys(), missing.values()))
+
+
+@task
+def render_image_task(image_id):
+    """
+    render_image in a new Lambda invocation, or right away outside Lambda.
+    """
+    try:
+        render_image(image_id)
+    except Exception:
+        # Left for warm_species_image_renditions
+        logger.exception(f"Failed to create renditions for image {image_id}")
+
+
+def _dispatch(image_ids):
+    for image_id in image_ids:
+        render_image_task(image_id)
+
+
+def schedule_renditions(image_ids):
+    """
+    Render image_ids once the current transaction commits.
+    """
+    image_ids = sorted(set(image_ids))
+    if image_ids:
+        transaction.on_commit(lambda: _dispatch(image_ids))
@@ -1,3 +1,6 @@
+import re
+
+from asgiref.local import Local
 from django.utils.html import escape
 from draftjs_exporter.dom import DOM
 
@@ -7,6 +10,76 @@ from wagtail.whitelist import check_url
 
 from .models import Collection, Species
 
+PLANT_LINK_MODELS = {"species": Species, "collection": Collection}
+
+# Matches stored links in rich text HTML, including HTML embedded in JSON
+PLANT_LINK_TAG_RE = re.compile(r"<a\b[^>]*>")
+PLANT_LINK_ATTR_RE = re.compile(r'(?<![\w-])(linktype|id)=\\?"([^"\\]*)')
+
+# Plant link URLs resolved during the current request, see plants.signals
+_link_urls = Local()
+
+
+def start_plant_link_url_memo():
+    _link_urls.memo = {}
+
+
+def clear_plant_link_url_memo():
+    _link_urls.memo = None
+
+
+def resolve_plant_link_urls(model, ids):
+    """
+    Return {str(id): url} for plant link ids, with None for ids that don't
+    exist. Ids not already resolved during this request are fetched with a
+    single in_bulk query.
+    """
+    memo = getattr(_link_urls, "memo", None)
+    label = model._meta.label
+    urls = {}
+    missing = set()
+    for id_ in ids:
+        id_ = str(id_)
+        if memo is not None and (label, id_) in memo:
+            urls[id_] = memo[(label, id_)]
+        else:
+            missing.add(id_)
+
+    if missing:
+        # get_absolute_url only needs the pk
+        instances = model._default_manager.only("pk").in_bulk(
+            [int(id_) for id_ in missing if id_.isdigit()]
+        )
+        for id_ in missing:
+            instance = instances.get(int(id_)) if id_.isdigit() else None
+            urls[id_] = instance.get_absolute_url() if instance else None
+            if memo is not None:
+                memo[(label, id_)] = urls[id_]
+    return urls
+
+
+def find_plant_link_ids(html):
+    """
+    Return {link type: {id, ...}} for the species and collection links in
+    stored rich text.
+    """
+    ids = {link_type: set() for link_type in PLANT_LINK_MODELS}
+    for tag in PLANT_LINK_TAG_RE.finditer(html):
+        attrs = dict(PLANT_LINK_ATTR_RE.findall(tag.group(0)))
+        if attrs.get("linktype") in ids and "id" in attrs:
+            ids[attrs["linktype"]].add(attrs["id"])
+    return ids
+
+
+def prefetch_plant_link_urls(html):
+    """
+    Resolve every plant link in html with one query per model, so the link
+    handlers that expand them one at a time later in the request don't query.
+    """
+    for link_type, ids in find_plant_link_ids(html).items():
+        if ids:
+            resolve_plant_link_urls(PLANT_LINK_MODELS[link_type], ids)
+
 
 def plant_link_entity(props):
     id_ = props.get("id")
@@ -37,12 +110,17 @@ class BasePlantLinkHandler(LinkHandler):
 
     @classmethod
     def expand_db_attributes(cls, attrs):
-        try:
-            instance = cls.get_instance(attrs)
-        except cls.model.DoesNotExist:
-            return "<a>"
+        return cls.expand_db_attributes_many([attrs])[0]
 
-        return f'<a href="{escape(instance.get_absolute_url())}">'
+    @classmethod
+    def expand_db_attributes_many(cls, attrs_list):
+        urls = resolve_plant_link_urls(cls.model, [attrs.get("id") for attrs in attrs_list])
+
+        links = []
+        for attrs in attrs_list:
+            url = urls[str(attrs.get("id"))]
+            links.append(f'<a href="{escape(url)}">' if url else "<a>")
+        return links
 
 
 class SpeciesLinkHandler(BasePlantLinkHandler):
@@ -73,15 +151,14 @@ class BasePlantEditorHTMLLinkHandler:
 
     @classmethod
     def expand_db_attributes(cls, attrs):
-        try:
-            instance = cls.model.objects.get(id=attrs["id"])
-        except cls.model.DoesNotExist:
+        url = resolve_plant_link_urls(cls.model, [attrs["id"]])[str(attrs["id"])]
+        if url is None:
             return f'<a data-linktype="{cls.identifier}">'
 
         return (
             f'<a data-linktype="{cls.identifier}" '
-            f'data-id="{instance.pk}" '
-            f'href="{escape(instance.get_absolute_url())}">'
+            f'data-id="{escape(attrs["id"])}" '
+            f'href="{escape(url)}">'
         )
 
 
@@ -100,20 +177,10 @@ class BasePlantLinkElementHandler(LinkElementHandler):
     link_type = None
 
     def get_attribute_data(self, attrs):
-        try:
-            instance = self.model.objects.get(id=attrs["id"])
-        except self.model.DoesNotExist:
-            return {
-                "id": int(attrs["id"]),
-                "parentId": None,
-                "url": None,
-                "linkType": self.link_type,
-            }
-
         return {
-            "id": instance.pk,
+            "id": int(attrs["id"]),
             "parentId": None,
-            "url": instance.get_absolute_url(),
+            "url": resolve_plant_link_urls(self.model, [attrs["id"]])[str(attrs["id"])],
             "linkType": self.link_type,
         }
 
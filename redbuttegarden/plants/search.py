@@ -0,0 +1,89 @@
+"""
+Indexed search over species and collections.
+
+Species.search_vector holds a weighted tsvector built from the scientific name,
+common names, aliases, genus and family. It is indexed with GIN so searches do
+not compute vectors per row.
+
+Species.full_name, Species.vernacular_name and Collection.plant_id also have
+pg_trgm GIN indexes on UPPER(column), the expression Django's icontains lookup
+compiles to, so substring searches and typeahead suggestions use an index.
+"""
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchVector, TrigramWordSimilarity
+from django.db.models import OuterRef, Q, Subquery
+from django.db.models.functions import Greatest
+
+
+def get_search_config():
+    return getattr(settings, "PLANTS_SEARCH_CONFIG", "english")
+
+
+def species_search_vector():
+    """
+    Weighted search document for a species: scientific name first, then common
+    names and aliases, then genus and family.
+    """
+    config = get_search_config()
+    return (
+        SearchVector("full_name", weight="A", config=config)
+        + SearchVector("vernacular_name", "cultivar", "autolink_aliases", weight="B", config=config)
+        + SearchVector("genus__name", weight="C", config=config)
+        + SearchVector("genus__family__name", weight="D", config=config)
+    )
+
+
+def species_search_query(value):
+    return SearchQuery(value, config=get_search_config())
+
+
+def update_search_vectors(species_queryset):
+    """
+    Recompute search_vector for every species in the queryset with one UPDATE.
+    Returns the number of rows updated.
+    """
+    model = species_queryset.model
+    vectors = (
+        model.objects.filter(pk=OuterRef("pk"))
+        .annotate(vector=species_search_vector())
+        .values("vector")
+    )
+    return species_queryset.update(search_vector=Subquery(vectors))
+
+
+def species_name_q(value, prefix=""):
+    """
+    Substring match on the trigram indexed species name columns.
+    """
+    return Q(**{f"{prefix}full_name__icontains": value}) | Q(
+        **{f"{prefix}vernacular_name__icontains": value}
+    )
+
+
+def suggest_species(species_queryset, value, limit):
+    """
+    Top species by trigram word similarity among those containing value.
+    """
+    return (
+        species_queryset.filter(species_name_q(value))
+        .annotate(
+            rank=Greatest(
+                TrigramWordSimilarity(value, "full_name"),
+                TrigramWordSimilarity(value, "vernacular_name"),
+            )
+        )
+        .order_by("-rank", "full_name")
+        .values("id", "full_name", "vernacular_name", "rank")[:limit]
+    )
+
+
+def suggest_collections(collection_queryset, value, limit):
+    """
+    Top collections by trigram word similarity among plant IDs containing value.
+    """
+    return (
+        collection_queryset.filter(plant_id__icontains=value)
+        .annotate(rank=TrigramWordSimilarity(value, "plant_id"))
+        .order_by("-rank", "plant_id")
+        .values("id", "plant_id", "species__full_name", "rank")[:limit]
+    )
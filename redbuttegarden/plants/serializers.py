@@ -1,6 +1,8 @@
+from django.db import models
 from rest_framework import serializers
 from wagtail.images import get_image_model
 
+from plants.images import get_image_urls
 from plants.models import (
     Collection,
     Family,
@@ -74,6 +76,7 @@ class SpeciesSerializer(serializers.ModelSerializer):
             "bee_friend",
             "high_elevation",
             "arborist_rec",
+            "last_modified",
         ]
         extra_kwargs = {"name": {"validators": []}}
 
@@ -182,6 +185,18 @@ class CollectionSerializer(serializers.ModelSerializer):
         return collection
 
 
+class SpeciesImageURLListSerializer(serializers.ListSerializer):
+    """
+    Looks up the image URLs of a whole page at once, see get_image_urls.
+    """
+
+    def to_representation(self, data):
+        iterable = data.all() if isinstance(data, models.manager.BaseManager) else data
+        iterable = list(iterable)
+        self.child.image_urls = get_image_urls(obj.image for obj in iterable)
+        return super().to_representation(iterable)
+
+
 class SpeciesImageListSerializer(serializers.ModelSerializer):
     species_full_name = serializers.CharField(
         source="species.full_name", read_only=True
@@ -200,10 +215,13 @@ class SpeciesImageListSerializer(serializers.ModelSerializer):
             "image_description",
             "sort_order",
         )
+        list_serializer_class = SpeciesImageURLListSerializer
 
     def get_image_url(self, obj):
-        f = getattr(obj.image, "file", None)
-        return f.url if f else None
+        image_urls = getattr(self, "image_urls", None)
+        if image_urls is None or obj.image_id not in image_urls:
+            image_urls = get_image_urls([obj.image])
+        return image_urls[obj.image_id]
 
     def get_image_description(self, obj):
         # Only if your Image model actually has a 'description' field
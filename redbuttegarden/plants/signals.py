@@ -1,6 +1,18 @@
-from django.db.models.signals import m2m_changed
+from django.core.signals import request_finished, request_started
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
 from django.dispatch import receiver
-from .models import BloomEvent
+from django.utils import timezone
+from .caching import invalidate_facet_choices, invalidate_geojson_cache
+from .in_bloom import invalidate_in_bloom_index, refresh_in_bloom_index
+from .models import (
+    BloomEvent, Collection, Family, GardenArea, Genus, Location, Species, SpeciesImage, Tombstone,
+)
+from .rich_text import clear_plant_link_url_memo, start_plant_link_url_memo
+from .search import update_search_vectors
+from .species_autolinks import (
+    clear_species_autolinker_memo, invalidate_species_autolinkers, start_species_autolinker_memo,
+)
 
 @receiver(m2m_changed, sender=BloomEvent.collections.through)
 def update_title_on_collections_change(sender, instance, action, **kwargs):
@@ -23,3 +35,171 @@ def update_title_on_collections_change(sender, instance, action, **kwargs):
             logger.debug(f'Updating title to: {new_title}')
             instance.title = new_title
             instance.save(update_fields=['title'])
+
+
+@receiver(post_save, sender=Collection)
+@receiver(post_delete, sender=Collection)
+@receiver(post_save, sender=Species)
+@receiver(post_delete, sender=Species)
+@receiver(post_save, sender=Genus)
+@receiver(post_delete, sender=Genus)
+@receiver(post_save, sender=Family)
+@receiver(post_delete, sender=Family)
+@receiver(post_save, sender=GardenArea)
+@receiver(post_delete, sender=GardenArea)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def invalidate_geojson_cache_on_plant_change(sender, instance, **kwargs):
+    invalidate_geojson_cache()
+
+
+@receiver(post_save, sender=Collection)
+@receiver(post_delete, sender=Collection)
+@receiver(post_save, sender=Species)
+@receiver(post_delete, sender=Species)
+@receiver(post_save, sender=Family)
+@receiver(post_delete, sender=Family)
+@receiver(post_save, sender=GardenArea)
+@receiver(post_delete, sender=GardenArea)
+def invalidate_facet_choices_on_plant_change(sender, instance, **kwargs):
+    invalidate_facet_choices()
+
+
+@receiver(post_save, sender=Genus)
+def update_species_search_vectors_on_genus_change(sender, instance, **kwargs):
+    update_search_vectors(Species.objects.filter(genus=instance))
+
+
+@receiver(post_save, sender=Family)
+def update_species_search_vectors_on_family_change(sender, instance, **kwargs):
+    update_search_vectors(Species.objects.filter(genus__family=instance))
+
+
+@receiver(post_save, sender=Species)
+@receiver(post_delete, sender=Species)
+def invalidate_species_autolinkers_on_species_change(sender, instance, update_fields=None, **kwargs):
+    if update_fields is None or instance.autolink_fields & set(update_fields):
+        invalidate_species_autolinkers()
+
+
+@receiver(post_delete, sender=Collection)
+@receiver(post_delete, sender=Species)
+def record_tombstone_on_delete(sender, instance, **kwargs):
+    # Read by API clients syncing with ?since=, see plants.sync
+    Tombstone.objects.create(
+        model=sender._meta.model_name,
+        object_id=instance.pk,
+        key=instance.plant_id if sender is Collection else instance.full_name,
+    )
+
+
+@receiver(request_started)
+def start_plant_link_url_memo_on_request(sender, **kwargs):
+    start_plant_link_url_memo()
+
+
+@receiver(request_started)
+def start_species_autolinker_memo_on_request(sender, **kwargs):
+    start_species_autolinker_memo()
+
+
+@receiver(request_finished)
+def clear_plant_link_url_memo_on_request(sender, **kwargs):
+    clear_plant_link_url_memo()
+
+
+@receiver(request_finished)
+def clear_species_autolinker_memo_on_request(sender, **kwargs):
+    clear_species_autolinker_memo()
+
+
+# Species and collection detail pages are cached on last_modified, so touch it
+# when related objects shown on those pages change. See views.species_detail.
+
+@receiver(post_save, sender=SpeciesImage)
+@receiver(post_delete, sender=SpeciesImage)
+@receiver(post_save, sender=Collection)
+@receiver(post_delete, sender=Collection)
+def touch_species_on_related_change(sender, instance, **kwargs):
+    Species.objects.filter(pk=instance.species_id).update(last_modified=timezone.now())
+
+
+# The collection and species APIs nest these, so touch last_modified for the
+# ?since= sync too. Queryset updates don't send signals, so nothing recurses.
+
+@receiver(post_save, sender=Species)
+@receiver(post_save, sender=Location)
+@receiver(pre_delete, sender=Location)
+@receiver(post_save, sender=GardenArea)
+@receiver(pre_delete, sender=GardenArea)
+def touch_collections_on_related_change(sender, instance, **kwargs):
+    # Before a delete, while the collections still point at it
+    field = {Species: "species", Location: "location", GardenArea: "garden"}[sender]
+    Collection.objects.filter(**{field: instance}).update(last_modified=timezone.now())
+
+
+@receiver(post_save, sender=Genus)
+@receiver(post_save, sender=Family)
+def touch_plants_on_taxon_change(sender, instance, **kwargs):
+    species_lookup = "genus" if sender is Genus else "genus__family"
+    now = timezone.now()
+    Species.objects.filter(**{species_lookup: instance}).update(last_modified=now)
+    Collection.objects.filter(**{f"species__{species_lookup}": instance}).update(last_modified=now)
+
+
+def _touch_bloom_event_plants(collection_ids, species_ids):
+    now = timezone.now()
+    Collection.objects.filter(pk__in=collection_ids).update(last_modified=now)
+    Species.objects.filter(pk__in=species_ids).update(last_modified=now)
+
+
+@receiver(post_save, sender=BloomEvent)
+@receiver(pre_delete, sender=BloomEvent)
+def touch_plants_on_bloom_event_change(sender, instance, **kwargs):
+    collections = instance.collections.values_list("pk", "species_id")
+    _touch_bloom_event_plants(
+        [pk for pk, _ in collections],
+        {species_id for _, species_id in collections} | {instance.species_id},
+    )
+
+
+@receiver(m2m_changed, sender=BloomEvent.collections.through)
+def touch_plants_on_bloom_event_collections_change(sender, instance, action, reverse, pk_set=None, **kwargs):
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if reverse:
+        # Changed from the collection side, instance is a Collection
+        collection_ids = {instance.pk}
+        if action == 'pre_clear':
+            event_ids = set(instance.bloomevent_set.values_list("pk", flat=True))
+        else:
+            event_ids = pk_set
+    else:
+        event_ids = {instance.pk}
+        if action == 'pre_clear':
+            collection_ids = set(instance.collections.values_list("pk", flat=True))
+        else:
+            collection_ids = pk_set
+    _touch_bloom_event_plants(
+        collection_ids,
+        set(Collection.objects.filter(pk__in=collection_ids).values_list("species_id", flat=True)),
+    )
+    # The bloom feeds are validated on last_modified, which m2m changes skip
+    BloomEvent.objects.filter(pk__in=event_ids).update(last_modified=timezone.now())
+
+
+@receiver(post_save, sender=BloomEvent)
+@receiver(post_delete, sender=BloomEvent)
+@receiver(m2m_changed, sender=BloomEvent.collections.through)
+def refresh_in_bloom_index_on_bloom_event_change(sender, instance, action=None, update_fields=None, **kwargs):
+    if action is not None and action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if update_fields is not None and set(update_fields) == {'title'}:
+        return  # set by update_title_on_collections_change, the index has no titles
+    # Nothing reads a stale index in the meantime; rebuild once the change is visible
+    invalidate_in_bloom_index()
+    # A save from the admin sends post_save and m2m_changed, so only queue one
+    # rebuild per transaction
+    connection = transaction.get_connection()
+    if not any(func is refresh_in_bloom_index for _, func, _ in connection.run_on_commit):
+        transaction.on_commit(refresh_in_bloom_index)
@@ -0,0 +1,141 @@
+"""
+Publishing of pre-built plant map GeoJSON to the default storage backend.
+
+Snapshots are written under PLANT_MAP_SNAPSHOT_PREFIX with the hash of their
+uncompressed content in the file name, so they can be cached forever by a CDN.
+A small "latest" manifest records which snapshot (and optional delta) is
+current. It and its standby copy (see replace_json_file) are the only files
+that are ever overwritten.
+"""
+import gzip
+import hashlib
+import json
+import tempfile
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.base import ContentFile
+from django.core.files.storage import storages
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, gzip is always written
+    brotli = None
+
+MANIFEST_NAME = "latest.json"
+SNAPSHOT_SPOOL_SIZE = 8 * 1024 * 1024  # keep snapshots in memory up to 8MB
+
+
+def get_snapshot_storage():
+    return storages["default"]
+
+
+def get_snapshot_prefix():
+    return getattr(settings, "PLANT_MAP_SNAPSHOT_PREFIX", "plants/geojson").strip("/")
+
+
+def get_manifest_name():
+    return f"{get_snapshot_prefix()}/{MANIFEST_NAME}"
+
+
+def _encode_chunks(chunks, spool):
+    """
+    Compress chunks into each spooled file while hashing the raw content.
+    Returns the hex digest and the uncompressed size.
+    """
+    digest = hashlib.sha256()
+    size = 0
+    compressor = brotli.Compressor(quality=11) if "br" in spool else None
+    with gzip.GzipFile(fileobj=spool["gz"], mode="wb", mtime=0) as gz:
+        for chunk in chunks:
+            digest.update(chunk)
+            size += len(chunk)
+            gz.write(chunk)
+            if compressor:
+                spool["br"].write(compressor.process(chunk))
+    if compressor:
+        spool["br"].write(compressor.finish())
+
+    return digest.hexdigest(), size
+
+
+def publish_geojson(basename, chunks, storage=None):
+    """
+    Compress a stream of GeoJSON byte chunks and save it to storage as
+    <prefix>/<basename>.<hash>.geojson.<encoding>. Files whose content is
+    already published are not uploaded again.
+
+    Returns a manifest entry describing the published files.
+    """
+    storage = storage or get_snapshot_storage()
+    encodings = ["gz", "br"] if brotli else ["gz"]
+    spool = {
+        encoding: tempfile.SpooledTemporaryFile(max_size=SNAPSHOT_SPOOL_SIZE)
+        for encoding in encodings
+    }
+    try:
+        sha256, size = _encode_chunks(chunks, spool)
+        content_hash = sha256[:16]
+
+        files = {}
+        for encoding, tmp in spool.items():
+            name = f"{get_snapshot_prefix()}/{basename}.{content_hash}.geojson.{encoding}"
+            if not storage.exists(name):
+                tmp.seek(0)
+                name = storage.save(name, File(tmp, name=name))
+            files[encoding] = {"name": name, "url": storage.url(name)}
+    finally:
+        for tmp in spool.values():
+            tmp.close()
+
+    return {"sha256": sha256, "size": size, "files": files}
+
+
+def _standby_name(name):
+    base, dot, extension = name.rpartition(".")
+    return f"{base}.next.{extension}" if dot else f"{name}.next"
+
+
+def _read_json(storage, name):
+    try:
+        with storage.open(name, "rb") as f:
+            return json.loads(f.read())
+    except FileNotFoundError:
+        return None
+
+
+def read_json_file(name, storage):
+    """
+    Read a JSON file written by replace_json_file, or None if there is none.
+    """
+    data = _read_json(storage, name)
+    if data is None:
+        # Mid-replace: the standby copy already holds the new content
+        data = _read_json(storage, _standby_name(name))
+    return data
+
+
+def _save_json(storage, name, data):
+    # Storages such as MediaStorage never overwrite, so replace the file explicitly
+    if storage.exists(name):
+        storage.delete(name)
+    payload = json.dumps(data, indent=2, sort_keys=True).encode("utf-8")
+    return storage.save(name, ContentFile(payload, name=name))
+
+
+def replace_json_file(name, data, storage):
+    """
+    Replace a JSON file so readers using read_json_file always find a
+    complete copy, old or new. The new content is saved as a standby file
+    first, and name is only deleted while the standby can be read instead.
+    """
+    _save_json(storage, _standby_name(name), data)
+    return _save_json(storage, name, data)
+
+
+def read_manifest(storage=None):
+    return read_json_file(get_manifest_name(), storage or get_snapshot_storage())
+
+
+def write_manifest(manifest, storage=None):
+    return replace_json_file(get_manifest_name(), manifest, storage or get_snapshot_storage())
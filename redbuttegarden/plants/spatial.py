@@ -0,0 +1,66 @@
+"""
+Quadkey based spatial keys for Location bbox lookups.
+
+A spatial key is the web mercator quadkey of the tile containing a point at
+SPATIAL_KEY_ZOOM, read as a base-4 integer. Every tile at a coarser zoom covers
+one contiguous range of keys, so a bbox can be answered with a handful of
+B-tree range scans instead of independent latitude/longitude predicates.
+"""
+import math
+
+SPATIAL_KEY_ZOOM = 24  # ~2.4m tiles at the equator, fits comfortably in a bigint
+MAX_LATITUDE = 85.05112878
+MAX_COVERING_TILES = 16
+
+
+def _tile_xy(longitude, latitude, zoom):
+    n = 1 << zoom
+    latitude = max(-MAX_LATITUDE, min(MAX_LATITUDE, float(latitude)))
+    lat_rad = math.radians(latitude)
+    x = int((float(longitude) + 180.0) / 360.0 * n)
+    y = int((1.0 - math.asinh(math.tan(lat_rad)) / math.pi) / 2.0 * n)
+    return min(max(x, 0), n - 1), min(max(y, 0), n - 1)
+
+
+def _interleave(x, y, zoom):
+    key = 0
+    for i in range(zoom - 1, -1, -1):
+        key = (key << 2) | (((y >> i) & 1) << 1) | ((x >> i) & 1)
+    return key
+
+
+def spatial_key(longitude, latitude, zoom=SPATIAL_KEY_ZOOM):
+    x, y = _tile_xy(longitude, latitude, zoom)
+    return _interleave(x, y, zoom)
+
+
+def _merge_ranges(ranges):
+    merged = []
+    for lo, hi in sorted(ranges):
+        if merged and lo <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(hi, merged[-1][1]))
+        else:
+            merged.append((lo, hi))
+    return merged
+
+
+def covering_key_ranges(west, south, east, north, max_tiles=MAX_COVERING_TILES):
+    """
+    Return merged half-open (lo, hi) spatial key ranges covering a bbox that does
+    not cross the antimeridian. The ranges may over-cover; callers should still
+    apply exact latitude/longitude predicates.
+    """
+    for zoom in range(SPATIAL_KEY_ZOOM, -1, -1):
+        min_x, min_y = _tile_xy(west, north, zoom)
+        max_x, max_y = _tile_xy(east, south, zoom)
+        if (max_x - min_x + 1) * (max_y - min_y + 1) <= max_tiles:
+            break
+
+    span = 4 ** (SPATIAL_KEY_ZOOM - zoom)
+    ranges = []
+    for x in range(min_x, max_x + 1):
+        for y in range(min_y, max_y + 1):
+            prefix = _interleave(x, y, zoom)
+            ranges.append((prefix * span, (prefix + 1) * span))
+
+    return _merge_ranges(ranges)
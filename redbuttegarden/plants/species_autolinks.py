@@ -1,15 +1,95 @@
-from collections import defaultdict
+from collections import defaultdict, deque
 from html import escape
 from html.parser import HTMLParser
-import re
 
+from asgiref.local import Local
+from django.db import transaction
 from django.urls import reverse
 from django.utils.safestring import mark_safe
+from wagtail import blocks
 
+from .caching import bump_cache_version, get_cache_version
 from .models import Species
 
 
 SKIP_LINK_TAGS = {"a", "code", "pre", "script", "style"}
+# Shared by every process through the plants cache; moved on only when the
+# autolink terms may have changed, see plants.signals
+SPECIES_AUTOLINK_VERSION_KEY = "plants:species-autolink:version"
+
+# Linkers built in this process, keyed by kind, as (autolink version, linker)
+_cached_autolinkers = {}
+
+# Linkers already checked against the version during the current request
+_request_autolinkers = Local()
+
+
+def _is_word_char(char):
+    # Matches the definition of \w in a unicode regex
+    return char.isalnum() or char == "_"
+
+
+class TermAutomaton:
+    """
+    Aho-Corasick automaton that finds every occurrence of a fixed set of terms
+    in a single pass over the text, however many terms there are.
+    """
+
+    def __init__(self, terms):
+        # Node 0 is the root; each node has its transitions, failure link, the
+        # length of the term ending there (0 if none) and a link to the longest
+        # proper suffix node that ends a term (0 if none)
+        self.transitions = [{}]
+        self.failure = [0]
+        self.term_length = [0]
+        self.output = [0]
+
+        for term in terms:
+            self._add_term(term)
+        self._link_nodes()
+
+    def _add_term(self, term):
+        node = 0
+        for char in term:
+            next_node = self.transitions[node].get(char)
+            if next_node is None:
+                next_node = len(self.transitions)
+                self.transitions.append({})
+                self.failure.append(0)
+                self.term_length.append(0)
+                self.output.append(0)
+                self.transitions[node][char] = next_node
+            node = next_node
+        self.term_length[node] = len(term)
+
+    def _link_nodes(self):
+        queue = deque(self.transitions[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self.transitions[node].items():
+                queue.append(child)
+                fallback = self.failure[node]
+                while fallback and char not in self.transitions[fallback]:
+                    fallback = self.failure[fallback]
+                failure = self.transitions[fallback].get(char, 0)
+                self.failure[child] = failure
+                self.output[child] = failure if self.term_length[failure] else self.output[failure]
+
+    def iter_matches(self, text):
+        """
+        Yield (start, end) for every occurrence of every term, including
+        overlapping ones, in order of their end position.
+        """
+        node = 0
+        for index, char in enumerate(text):
+            while node and char not in self.transitions[node]:
+                node = self.failure[node]
+            node = self.transitions[node].get(char, 0)
+
+            match = node if self.term_length[node] else self.output[node]
+            while match:
+                yield index + 1 - self.term_length[match], index + 1
+                match = self.output[match]
 
 
 class SpeciesHTMLAutoLinkParser(HTMLParser):
@@ -72,7 +152,7 @@ class SpeciesAutoLinker:
     def __init__(self, matches, link_renderer=None):
         self.matches = matches
         self.link_renderer = link_renderer or self._render_frontend_link
-        self.pattern = self._compile_pattern(matches)
+        self.automaton = TermAutomaton(matches) if matches else None
 
     @classmethod
     def get_unique_matches_from_database(cls):
@@ -114,17 +194,39 @@ class SpeciesAutoLinker:
 
     @classmethod
     def from_database(cls):
-        return cls(cls.get_unique_match_targets_from_database())
+        return cls._get_cached("frontend", lambda matches: cls(matches))
 
     @classmethod
     def for_rich_text_storage(cls):
-        return cls(
-            cls.get_unique_match_targets_from_database(),
-            link_renderer=cls._render_rich_text_link,
+        return cls._get_cached(
+            "rich_text",
+            lambda matches: cls(matches, link_renderer=cls._render_rich_text_link),
         )
 
+    @classmethod
+    def _get_cached(cls, kind, build):
+        """
+        Return this process's linker of the given kind, rebuilding it from the
+        database only when the species autolink version has moved on. The
+        version is read once per request, however many blocks are linked.
+        """
+        request_linkers = getattr(_request_autolinkers, "linkers", None)
+        if request_linkers is not None and kind in request_linkers:
+            return request_linkers[kind]
+
+        version = get_cache_version(SPECIES_AUTOLINK_VERSION_KEY)
+        cached = _cached_autolinkers.get(kind)
+        if cached is not None and cached[0] == version:
+            autolinker = cached[1]
+        else:
+            autolinker = build(cls.get_unique_match_targets_from_database())
+            _cached_autolinkers[kind] = (version, autolinker)
+        if request_linkers is not None:
+            request_linkers[kind] = autolinker
+        return autolinker
+
     def link_html(self, html):
-        if not html or self.pattern is None:
+        if not html or self.automaton is None:
             return html
 
         parser = SpeciesHTMLAutoLinkParser(self)
@@ -133,15 +235,14 @@ class SpeciesAutoLinker:
         return mark_safe(parser.get_html())
 
     def link_text(self, text):
-        if not text or self.pattern is None:
+        if not text or self.automaton is None:
             return escape(text)
 
         linked_text = []
         last_index = 0
 
-        for match in self.pattern.finditer(text):
-            start, end = match.span()
-            matched_text = match.group(0)
+        for start, end in self._find_matches(text):
+            matched_text = text[start:end]
             matched_target = self.matches[matched_text]
 
             linked_text.append(escape(text[last_index:start]))
@@ -151,12 +252,25 @@ class SpeciesAutoLinker:
         linked_text.append(escape(text[last_index:]))
         return "".join(linked_text)
 
-    def _compile_pattern(self, matches):
-        if not matches:
-            return None
-
-        escaped_terms = sorted((re.escape(term) for term in matches), key=len, reverse=True)
-        return re.compile(rf"(?<!\w)({'|'.join(escaped_terms)})(?!\w)")
+    def _find_matches(self, text):
+        """
+        Yield (start, end) of the terms to link: whole-word occurrences, taking
+        the longest term at the leftmost position and never overlapping.
+        """
+        longest = {}
+        for start, end in self.automaton.iter_matches(text):
+            if start > 0 and _is_word_char(text[start - 1]):
+                continue
+            if end < len(text) and _is_word_char(text[end]):
+                continue
+            if end > longest.get(start, start):
+                longest[start] = end
+
+        last_end = 0
+        for start in sorted(longest):
+            if start >= last_end:
+                last_end = longest[start]
+                yield start, last_end
 
     @staticmethod
     def _render_frontend_link(matched_text, matched_target):
@@ -171,6 +285,28 @@ class SpeciesAutoLinker:
         )
 
 
+def start_species_autolinker_memo():
+    _request_autolinkers.linkers = {}
+
+
+def clear_species_autolinker_memo():
+    _request_autolinkers.linkers = None
+
+
+def invalidate_species_autolinkers():
+    """
+    Drop the linkers cached by this process and, once the change is
+    committed, move the shared autolink version on so other processes
+    rebuild theirs.
+    """
+    _cached_autolinkers.clear()
+    if getattr(_request_autolinkers, "linkers", None) is not None:
+        _request_autolinkers.linkers = {}
+    # Before the commit another process could rebuild from the old terms and
+    # keep them under the new version
+    transaction.on_commit(lambda: bump_cache_version(SPECIES_AUTOLINK_VERSION_KEY))
+
+
 def autolink_rich_text_value(block, rich_text_value, autolinker=None):
     if not rich_text_value:
         return rich_text_value
@@ -182,3 +318,87 @@ def autolink_rich_text_value(block, rich_text_value, autolinker=None):
         return rich_text_value
 
     return block.normalize(str(linked_html))
+
+
+def has_autolinked_blocks(block, autolinked=False):
+    """
+    Whether a block definition contains any rich text that is autolinked when
+    the block is cleaned.
+    """
+    if isinstance(block, blocks.RichTextBlock):
+        return autolinked or getattr(block, "species_autolink", False)
+    if isinstance(block, blocks.ListBlock):
+        return has_autolinked_blocks(block.child_block, autolinked)
+    if isinstance(block, (blocks.BaseStructBlock, blocks.BaseStreamBlock)):
+        autolinked_children = getattr(block, "species_autolink_child_blocks", ())
+        return any(
+            has_autolinked_blocks(child, name in autolinked_children)
+            for name, child in block.child_blocks.items()
+        )
+    return False
+
+
+def autolink_raw_block_value(block, raw_value, autolinker, autolinked=False):
+    """
+    Re-run the autolinker over the rich text in a block's raw JSON value, the
+    way cleaning the block in the editor would, without converting the rest of
+    the value to python. Returns the new raw value and the number of rich text
+    values that changed.
+    """
+    if isinstance(block, blocks.RichTextBlock):
+        if not (autolinked or getattr(block, "species_autolink", False)):
+            return raw_value, 0
+        if not isinstance(raw_value, str) or not raw_value:
+            return raw_value, 0
+        linked_html = str(autolinker.link_html(raw_value))
+        return (linked_html, 1) if linked_html != raw_value else (raw_value, 0)
+
+    if isinstance(block, blocks.ListBlock) and isinstance(raw_value, list):
+        changed = 0
+        items = []
+        for item in raw_value:
+            if isinstance(item, dict) and "id" in item and "value" in item:
+                value, item_changed = autolink_raw_block_value(
+                    block.child_block, item["value"], autolinker, autolinked
+                )
+                item = {**item, "value": value} if item_changed else item
+            else:
+                item, item_changed = autolink_raw_block_value(
+                    block.child_block, item, autolinker, autolinked
+                )
+            items.append(item)
+            changed += item_changed
+        return (items if changed else raw_value), changed
+
+    if isinstance(block, blocks.BaseStructBlock) and isinstance(raw_value, dict):
+        autolinked_children = getattr(block, "species_autolink_child_blocks", ())
+        changed = 0
+        value = dict(raw_value)
+        for name, child in block.child_blocks.items():
+            if name in value:
+                value[name], child_changed = autolink_raw_block_value(
+                    child, value[name], autolinker, name in autolinked_children
+                )
+                changed += child_changed
+        return (value if changed else raw_value), changed
+
+    if isinstance(block, blocks.BaseStreamBlock) and isinstance(raw_value, list):
+        autolinked_children = getattr(block, "species_autolink_child_blocks", ())
+        changed = 0
+        children = []
+        for child in raw_value:
+            child_block = block.child_blocks.get(child.get("type")) if isinstance(child, dict) else None
+            if child_block is not None and "value" in child:
+                value, child_changed = autolink_raw_block_value(
+                    child_block,
+                    child["value"],
+                    autolinker,
+                    child["type"] in autolinked_children,
+                )
+                if child_changed:
+                    child = {**child, "value": value}
+                    changed += child_changed
+            children.append(child)
+        return (children if changed else raw_value), changed
+
+    return raw_value, 0
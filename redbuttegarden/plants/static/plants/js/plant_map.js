@@ -191,7 +191,7 @@ function buildCollectionsGeojsonUrl(map) {
 
     // Copy current query params, excluding UI-only params
     const current = new URLSearchParams(window.location.search);
-    const dropKeys = new Set(["page", "_export", "_hx", "mode"]);
+    const dropKeys = new Set(["page", "_export", "_hx", "mode", "zoom"]);
 
     for (const [k, v] of current.entries()) {
         if (dropKeys.has(k)) continue;
@@ -208,6 +208,9 @@ function buildCollectionsGeojsonUrl(map) {
         );
     } catch (e) { }
 
+    // Server returns pre-aggregated clusters up to its cluster max zoom
+    url.searchParams.set("zoom", Math.floor(map.getZoom()));
+
     return url;
 }
 
@@ -235,12 +238,10 @@ function ensureCollectionsSource(map, featureCollection) {
         return;
     }
 
+    // Clusters are computed server-side (see collections_geojson "zoom" param)
     map.addSource('collections', {
         type: 'geojson',
         data: featureCollection,
-        cluster: true,
-        clusterMaxZoom: 17,
-        clusterRadius: 40,
     });
 }
 
@@ -320,17 +321,22 @@ function bindHandlersOnce(map) {
     });
 
     map.on('click', 'clusters', function (e) {
-        const source = map.getSource('collections');
-        if (!source) return;
-
         const features = map.queryRenderedFeatures(e.point, { layers: ['clusters'] });
         if (!features || !features.length) return;
 
-        const clusterId = features[0].properties.cluster_id;
-        source.getClusterExpansionZoom(clusterId, function (err, zoom) {
-            if (err) return;
-            map.easeTo({ center: features[0].geometry.coordinates, zoom: zoom });
-        });
+        // Feature properties come back from Mapbox with arrays serialized as JSON
+        let bbox = features[0].properties.bbox;
+        try {
+            bbox = typeof bbox === "string" ? JSON.parse(bbox) : bbox;
+        } catch {
+            bbox = null;
+        }
+
+        if (Array.isArray(bbox) && bbox.length === 4 && (bbox[0] !== bbox[2] || bbox[1] !== bbox[3])) {
+            map.fitBounds([[bbox[0], bbox[1]], [bbox[2], bbox[3]]], { padding: 40 });
+        } else {
+            map.easeTo({ center: features[0].geometry.coordinates, zoom: map.getZoom() + 2 });
+        }
     });
 
     map.on('click', 'unclustered-point', function (e) {
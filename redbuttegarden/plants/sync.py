@@ -0,0 +1,160 @@
+"""
+Incremental ("delta") sync for the collection and species list APIs.
+
+A list request with ?since=<ISO 8601 datetime> returns the objects modified
+after that time, oldest change first, together with the Tombstones of objects
+deleted since then. Each page carries a cursor for the position after it;
+clients keep requesting with the same since and the last cursor they saw
+until "next" is null, then store that cursor to pick up later changes.
+
+Changes and deletions are merged by timestamp, so every page is a consistent
+slice of history. Only changes older than PLANTS_SYNC_SETTLE_SECONDS are
+returned, so a transaction that commits late with an earlier last_modified
+is not skipped by a client that has already read past it.
+"""
+import heapq
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from .models import Tombstone
+from .pagination import InvalidCursor, dump_cursor, load_cursor, parse_cursor_datetime
+
+SYNC_PAGE_SIZE = 500
+
+
+def get_sync_settle_seconds():
+    return getattr(settings, "PLANTS_SYNC_SETTLE_SECONDS", 30)
+
+
+def parse_since(value):
+    since = parse_datetime(value)
+    if since is None:
+        raise ValidationError({"since": ["Enter an ISO 8601 datetime."]})
+    if timezone.is_naive(since):
+        since = timezone.make_aware(since)
+    return since
+
+
+def _after(queryset, field, position, since):
+    """Rows after a (timestamp, id) keyset position, or after since with no position."""
+    if position is None:
+        return queryset.filter(**{f"{field}__gt": since})
+    timestamp, pk = position
+    return queryset.filter(
+        Q(**{f"{field}__gte": timestamp})
+        & (Q(**{f"{field}__gt": timestamp}) | Q(id__gt=pk))
+    )
+
+
+def _load_position(value):
+    if value is None:
+        return None
+    try:
+        timestamp, pk = value
+        return parse_cursor_datetime(timestamp), int(pk)
+    except (TypeError, ValueError):
+        raise InvalidCursor(value)
+
+
+def _dump_position(position):
+    if position is None:
+        return None
+    timestamp, pk = position
+    return [timestamp.isoformat(), pk]
+
+
+def get_changes(queryset, since, cursor, page_size, until):
+    """
+    Return (changed objects, tombstones, next cursor, has_more) for the page
+    of changes to queryset's model after since, or after the cursor position.
+    """
+    model_name = queryset.model._meta.model_name
+    position = load_cursor(cursor) if cursor else {}
+    if not isinstance(position, dict):
+        raise InvalidCursor(cursor)
+    changed_position = _load_position(position.get("m"))
+    deleted_position = _load_position(position.get("d"))
+
+    changed = _after(queryset, "last_modified", changed_position, since)
+    changed = changed.filter(last_modified__lte=until).order_by("last_modified", "id")
+    deleted = _after(Tombstone.objects.filter(model=model_name), "deleted_on", deleted_position, since)
+    deleted = deleted.filter(deleted_on__lte=until).order_by("deleted_on", "id")
+
+    candidates = heapq.merge(
+        ((obj.last_modified, 0, obj.pk, obj) for obj in changed[:page_size + 1]),
+        ((tombstone.deleted_on, 1, tombstone.pk, tombstone) for tombstone in deleted[:page_size + 1]),
+        key=lambda item: item[:3],
+    )
+    objects, tombstones = [], []
+    has_more = False
+    for timestamp, kind, pk, item in candidates:
+        if len(objects) + len(tombstones) == page_size:
+            has_more = True
+            break
+        if kind == 0:
+            objects.append(item)
+            changed_position = (timestamp, pk)
+        else:
+            tombstones.append(item)
+            deleted_position = (timestamp, pk)
+
+    next_cursor = dump_cursor({
+        "m": _dump_position(changed_position),
+        "d": _dump_position(deleted_position),
+    })
+    return objects, tombstones, next_cursor, has_more
+
+
+class DeltaSyncMixin:
+    """
+    For list API views: with ?since=, list changes and deletions since then
+    instead of the usual page. The view's filters apply to changed objects,
+    but every deletion of the model is listed.
+    """
+
+    sync_page_size = SYNC_PAGE_SIZE
+    sync_cursor_query_param = "cursor"
+
+    def list(self, request, *args, **kwargs):
+        if "since" not in request.query_params:
+            return super().list(request, *args, **kwargs)
+
+        since = parse_since(request.query_params["since"])
+        cursor = request.query_params.get(self.sync_cursor_query_param)
+        until = timezone.now() - timedelta(seconds=get_sync_settle_seconds())
+        queryset = self.filter_queryset(self.get_queryset())
+        try:
+            objects, tombstones, next_cursor, has_more = get_changes(
+                queryset, since, cursor, self.sync_page_size, until
+            )
+        except InvalidCursor:
+            raise NotFound("Invalid cursor")
+
+        serializer = self.get_serializer(objects, many=True)
+        next_link = None
+        if has_more:
+            next_link = replace_query_param(
+                request.build_absolute_uri(), self.sync_cursor_query_param, next_cursor
+            )
+        return Response(
+            {
+                "next": next_link,
+                "cursor": next_cursor,
+                "results": serializer.data,
+                "deleted": [
+                    {
+                        "id": tombstone.object_id,
+                        "key": tombstone.key,
+                        "deleted_on": tombstone.deleted_on.isoformat(),
+                    }
+                    for tombstone in tombstones
+                ],
+            }
+        )
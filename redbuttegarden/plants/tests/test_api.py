@@ -159,7 +159,7 @@ def test_species_image_setting(species):
     img_one_file_obj = BytesIO()
     img_two_file_obj = BytesIO()
     image_one = Image.new('RGB', size=(1, 1), color=(256, 0, 0))
-    image_two = Image.new('RGB', size=(1, 1), color=(256, 0, 0))
+    image_two = Image.new('RGB', size=(1, 1), color=(0, 0, 256))
     image_one.save(img_one_file_obj, 'jpeg')
     image_two.save(img_two_file_obj, 'jpeg')
     img_one_file_obj.seek(0)
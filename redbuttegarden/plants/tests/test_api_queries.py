@@ -0,0 +1,93 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from plants.api_fields import parse_fields
+from plants.models import Collection, Species
+from plants.tests.utils import get_collection
+
+
+def _count_queries(client, url, params=None):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url, params or {})
+    assert response.status_code == 200, response.content
+    return len(queries), response.json()
+
+
+def _make_collections(count, start=0):
+    for i in range(start, start + count):
+        get_collection(
+            plant_id=f"Q-{i}",
+            code=f"Q-{i}",
+            latitude=40 + i,
+            family_name=f"Family {i}",
+            genus_name=f"Genus {i}",
+            species_name=f"species{i}",
+            full_name=f"Genus{i} species{i}",
+        )
+
+
+# One query authenticates the token; list endpoints add a count for pagination
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("url_name, expected", [
+    ("plants:api-species-list", 3),
+    ("plants:api-collection-list", 2),
+    ("plants:genus-list", 3),
+    ("plants:family-list", 3),
+    ("plants:location-list", 3),
+])
+def test_list_query_count_does_not_grow_with_rows(drf_client_with_user, url_name, expected):
+    url = reverse(url_name)
+    _make_collections(1)
+    one_row, _ = _count_queries(drf_client_with_user, url)
+    _make_collections(4, start=1)
+    five_rows, data = _count_queries(drf_client_with_user, url)
+
+    assert len(data["results"]) == 5
+    assert one_row == five_rows == expected
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("url_name, model", [
+    ("plants:api-species-detail", Species),
+    ("plants:api-collection-detail", Collection),
+])
+def test_detail_reads_nested_objects_in_one_query(drf_client_with_user, url_name, model):
+    _make_collections(1)
+    url = reverse(url_name, args=[model.objects.get().pk])
+
+    queries, _ = _count_queries(drf_client_with_user, url)
+
+    assert queries == 2
+
+
+@pytest.mark.django_db
+def test_sparse_fieldset_limits_fields_and_joins(drf_client_with_user):
+    _make_collections(2)
+    url = reverse("plants:api-collection-list")
+
+    with CaptureQueriesContext(connection) as queries:
+        data = drf_client_with_user.get(url, {"fields": "id,plant_id,species.full_name"}).json()
+
+    assert data["results"][0].keys() == {"id", "plant_id", "species"}
+    assert data["results"][0]["species"].keys() == {"full_name"}
+    collection_sql = queries[-1]["sql"]
+    assert "plants_species" in collection_sql
+    assert "plants_genus" not in collection_sql
+    assert "plants_location" not in collection_sql
+
+
+@pytest.mark.django_db
+def test_sparse_fieldset_rejects_unknown_fields(drf_client_with_user):
+    response = drf_client_with_user.get(reverse("plants:api-species-list"), {"fields": "id,genus.nope"})
+
+    assert response.status_code == 400
+    assert response.json() == {"fields": ["Unknown field: genus.nope"]}
+
+
+def test_parse_fields_prefers_whole_fields_over_subsets():
+    assert parse_fields("id, genus.name,genus.family.name,genus") == {"id": None, "genus": None}
+    assert parse_fields("genus,genus.name") == {"genus": None}
+    assert parse_fields("genus.name,genus.family.name") == {"genus": {"name": None, "family": {"name": None}}}
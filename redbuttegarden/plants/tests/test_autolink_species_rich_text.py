@@ -0,0 +1,67 @@
+import pytest
+from django.core.management import call_command
+from wagtail.models import Page
+
+from home.models import GeneralPage
+from plants.tests.utils import get_family, get_genus, get_species
+
+
+def _paragraph(html):
+    return {
+        'type': 'paragraph',
+        'value': {'alignment': 'left', 'background_color': 'default', 'paragraph': html},
+    }
+
+
+@pytest.fixture
+def pages():
+    root = Page.get_first_root_node()
+    return [
+        root.add_child(instance=GeneralPage(
+            title='Maples',
+            slug='maples',
+            body=[_paragraph('<p>Acer rubrum grows by the pond.</p>')],
+        )),
+        root.add_child(instance=GeneralPage(
+            title='Oaks',
+            slug='oaks',
+            body=[_paragraph('<p>No maples here.</p>')],
+        )),
+    ]
+
+
+@pytest.fixture
+def acer_rubrum():
+    genus = get_genus(get_family(name='Sapindaceae'), name='Acer')
+    return get_species(genus, name='rubrum', full_name='Acer rubrum', cultivar=None)
+
+
+def _paragraph_html(page):
+    page = GeneralPage.objects.get(pk=page.pk)
+    return page.body.raw_data[0]['value']['paragraph']
+
+
+@pytest.mark.django_db
+def test_links_new_species_in_existing_pages(pages, acer_rubrum):
+    call_command('autolink_species_rich_text', workers=1, model=['home.GeneralPage'])
+
+    assert _paragraph_html(pages[0]) == (
+        f'<p><a linktype="species" id="{acer_rubrum.pk}">Acer rubrum</a> grows by the pond.</p>'
+    )
+    assert _paragraph_html(pages[1]) == '<p>No maples here.</p>'
+
+
+@pytest.mark.django_db
+def test_dry_run_reports_changes_without_writing(pages, acer_rubrum, capsys):
+    call_command('autolink_species_rich_text', workers=1, dry_run=True, model=['home.GeneralPage'])
+
+    assert 'home.GeneralPage: 2 rows scanned, 1 changed (1 rich text values)' in capsys.readouterr().out
+    assert _paragraph_html(pages[0]) == '<p>Acer rubrum grows by the pond.</p>'
+
+
+@pytest.mark.django_db
+def test_worker_processes(pages, acer_rubrum, capsys):
+    call_command('autolink_species_rich_text', workers=2, batch_size=1, model=['home.GeneralPage'])
+
+    assert 'Updated 1 of 2 rows' in capsys.readouterr().out
+    assert 'linktype="species"' in _paragraph_html(pages[0])
@@ -0,0 +1,96 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from plants.models import BloomEvent
+from plants.tests.utils import get_collection
+
+
+def _make_events(count, bloom_start):
+    for i in range(count):
+        collection = get_collection(plant_id=f"FEED-{bloom_start}-{i}", code=f"F-{bloom_start}-{i}", latitude=41 + i)
+        event = BloomEvent.objects.create(
+            title=f"Event {bloom_start} {i}", description="Blooming", bloom_start=bloom_start
+        )
+        event.collections.add(collection)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("url_name", ["plants:bloom-ical", "plants:bloom-rss"])
+def test_feed_query_count_does_not_grow_with_events(client, url_name):
+    today = timezone.localdate()
+    _make_events(1, today)
+    client.get(reverse(url_name))  # warm up lookups that are cached per process
+    with CaptureQueriesContext(connection) as one_event:
+        assert client.get(reverse(url_name)).status_code == 200
+    _make_events(4, today - timedelta(days=1))
+    with CaptureQueriesContext(connection) as five_events:
+        response = client.get(reverse(url_name))
+
+    assert response.content.count(b"Event ") >= 5
+    assert len(one_event) == len(five_events) == 3
+
+
+@pytest.mark.django_db
+def test_ical_days_window_leaves_out_old_events(client):
+    today = timezone.localdate()
+    _make_events(1, today - timedelta(days=400))
+    _make_events(1, today - timedelta(days=10))
+
+    everything = client.get(reverse("plants:bloom-ical")).content.decode()
+    recent = client.get(reverse("plants:bloom-ical"), {"days": "365"}).content.decode()
+
+    assert everything.count("BEGIN:VEVENT") == 2
+    assert recent.count("BEGIN:VEVENT") == 1
+    assert f"Event {today - timedelta(days=10)} 0" in recent
+
+
+@pytest.mark.django_db
+def test_ical_feed_is_cached_and_revalidated(client, locmem_cache):
+    _make_events(1, timezone.localdate())
+    url = reverse("plants:bloom-ical")
+
+    first = client.get(url)
+    assert first["ETag"] and first["Last-Modified"]
+    assert first["Content-Disposition"] == 'attachment; filename="bloom_events.ics"'
+
+    # A cached body costs only the validator query
+    with CaptureQueriesContext(connection) as queries:
+        again = client.get(url)
+    assert len(queries) == 1
+    assert again.content == first.content
+    assert again["Content-Type"] == first["Content-Type"]
+
+    assert client.get(url, HTTP_IF_NONE_MATCH=first["ETag"]).status_code == 304
+
+    # Deleting an event changes the validators even though max(last_modified) may not
+    BloomEvent.objects.get().delete()
+    changed = client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+    assert changed.status_code == 200
+    assert b"BEGIN:VEVENT" not in changed.content
+
+
+@pytest.mark.django_db
+def test_ical_feed_validators_follow_linked_collections(client, locmem_cache):
+    _make_events(1, timezone.localdate())
+    url = reverse("plants:bloom-ical")
+    event = BloomEvent.objects.get()
+    etag = client.get(url)["ETag"]
+
+    # Linking a collection moves the event on
+    event.collections.add(get_collection(plant_id="FEED-NEW", code="F-NEW", latitude=50))
+    changed = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert changed.status_code == 200
+    etag = changed["ETag"]
+
+    # So does a change to a linked collection's location, via its last_modified
+    location = event.collections.get(plant_id="FEED-NEW").location
+    location.latitude = 51
+    location.save()
+    changed = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert changed.status_code == 200
+    assert changed["ETag"] != etag
@@ -0,0 +1,131 @@
+import copy
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from plants.models import Collection, Location, Species
+from plants.spatial import spatial_key
+from plants.tests.utils import get_genus, get_family
+
+RECORD = {
+    "species": {
+        "genus": {"family": {"name": "Salicaceae"}, "name": "Populus"},
+        "name": "fremontii",
+        "full_name": "Populus fremontii",
+        "subspecies": None,
+        "variety": None,
+        "subvariety": None,
+        "forma": None,
+        "subforma": None,
+        "cultivar": None,
+        "vernacular_name": "Fremont Cottonwood",
+        "habit": "Deciduous Tree",
+        "hardiness": [4, 5, 6],
+        "water_regime": "Moderate",
+        "exposure": "Full Sun",
+        "bloom_time": None,
+        "plant_size": None,
+        "flower_color": None,
+        "utah_native": True,
+        "plant_select": False,
+        "deer_resist": False,
+        "rabbit_resist": False,
+        "bee_friend": False,
+        "high_elevation": False,
+        "arborist_rec": False,
+    },
+    "garden": {"area": "Arboretum", "name": "Water Pavilion", "code": "WP-01"},
+    "location": {"latitude": "40.766367", "longitude": "-111.823807"},
+    "plant_date": "2001-04-05",
+    "plant_id": "2001-0001*1",
+    "commemoration_category": None,
+    "commemoration_person": None,
+}
+
+
+def _record(plant_id, latitude="40.766367", **species):
+    record = copy.deepcopy(RECORD)
+    record["plant_id"] = plant_id
+    record["location"]["latitude"] = latitude
+    record["species"].update(species)
+    return record
+
+
+def _post(client, records):
+    response = client.post(reverse("plants:api-collection-bulk"), records, format="json")
+    assert response.status_code == 200
+    return response.json()
+
+
+@pytest.mark.django_db
+def test_bulk_upsert_creates_and_updates(drf_client_with_user):
+    # An existing species with NULL name parts must be matched, not duplicated
+    existing = Species.objects.create(
+        genus=get_genus(get_family("Salicaceae"), "Populus"),
+        name="fremontii",
+        full_name="Populus fremontii",
+        vernacular_name="Old name",
+    )
+
+    data = _post(drf_client_with_user, [_record("A"), _record("B", latitude="40.7664")])
+
+    assert (data["created"], data["updated"], data["error"]) == (2, 0, 0)
+    assert [r["plant_id"] for r in data["results"]] == ["A", "B"]
+    assert Species.objects.count() == 1
+    existing.refresh_from_db()
+    assert existing.vernacular_name == "Fremont Cottonwood"
+    assert Species.objects.filter(search_vector="cottonwood").exists()
+    location = Location.objects.get(latitude="40.766400")
+    assert location.spatial_key == spatial_key(location.longitude, location.latitude)
+
+    data = _post(
+        drf_client_with_user,
+        [_record("A", vernacular_name="Cottonwood"), _record("A", vernacular_name="Fremont's Cottonwood")],
+    )
+
+    assert [r["status"] for r in data["results"]] == ["updated", "updated"]
+    assert data["results"][0]["id"] == Collection.objects.get(plant_id="A").pk
+    # Later records win, as they would with one request per record
+    assert Species.objects.get().vernacular_name == "Fremont's Cottonwood"
+    assert Collection.objects.count() == 2
+
+
+@pytest.mark.django_db
+def test_bulk_upsert_reports_invalid_records(drf_client_with_user):
+    bad_date = _record("BAD-DATE")
+    bad_date["plant_date"] = "not a date"
+    bad_location = _record("BAD-LOCATION", latitude="north")
+
+    data = _post(drf_client_with_user, [bad_date, _record("GOOD"), bad_location])
+
+    assert [r["status"] for r in data["results"]] == ["error", "created", "error"]
+    assert "plant_date" in data["results"][0]["errors"]
+    assert "location" in data["results"][2]["errors"]
+    assert list(Collection.objects.values_list("plant_id", flat=True)) == ["GOOD"]
+
+
+@pytest.mark.django_db
+def test_bulk_upsert_query_count_does_not_grow_with_records(drf_client_with_user):
+    def count_queries(prefix, n):
+        records = [
+            _record(f"{prefix}-{i}", latitude=f"40.{i:06d}", cultivar=f"{prefix}{i % 5}")
+            for i in range(n)
+        ]
+        with CaptureQueriesContext(connection) as queries:
+            _post(drf_client_with_user, records)
+        return len(queries)
+
+    # Family and genus are created by the first request only
+    count_queries("WARM", 1)
+    assert count_queries("SMALL", 5) == count_queries("LARGE", 200)
+
+
+@pytest.mark.django_db
+def test_bulk_upsert_rejects_non_list(drf_client_with_user):
+    response = drf_client_with_user.post(
+        reverse("plants:api-collection-bulk"), RECORD, format="json"
+    )
+
+    assert response.status_code == 400
@@ -0,0 +1,113 @@
+import json
+import pytest
+from django.urls import reverse
+
+from plants.models import Collection
+from plants.tests.utils import get_collection
+from plants.utils import abbreviate_point_count
+
+
+def _get_geojson(client, params):
+    response = client.get(reverse("plants:api-collections-geojson"), params)
+    assert response.status_code == 200
+    return json.loads(response.getvalue())
+
+
+def _make_collections():
+    # Two collections a few meters apart and one across the garden
+    get_collection(latitude=40.766300, longitude=-111.823800, plant_id="C-1")
+    get_collection(latitude=40.766310, longitude=-111.823810, plant_id="C-2")
+    get_collection(latitude=40.770000, longitude=-111.810000, plant_id="C-3")
+
+
+@pytest.mark.django_db
+def test_geojson_without_zoom_returns_individual_features(client):
+    _make_collections()
+
+    features = _get_geojson(client, {})["features"]
+
+    assert len(features) == 3
+    assert not any(f["properties"].get("cluster") for f in features)
+
+
+@pytest.mark.django_db
+def test_geojson_low_zoom_returns_clusters_with_counts(client):
+    _make_collections()
+
+    features = _get_geojson(client, {"zoom": 3})["features"]
+
+    assert len(features) == 1
+    cluster = features[0]["properties"]
+    assert cluster["cluster"] is True
+    assert cluster["point_count"] == 3
+    assert cluster["point_count_abbreviated"] == "3"
+    west, south, east, north = cluster["bbox"]
+    assert west == pytest.approx(-111.823810)
+    assert east == pytest.approx(-111.810000)
+    assert south == pytest.approx(40.766300)
+    assert north == pytest.approx(40.770000)
+
+
+@pytest.mark.django_db
+def test_geojson_cluster_singletons_are_regular_features(client):
+    _make_collections()
+
+    features = _get_geojson(client, {"zoom": 14})["features"]
+
+    clusters = [f for f in features if f["properties"].get("cluster")]
+    singles = [f for f in features if not f["properties"].get("cluster")]
+    assert [c["properties"]["point_count"] for c in clusters] == [2]
+    assert len(singles) == 1
+    assert singles[0]["properties"]["habit"] == "Deciduous Shrub"
+
+
+@pytest.mark.django_db
+def test_geojson_clusters_honor_collection_filter(client):
+    _make_collections()
+    get_collection(
+        latitude=40.766305,
+        longitude=-111.823805,
+        plant_id="C-4",
+        species_name="canadensis",
+        full_name="Cercis canadensis",
+    )
+
+    features = _get_geojson(client, {"zoom": 3, "scientific_name": "Cercis"})["features"]
+
+    assert len(features) == 1
+    assert "cluster" not in features[0]["properties"]
+
+
+@pytest.mark.django_db
+def test_geojson_zoom_above_threshold_returns_individual_features(client, settings):
+    settings.PLANT_MAP_CLUSTER_MAX_ZOOM = 10
+    _make_collections()
+
+    features = _get_geojson(client, {"zoom": 11})["features"]
+
+    assert len(features) == 3
+
+
+@pytest.mark.django_db
+def test_geojson_invalid_zoom_returns_400(client):
+    response = client.get(reverse("plants:api-collections-geojson"), {"zoom": "near"})
+
+    assert response.status_code == 400
+
+
+def test_abbreviate_point_count_matches_mapbox():
+    assert abbreviate_point_count(999) == "999"
+    assert abbreviate_point_count(1250) == "1.3k"
+    assert abbreviate_point_count(3000) == "3k"
+    assert abbreviate_point_count(15300) == "15k"
+
+
+@pytest.mark.django_db
+def test_geojson_cluster_singletons_are_capped(client, monkeypatch):
+    monkeypatch.setattr("plants.views.MAX_FEATURES", 1)
+    _make_collections()
+
+    features = _get_geojson(client, {"zoom": 18})["features"]
+
+    newest = Collection.objects.get(plant_id="C-3")
+    assert [f["properties"]["id"] for f in features] == [newest.pk]
@@ -0,0 +1,61 @@
+import json
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from plants.models import Species
+from plants.tests.utils import get_collection
+
+
+def _facet_counts(facets, name):
+    return {item["label"]: item["count"] for item in facets[name]}
+
+
+@pytest.mark.django_db
+def test_facet_counts_follow_current_filter(client):
+    get_collection(plant_id="F-1", habit="Tree", bloom_time=["Early May", "Late May", "June"])
+    get_collection(
+        plant_id="F-2",
+        family_name="Rosaceae",
+        genus_name="Rosa",
+        species_name="woodsii",
+        full_name="Rosa woodsii",
+        habit="Shrub",
+        bloom_time=["Mid June"],
+    )
+    get_collection(plant_id="F-3", habit="Tree", bloom_time=["Early May", "Late May", "June"])
+
+    url = reverse("plants:api-collection-facets")
+    with CaptureQueriesContext(connection) as queries:
+        data = json.loads(client.get(url).content)
+
+    grouped = [q for q in queries if "GROUP BY" in q["sql"]]
+    assert len(grouped) == 1
+    assert data["count"] == 3
+    assert _facet_counts(data["facets"], "habits") == {"Tree": 2, "Shrub": 1}
+    # Several tokens in one month count the collection once
+    assert _facet_counts(data["facets"], "bloom_months") == {"May": 2, "June": 3}
+    assert _facet_counts(data["facets"], "family_name")["Rosaceae"] == 1
+
+    data = json.loads(client.get(url, {"habits": "Shrub"}).content)
+    assert data["count"] == 1
+    assert _facet_counts(data["facets"], "bloom_months") == {"June": 1}
+
+
+@pytest.mark.django_db
+def test_facet_counts_are_cached_until_plants_change(client, locmem_cache):
+    collection = get_collection(plant_id="F-1", habit="Tree")
+    url = reverse("plants:api-collection-facets")
+    client.get(url)
+
+    with CaptureQueriesContext(connection) as queries:
+        client.get(url)
+    assert len(queries) == 0
+
+    species = Species.objects.get(pk=collection.species_id)
+    species.habit = "Shrub"
+    species.save()
+    data = json.loads(client.get(url).content)
+    assert _facet_counts(data["facets"], "habits") == {"Shrub": 1}
@@ -0,0 +1,148 @@
+import pytest
+from django.db import connection
+from django.http import QueryDict
+from django.urls import reverse
+from django.utils import timezone
+
+from plants import pagination
+from plants.models import Collection
+from plants.pagination import InvalidCursor, get_approximate_count, paginate_keyset
+from plants.tests.utils import get_collection
+
+
+@pytest.fixture
+def collections():
+    """Seven collections, two of which share a created_on timestamp."""
+    created = [get_collection(plant_id=f"KEY-{i}", code=f"K-{i}") for i in range(7)]
+    tied = timezone.now()
+    Collection.objects.filter(pk__in=[created[2].pk, created[3].pk]).update(created_on=tied)
+    return list(Collection.objects.order_by("-created_on", "-id").values_list("plant_id", flat=True))
+
+
+def _plant_ids(page):
+    return [collection.plant_id for collection in page.object_list]
+
+
+@pytest.mark.django_db
+def test_keyset_pages_walk_forward_and_back(collections):
+    qs = Collection.objects.all()
+
+    first = paginate_keyset(qs, None, 3)
+    second = paginate_keyset(qs, first.next_cursor, 3)
+    third = paginate_keyset(qs, second.next_cursor, 3)
+
+    assert _plant_ids(first) + _plant_ids(second) + _plant_ids(third) == collections
+    assert (first.start, second.start, third.start) == (0, 3, 6)
+    assert first.previous_cursor is None
+    assert third.next_cursor is None
+
+    back = paginate_keyset(qs, third.previous_cursor, 3)
+    assert _plant_ids(back) == _plant_ids(second)
+    assert back.start == 3
+    # The page before the second page is the first page, which has no cursor
+    assert back.previous_cursor == ""
+
+
+@pytest.mark.django_db
+def test_keyset_pages_keep_filters(collections):
+    wanted = ["KEY-1", "KEY-3", "KEY-5"]
+    qs = Collection.objects.filter(plant_id__in=wanted)
+
+    first = paginate_keyset(qs, None, 2)
+    second = paginate_keyset(qs, first.next_cursor, 2)
+
+    assert _plant_ids(first) + _plant_ids(second) == [p for p in collections if p in wanted]
+
+
+def test_invalid_cursor_is_rejected():
+    with pytest.raises(InvalidCursor):
+        paginate_keyset(Collection.objects.all(), "not-a-cursor", 10)
+
+
+@pytest.mark.django_db
+def test_list_shows_range_and_links_to_next_page(client, collections):
+    url = reverse("plants:collection-results")
+    first = paginate_keyset(Collection.objects.all(), None, 5)
+
+    resp = client.get(url, {"plant_id": "KEY", "cursor": first.next_cursor})
+
+    assert resp.status_code == 200
+    assert resp.context["table_start"] == 6
+    assert resp.context["table_end"] == 7
+    assert resp.context["table_total"] == 7
+    assert not resp.context["total_approximate"]
+    assert resp.context["next_url"] is None
+    assert resp.context["previous_url"] == f"{url}?plant_id=KEY"
+    assert [row.record.plant_id for row in resp.context["table"].rows] == collections[5:]
+
+
+@pytest.mark.django_db
+def test_list_falls_back_to_first_page_for_invalid_cursor(client, collections):
+    resp = client.get(reverse("plants:collection-results"), {"cursor": "bogus"})
+
+    assert resp.status_code == 200
+    assert resp.context["table_start"] == 1
+
+
+@pytest.mark.django_db
+def test_list_sorted_by_column_pages_by_offset(client, collections):
+    resp = client.get(reverse("plants:collection-results"), {"plant_id": "KEY", "sort": "-plant_id"})
+
+    assert resp.status_code == 200
+    assert [row.record.plant_id for row in resp.context["table"].rows] == sorted(collections, reverse=True)
+    assert resp.context["table"].page.number == 1
+    assert resp.context["next_url"] is None
+    assert resp.context["table_total"] == 7
+
+
+@pytest.mark.django_db
+def test_list_total_is_keyed_on_the_request_params(client, locmem_cache, collections):
+    url = reverse("plants:collection-results")
+    assert client.get(url).context["table_total"] == 7
+
+    # An invalid filter value leaves the form unbound to a querystring, but
+    # the valid ones still filter the rows
+    resp = client.get(url, {"plant_id": "KEY-1", "garden_name": "Nowhere"})
+
+    assert resp.context["table_total"] == 1
+
+
+@pytest.mark.django_db
+def test_unfiltered_total_uses_planner_estimate(monkeypatch, collections):
+    monkeypatch.setattr(pagination, "COUNT_ESTIMATE_THRESHOLD", 1)
+    with connection.cursor() as cursor:
+        cursor.execute(f"ANALYZE {Collection._meta.db_table}")
+
+    assert get_approximate_count(Collection.objects.all(), QueryDict()) == (7, True)
+    assert get_approximate_count(
+        Collection.objects.filter(plant_id="KEY-1"), QueryDict("plant_id=KEY-1")
+    ) == (1, False)
+
+
+@pytest.mark.django_db
+def test_filtered_total_is_cached_per_filter(locmem_cache, django_assert_num_queries, collections):
+    qs = Collection.objects.filter(plant_id__startswith="KEY")
+    params = QueryDict("plant_id=KEY")
+
+    assert get_approximate_count(qs, params) == (7, False)
+    with django_assert_num_queries(0):
+        assert get_approximate_count(qs, params) == (7, False)
+
+    get_collection(plant_id="KEY-7", code="K-7")
+    assert get_approximate_count(qs, params) == (8, False)
+
+
+@pytest.mark.django_db
+def test_api_collection_list_uses_cursor_links(drf_client_with_user, collections, monkeypatch):
+    monkeypatch.setattr(pagination.CollectionCursorPagination, "page_size", 4)
+    url = reverse("plants:api-collection-list")
+
+    first = drf_client_with_user.get(url).json()
+    second = drf_client_with_user.get(first["next"]).json()
+
+    assert [c["plant_id"] for c in first["results"] + second["results"]] == collections
+    assert first["previous"] is None
+    assert second["next"] is None
+    assert second["previous"] == "http://testserver" + url
+
+    assert drf_client_with_user.get(url, {"cursor": "bogus"}).status_code == 404
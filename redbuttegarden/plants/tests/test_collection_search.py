@@ -1,3 +1,4 @@
+import json
 from urllib.parse import urlencode
 
 from django.test import TestCase
@@ -14,7 +15,8 @@ class PlantSearchViewTestCase(TestCase):
             url = f"{url}?{urlencode(params)}"
         response = self.client.get(url)
         self.assertEqual(response.status_code, 200)
-        return response.json()
+        # Streamed responses have no .json(); getvalue() works for both kinds
+        return json.loads(response.getvalue())
 
     def test_collection_search_by_scientific_name(self):
         """
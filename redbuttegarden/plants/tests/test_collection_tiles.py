@@ -0,0 +1,142 @@
+import math
+
+import pytest
+from django.urls import reverse
+
+from plants.tests.utils import get_collection
+from plants.vector_tiles import encode_point_layer, project_to_tile, tile_bounds
+
+
+def _read_varint(data, pos):
+    result = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        shift += 7
+        if not byte & 0x80:
+            return result, pos
+
+
+def _read_fields(data):
+    """Yield (field_number, value) pairs from a protobuf message."""
+    pos = 0
+    while pos < len(data):
+        key, pos = _read_varint(data, pos)
+        field_number, wire_type = key >> 3, key & 0x7
+        if wire_type == 0:
+            value, pos = _read_varint(data, pos)
+        elif wire_type == 1:
+            value, pos = data[pos:pos + 8], pos + 8
+        else:
+            length, pos = _read_varint(data, pos)
+            value, pos = data[pos:pos + length], pos + length
+        yield field_number, value
+
+
+def _decode_layer(tile):
+    layers = [value for field, value in _read_fields(tile) if field == 3]
+    assert len(layers) == 1
+    layer = dict(name=None, features=[], keys=[], values=[])
+    for field, value in _read_fields(layers[0]):
+        if field == 1:
+            layer["name"] = value.decode()
+        elif field == 2:
+            layer["features"].append(value)
+        elif field == 3:
+            layer["keys"].append(value.decode())
+        elif field == 4:
+            layer["values"].append(dict(_read_fields(value)))
+
+    features = []
+    for raw_feature in layer["features"]:
+        tags = []
+        for field, value in _read_fields(raw_feature):
+            if field == 2:
+                pos = 0
+                while pos < len(value):
+                    tag, pos = _read_varint(value, pos)
+                    tags.append(tag)
+        properties = {}
+        for key_index, value_index in zip(tags[::2], tags[1::2]):
+            value = layer["values"][value_index]
+            if 1 in value:
+                properties[layer["keys"][key_index]] = value[1].decode()
+            else:
+                properties[layer["keys"][key_index]] = value.get(5)
+        features.append(properties)
+
+    return layer["name"], features
+
+
+def _tile_for(z, longitude, latitude):
+    n = 1 << z
+    x = int((longitude + 180.0) / 360.0 * n)
+    y = int((1.0 - math.asinh(math.tan(math.radians(latitude))) / math.pi) / 2.0 * n)
+    return x, y
+
+
+def test_tile_bounds_and_projection_agree():
+    west, south, east, north = tile_bounds(1, 0, 0)
+    assert west == -180.0
+    assert east == 0.0
+    assert south == pytest.approx(0.0, abs=1e-9)
+    assert north == pytest.approx(85.0511, abs=1e-4)
+
+    assert project_to_tile(1, 0, 0, west, north) == (0, 0)
+    assert project_to_tile(1, 0, 0, east, 0) == (4096, 4096)
+
+
+def test_encode_point_layer_without_features_is_empty():
+    assert encode_point_layer("collections", [], 0, 0, 0) == b""
+
+
+@pytest.mark.django_db
+def test_collections_tile_contains_located_collections(client):
+    collection = get_collection(latitude=40.766367, longitude=-111.823807, plant_id="TILE-1")
+    z = 16
+    x, y = _tile_for(z, -111.823807, 40.766367)
+
+    response = client.get(reverse("plants:api-collections-tiles", args=[z, x, y]))
+
+    assert response.status_code == 200
+    assert response["Content-Type"] == "application/vnd.mapbox-vector-tile"
+    assert "max-age" in response["Cache-Control"]
+
+    name, features = _decode_layer(response.content)
+    assert name == "collections"
+    assert len(features) == 1
+    assert features[0]["id"] == collection.id
+    assert features[0]["habit"] == collection.species.habit
+    assert features[0]["species_full_name"] == collection.species.full_name
+    assert "planted_on" not in features[0]
+
+
+@pytest.mark.django_db
+def test_collections_tile_honors_collection_filter(client):
+    get_collection(latitude=40.766367, longitude=-111.823807, plant_id="TILE-1")
+    z = 16
+    x, y = _tile_for(z, -111.823807, 40.766367)
+    url = reverse("plants:api-collections-tiles", args=[z, x, y])
+
+    response = client.get(url, {"species_full_name": "does not exist"})
+
+    assert response.status_code == 200
+    assert response.content == b""
+
+
+@pytest.mark.django_db
+def test_collections_tile_outside_features_is_empty(client):
+    get_collection(latitude=40.766367, longitude=-111.823807, plant_id="TILE-1")
+
+    response = client.get(reverse("plants:api-collections-tiles", args=[16, 0, 0]))
+
+    assert response.status_code == 200
+    assert response.content == b""
+
+
+@pytest.mark.django_db
+def test_collections_tile_out_of_range_returns_404(client):
+    response = client.get(reverse("plants:api-collections-tiles", args=[2, 4, 0]))
+
+    assert response.status_code == 404
@@ -0,0 +1,127 @@
+from datetime import timedelta
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+
+from plants.models import Collection, Species, Tombstone
+from plants.tests.utils import get_collection
+from plants.views import CollectionList
+
+
+@pytest.fixture
+def sync_now(settings):
+    settings.PLANTS_SYNC_SETTLE_SECONDS = 0
+
+
+def _set_modified(collection, when):
+    Collection.objects.filter(pk=collection.pk).update(last_modified=when)
+
+
+def _sync(client, url, since, cursor=None):
+    params = {"since": since.isoformat()}
+    if cursor:
+        params["cursor"] = cursor
+    response = client.get(url, params)
+    assert response.status_code == 200, response.content
+    return response.json()
+
+
+@pytest.mark.django_db
+def test_collection_sync_pages_through_changes_and_deletions(drf_client_with_user, sync_now, monkeypatch):
+    monkeypatch.setattr(CollectionList, "sync_page_size", 2)
+    url = reverse("plants:api-collection-list")
+    start = timezone.now() - timedelta(hours=1)
+
+    old = get_collection(plant_id="SYNC-OLD", code="S-0")
+    first = get_collection(plant_id="SYNC-1", code="S-1")
+    second = get_collection(plant_id="SYNC-2", code="S-2")
+    doomed = get_collection(plant_id="SYNC-3", code="S-3")
+    _set_modified(old, start - timedelta(minutes=1))
+    _set_modified(first, start + timedelta(minutes=1))
+    _set_modified(second, start + timedelta(minutes=2))
+    _set_modified(doomed, start + timedelta(minutes=3))
+    doomed_pk = doomed.pk
+    doomed.delete()
+
+    page = _sync(drf_client_with_user, url, start)
+    assert [c["plant_id"] for c in page["results"]] == ["SYNC-1", "SYNC-2"]
+    assert page["deleted"] == []
+    assert page["next"]
+
+    page = drf_client_with_user.get(page["next"]).json()
+    assert page["results"] == []
+    assert [(d["id"], d["key"]) for d in page["deleted"]] == [(doomed_pk, "SYNC-3")]
+    assert page["next"] is None
+
+    # Resuming from the last cursor returns only what changed since
+    cursor = page["cursor"]
+    assert _sync(drf_client_with_user, url, start, cursor) == {
+        "next": None, "cursor": cursor, "results": [], "deleted": [],
+    }
+    _set_modified(old, timezone.now())
+    page = _sync(drf_client_with_user, url, start, cursor)
+    assert [c["plant_id"] for c in page["results"]] == ["SYNC-OLD"]
+
+
+@pytest.mark.django_db
+def test_sync_leaves_out_changes_inside_the_settle_window(drf_client_with_user, settings):
+    settings.PLANTS_SYNC_SETTLE_SECONDS = 60
+    get_collection(plant_id="SYNC-NEW")
+
+    page = _sync(drf_client_with_user, reverse("plants:api-collection-list"), timezone.now() - timedelta(hours=1))
+
+    assert page["results"] == []
+
+
+@pytest.mark.django_db
+def test_species_sync_includes_tombstones(drf_client_with_user, sync_now, genus):
+    start = timezone.now() - timedelta(seconds=1)
+    collection = get_collection(plant_id="SYNC-SP")
+    species = collection.species
+    species_pk = species.pk
+    species.delete()
+
+    page = _sync(drf_client_with_user, reverse("plants:api-species-list"), start)
+
+    assert page["results"] == []
+    assert [d["id"] for d in page["deleted"]] == [species_pk]
+    # Cascaded deletions are recorded too
+    assert Tombstone.objects.filter(model="collection", key="SYNC-SP").exists()
+    assert not Species.objects.filter(pk=species_pk).exists()
+
+
+@pytest.mark.django_db
+def test_sync_includes_collections_whose_related_objects_changed(drf_client_with_user, sync_now):
+    url = reverse("plants:api-collection-list")
+    start = timezone.now() - timedelta(hours=1)
+    collection = get_collection(plant_id="SYNC-LOC")
+    other = get_collection(plant_id="SYNC-OTHER", code="S-9", latitude=41)
+    _set_modified(collection, start - timedelta(minutes=1))
+    _set_modified(other, start - timedelta(minutes=1))
+
+    location = collection.location
+    location.latitude = 40.5
+    location.save()
+
+    page = _sync(drf_client_with_user, url, start)
+    assert [c["plant_id"] for c in page["results"]] == ["SYNC-LOC"]
+
+    genus = collection.species.genus
+    genus.name = "Renamed"
+    genus.save()
+
+    page = _sync(drf_client_with_user, url, start)
+    assert {c["plant_id"] for c in page["results"]} == {"SYNC-LOC", "SYNC-OTHER"}
+    species_page = _sync(drf_client_with_user, reverse("plants:api-species-list"), start)
+    assert collection.species_id in [species["id"] for species in species_page["results"]]
+
+
+@pytest.mark.django_db
+def test_sync_rejects_bad_since_and_cursor(drf_client_with_user):
+    url = reverse("plants:api-collection-list")
+
+    assert drf_client_with_user.get(url, {"since": "yesterday"}).status_code == 400
+    assert drf_client_with_user.get(
+        url, {"since": "2024-01-01T00:00:00Z", "cursor": "bogus"}
+    ).status_code == 404
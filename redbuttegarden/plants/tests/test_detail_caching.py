@@ -0,0 +1,79 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from plants.models import BloomEvent, Collection, Species
+from plants.tests.utils import get_collection, get_garden_area, get_location, get_species
+
+
+@pytest.fixture
+def rose(genus):
+    species = get_species(genus, name="woodsii", full_name="Rosa woodsii", vernacular_name="Woods rose")
+    Collection.objects.create(
+        location=get_location(), garden=get_garden_area(), species=species, plant_id="RG-42"
+    )
+    return Species.objects.get(pk=species.pk)
+
+
+@pytest.mark.django_db
+def test_species_detail_returns_304_for_current_etag(client, rose):
+    url = reverse("plants:species-detail", args=[rose.pk])
+    response = client.get(url)
+    assert response["ETag"]
+    assert response["Last-Modified"]
+
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+
+    assert response.status_code == 304
+    assert len(queries) == 1
+
+
+@pytest.mark.django_db
+def test_species_detail_fragment_is_cached(client, rose, locmem_cache):
+    url = reverse("plants:species-detail", args=[rose.pk])
+    client.get(url)
+
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+
+    assert "RG-42" in response.content.decode("utf-8")
+    # The rest are the site menu in base.html
+    plant_queries = [q for q in queries.captured_queries if "plants_" in q["sql"]]
+    assert len(plant_queries) == 1
+
+
+@pytest.mark.django_db
+def test_species_detail_changes_when_related_objects_change(client, rose, locmem_cache):
+    url = reverse("plants:species-detail", args=[rose.pk])
+    etag = client.get(url)["ETag"]
+
+    Collection.objects.create(
+        location=get_location(), garden=get_garden_area(), species=rose, plant_id="RG-43"
+    )
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert "RG-43" in response.content.decode("utf-8")
+
+    today = timezone.localdate()
+    BloomEvent.objects.create(species=rose, bloom_start=today, bloom_end=today + timedelta(days=1))
+    response = client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+    assert response.status_code == 200
+    assert response.context["in_bloom"]
+
+
+@pytest.mark.django_db
+def test_collection_detail_returns_304_for_current_etag(client):
+    collection = get_collection(plant_id="RG-1")
+    url = reverse("plants:collection-detail", args=[collection.pk])
+    etag = client.get(url)["ETag"]
+
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+    event = BloomEvent.objects.create(bloom_start=timezone.localdate())
+    event.collections.add(collection)
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
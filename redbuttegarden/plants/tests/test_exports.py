@@ -0,0 +1,73 @@
+import csv
+import io
+
+import pytest
+from django.http import StreamingHttpResponse
+from django.urls import reverse
+from django_tables2.export.export import TableExport
+from openpyxl import load_workbook
+
+from plants.filters import CollectionFilter
+from plants.models import Collection
+from plants.tables import CollectionTable
+from plants.tests.utils import get_collection, get_species
+
+
+def _streamed_csv_rows(response):
+    assert isinstance(response, StreamingHttpResponse)
+    content = b"".join(response.streaming_content).decode("utf-8")
+    return list(csv.reader(io.StringIO(content)))
+
+
+@pytest.fixture
+def collections():
+    get_collection(plant_id="EXP-1", code="CG-06")
+    get_collection(plant_id="EXP-2", code="CG-07", ga_name=None)
+    get_collection(plant_id="OTHER-1", code="CG-08")
+
+
+@pytest.mark.django_db
+def test_collection_csv_export_matches_table_export(client, collections):
+    url = reverse("plants:collection-results")
+    resp = client.get(url, {"plant_id": "EXP", "_export": "csv"})
+
+    assert resp.status_code == 200
+    assert resp["Content-Type"] == "text/csv; charset=utf-8"
+    assert 'filename="collections.csv"' in resp["Content-Disposition"]
+
+    qs = CollectionFilter({"plant_id": "EXP"}, queryset=Collection.objects.all()).qs
+    expected = TableExport("csv", CollectionTable(qs)).export()
+    rows = _streamed_csv_rows(resp)
+    assert rows == list(csv.reader(io.StringIO(expected)))
+    assert rows[0] == ["Plant ID", "Full Name", "Garden Name", "Garden Area", "Garden Code"]
+    assert [row[0] for row in rows[1:]] == ["EXP-2", "EXP-1"]
+
+
+@pytest.mark.django_db
+def test_collection_xlsx_export_is_written_in_write_only_mode(client, collections):
+    url = reverse("plants:collection-results")
+    resp = client.get(url, {"plant_id": "EXP", "_export": "xlsx"})
+
+    assert resp.status_code == 200
+    assert resp["Content-Type"] == TableExport.FORMATS["xlsx"]
+    assert 'filename="collections.xlsx"' in resp["Content-Disposition"]
+
+    workbook = load_workbook(io.BytesIO(b"".join(resp.streaming_content)), read_only=True)
+    rows = list(workbook["Export Data"].iter_rows(values_only=True))
+    assert rows[0] == ("Plant ID", "Full Name", "Garden Name", "Garden Area", "Garden Code")
+    assert [row[0] for row in rows[1:]] == ["EXP-2", "EXP-1"]
+    assert rows[1][2] is None  # empty cells stay empty, as with TableExport
+
+
+@pytest.mark.django_db
+def test_top_trees_csv_export_keeps_filters(client, genus):
+    get_species(genus, name="a", full_name="Genus a", vernacular_name="Tree A", habit="Tree", arborist_rec=True)
+    get_species(genus, name="b", full_name="Genus b", vernacular_name="Tree B", habit="Tree", arborist_rec=False)
+
+    resp = client.get(reverse("plants:top-trees"), {"_export": "csv"})
+
+    assert 'filename="top_trees.csv"' in resp["Content-Disposition"]
+    assert _streamed_csv_rows(resp) == [
+        ["Full Name", "Common Name", "Habit"],
+        ["Genus a", "Tree A", "Tree"],
+    ]
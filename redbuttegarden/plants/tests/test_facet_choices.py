@@ -0,0 +1,34 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from plants.filters import CollectionFilter
+from plants.models import Species
+from plants.tests.utils import get_collection
+
+
+@pytest.mark.django_db
+def test_collection_filter_reuses_cached_choices(locmem_cache):
+    get_collection(plant_id="FACET-1")
+    CollectionFilter()
+
+    with CaptureQueriesContext(connection) as queries:
+        filterset = CollectionFilter()
+
+    assert len(queries) == 0
+    assert filterset.form.fields["family_name"].choices[0] == ("", "---------")
+    assert ("Deciduous Shrub", "Deciduous Shrub") in filterset.form.fields["habits"].choices
+
+
+@pytest.mark.django_db
+def test_plant_saves_invalidate_cached_choices(locmem_cache):
+    collection = get_collection(plant_id="FACET-1")
+    CollectionFilter()
+
+    species = Species.objects.get(pk=collection.species_id)
+    species.flower_color = "Red, Yellow ,"
+    species.save()
+    choices = CollectionFilter().form.fields["flower_colors"].choices
+
+    assert ("Red", "Red") in choices
+    assert ("Yellow", "Yellow") in choices
@@ -0,0 +1,83 @@
+import gzip
+import json
+from datetime import timedelta
+
+import pytest
+from django.core.files.storage import storages
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.utils import timezone
+
+from plants.models import Collection
+from plants.snapshots import get_manifest_name, read_manifest
+from plants.tests.utils import get_collection
+
+
+@pytest.fixture
+def snapshot_storage(settings, tmp_path):
+    settings.STORAGES = {
+        **settings.STORAGES,
+        "default": {
+            "BACKEND": "django.core.files.storage.FileSystemStorage",
+            "OPTIONS": {"location": str(tmp_path), "base_url": "/media/"},
+        },
+    }
+    return storages["default"]
+
+
+def _read_published(storage, entry):
+    with storage.open(entry["files"]["gz"]["name"], "rb") as f:
+        return json.loads(gzip.decompress(f.read()))
+
+
+@pytest.mark.django_db
+def test_snapshot_is_content_hashed_and_referenced_by_manifest(snapshot_storage):
+    get_collection(plant_id="SNAP-1")
+
+    call_command("generate_geojson")
+    manifest = read_manifest()
+    snapshot = manifest["snapshot"]
+
+    assert snapshot["count"] == 1
+    assert snapshot["sha256"][:16] in snapshot["files"]["gz"]["name"]
+    assert manifest["delta"] is None
+    features = _read_published(snapshot_storage, snapshot)["features"]
+    assert [f["properties"]["id"] for f in features] == list(Collection.objects.values_list("id", flat=True))
+
+    # Unchanged data publishes to the same file
+    call_command("generate_geojson")
+    assert read_manifest()["snapshot"]["files"] == snapshot["files"]
+
+
+@pytest.mark.django_db
+def test_delta_contains_only_collections_modified_since_snapshot(snapshot_storage):
+    get_collection(plant_id="SNAP-1")
+    call_command("generate_geojson")
+
+    changed = get_collection(plant_id="SNAP-2")
+    Collection.objects.filter(pk=changed.pk).update(last_modified=timezone.now() + timedelta(minutes=1))
+    call_command("generate_geojson", since="latest")
+    manifest = read_manifest()
+
+    assert manifest["delta"]["count"] == 1
+    features = _read_published(snapshot_storage, manifest["delta"])["features"]
+    assert [f["properties"]["id"] for f in features] == [changed.pk]
+    assert manifest["snapshot"]["count"] == 1
+
+
+@pytest.mark.django_db
+def test_delta_requires_a_published_snapshot(snapshot_storage):
+    with pytest.raises(CommandError):
+        call_command("generate_geojson", since="2024-01-01T00:00:00")
+
+
+@pytest.mark.django_db
+def test_manifest_stays_readable_while_it_is_replaced(snapshot_storage):
+    get_collection(plant_id="SNAP-1")
+    call_command("generate_geojson")
+    manifest = read_manifest()
+
+    # The moment between deleting the manifest and saving its replacement
+    snapshot_storage.delete(get_manifest_name())
+
+    assert read_manifest() == manifest
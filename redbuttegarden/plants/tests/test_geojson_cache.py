@@ -0,0 +1,118 @@
+import json
+from decimal import Decimal
+from urllib.parse import urlencode
+
+import pytest
+from django.db import connection
+from django.http import QueryDict
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from plants.caching import (
+    GEOJSON_VERSION_KEY, bump_cache_version, get_cache_version, get_geojson_cache_key, quantize_bbox,
+)
+from plants.models import Collection, Species
+from plants.tests.utils import get_collection
+from plants.utils import get_feature_collection, iter_feature_collection_json
+
+
+def _get_json(client, url):
+    return json.loads(client.get(url).getvalue())
+
+
+def _geojson_url(**params):
+    url = reverse("plants:api-collections-geojson")
+    return f"{url}?{urlencode(params)}" if params else url
+
+
+def test_quantize_bbox_snaps_outward():
+    bbox = quantize_bbox(
+        Decimal("-111.8238"), Decimal("40.76631"), Decimal("-111.8101"), Decimal("40.77009")
+    )
+
+    assert bbox == (
+        Decimal("-111.824"),
+        Decimal("40.766"),
+        Decimal("-111.810"),
+        Decimal("40.771"),
+    )
+
+
+@pytest.mark.django_db
+def test_cache_key_ignores_param_order_and_empty_values(locmem_cache):
+    first = QueryDict("habits=Tree&exposures=Sun&plant_id=")
+    second = QueryDict("exposures=Sun&habits=Tree")
+
+    assert get_geojson_cache_key(first) == get_geojson_cache_key(second)
+    assert get_geojson_cache_key(first) != get_geojson_cache_key(QueryDict("habits=Shrub"))
+
+
+@pytest.mark.django_db
+def test_repeat_geojson_request_skips_database(client, locmem_cache):
+    get_collection(plant_id="CACHE-1")
+    url = _geojson_url(bbox="-112,40,-111,41")
+
+    first = client.get(url)
+    first_content = first.getvalue()
+    with CaptureQueriesContext(connection) as queries:
+        second = client.get(url)
+
+    assert first.status_code == second.status_code == 200
+    assert second.getvalue() == first_content
+    assert len(queries) == 0
+
+
+@pytest.mark.django_db
+def test_nearby_bboxes_share_a_cache_entry(client, locmem_cache):
+    get_collection(plant_id="CACHE-1")
+
+    client.get(_geojson_url(bbox="-112.00001,40.00001,-111.00001,41.00001")).getvalue()
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(_geojson_url(bbox="-112.00002,40.00002,-111.00002,41.00002"))
+
+    assert response.status_code == 200
+    assert len(queries) == 0
+
+
+@pytest.mark.django_db
+def test_plant_changes_invalidate_geojson_cache(client, locmem_cache):
+    collection = get_collection(plant_id="CACHE-1")
+    url = _geojson_url()
+
+    first = _get_json(client, url)
+    assert first["features"][0]["properties"]["vernacular_name"] == "Allgold Warminster Broom"
+
+    Species.objects.filter(pk=collection.species_id).update(vernacular_name="Renamed")
+    # .update() skips signals, so the cached response is still served
+    assert _get_json(client, url) == first
+
+    species = Species.objects.get(pk=collection.species_id)
+    species.save()
+    assert _get_json(client, url)["features"][0]["properties"]["vernacular_name"] == "Renamed"
+
+    collection.delete()
+    assert _get_json(client, url)["features"] == []
+
+
+@pytest.mark.django_db
+def test_streamed_feature_collection_matches_in_memory_version():
+    for plant_id in ("STREAM-1", "STREAM-2", "STREAM-3"):
+        get_collection(plant_id=plant_id)
+    collections = Collection.objects.exclude(location=None).order_by("id")
+
+    chunks = list(iter_feature_collection_json(collections, chunk_size=2))
+
+    assert len(chunks) > 3
+    assert json.loads(b"".join(chunks)) == json.loads(json.dumps(get_feature_collection(collections)))
+    limited = json.loads(b"".join(iter_feature_collection_json(collections, limit=1)))
+    assert len(limited["features"]) == 1
+
+
+@pytest.mark.django_db
+def test_cache_versions_never_repeat_after_eviction(locmem_cache):
+    version = get_cache_version(GEOJSON_VERSION_KEY)
+    bump_cache_version(GEOJSON_VERSION_KEY)
+    bumped = get_cache_version(GEOJSON_VERSION_KEY)
+    locmem_cache.delete(GEOJSON_VERSION_KEY)  # e.g. culled by LocMemCache
+
+    assert len({version, bumped, get_cache_version(GEOJSON_VERSION_KEY)}) == 3
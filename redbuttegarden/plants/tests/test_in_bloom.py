@@ -0,0 +1,113 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from plants.filters import CollectionFilter
+from plants.in_bloom import get_in_bloom_index, refresh_in_bloom_index
+from plants.models import BloomEvent, Collection
+from plants.tests.utils import get_collection
+
+
+@pytest.fixture
+def blooming():
+    today = timezone.localdate()
+    rose = get_collection(plant_id="BLOOM-1", code="B-1", species_name="rosa", full_name="Genus rosa")
+    iris = get_collection(plant_id="BLOOM-2", code="B-2", species_name="iris", full_name="Genus iris")
+    get_collection(plant_id="BLOOM-3", code="B-3", species_name="aster", full_name="Genus aster")
+    by_collection = BloomEvent.objects.create(bloom_start=today, bloom_end=today + timedelta(days=2))
+    by_collection.collections.add(rose)
+    BloomEvent.objects.create(species=iris.species, bloom_start=today - timedelta(days=1), bloom_end=today)
+    BloomEvent.objects.create(species=rose.species, bloom_start=today - timedelta(days=9), bloom_end=today - timedelta(days=1))
+    return rose, iris
+
+
+@pytest.mark.django_db
+def test_index_lists_plants_blooming_today(blooming, locmem_cache):
+    rose, iris = blooming
+
+    index = get_in_bloom_index()
+
+    assert index.collection_ids == {rose.pk}
+    assert index.species_ids == {iris.species_id}
+    # Kept in memory after the first lookup
+    with CaptureQueriesContext(connection) as queries:
+        assert get_in_bloom_index() is index
+    assert len(queries) == 0
+
+
+@pytest.mark.django_db
+def test_bloom_event_changes_refresh_the_index(blooming):
+    rose, iris = blooming
+    assert get_in_bloom_index().collection_ids == {rose.pk}
+
+    event = BloomEvent.objects.get(species=None)
+    event.collections.add(iris)
+    assert get_in_bloom_index().collection_ids == {rose.pk, iris.pk}
+
+    event.bloom_start = timezone.localdate() + timedelta(days=1)
+    event.save()
+    assert get_in_bloom_index().collection_ids == set()
+
+    BloomEvent.objects.filter(species=iris.species).get().delete()
+    assert get_in_bloom_index().species_ids == set()
+
+
+@pytest.mark.django_db
+def test_bloom_event_save_rebuilds_the_index_once(django_capture_on_commit_callbacks):
+    rose = get_collection(plant_id="ONCE-1", code="O-1", species_name="rosa", full_name="Genus rosa")
+    iris = get_collection(plant_id="ONCE-2", code="O-2", species_name="iris", full_name="Genus iris")
+
+    with django_capture_on_commit_callbacks() as callbacks:
+        event = BloomEvent.objects.create(bloom_start=timezone.localdate())
+        event.collections.add(rose, iris)  # also saves the title
+
+    assert callbacks.count(refresh_in_bloom_index) == 1
+
+
+@pytest.mark.django_db
+def test_in_bloom_endpoint(client, blooming):
+    rose, iris = blooming
+
+    data = client.get(reverse("plants:api-in-bloom")).json()
+
+    assert data["date"] == timezone.localdate().isoformat()
+    assert data["collections"] == [rose.pk]
+    assert data["species"] == [iris.species_id]
+
+
+@pytest.mark.django_db
+def test_in_bloom_filter_matches_collections_and_species(blooming):
+    rose, iris = blooming
+
+    qs = CollectionFilter({"in_bloom": "on"}, queryset=Collection.objects.all()).qs
+
+    assert set(qs.values_list("plant_id", flat=True)) == {"BLOOM-1", "BLOOM-2"}
+
+
+@pytest.mark.django_db
+def test_detail_pages_read_the_index(client, blooming):
+    rose, iris = blooming
+    get_in_bloom_index()
+
+    assert client.get(reverse("plants:collection-detail", args=[rose.pk])).context["in_bloom"]
+    assert client.get(reverse("plants:species-detail", args=[iris.species_id])).context["in_bloom"]
+    assert not client.get(reverse("plants:species-detail", args=[rose.species_id])).context["in_bloom"]
+
+
+@pytest.mark.django_db
+def test_refresh_in_bloom_command(blooming, locmem_cache):
+    rose, iris = blooming
+    tomorrow = timezone.localdate() + timedelta(days=1)
+
+    call_command("refresh_in_bloom", "--date", tomorrow.isoformat())
+
+    with CaptureQueriesContext(connection) as queries:
+        index = get_in_bloom_index(tomorrow)
+    assert len(queries) == 0
+    assert index.collection_ids == {rose.pk}
+    assert index.species_ids == set()
@@ -1,7 +1,16 @@
-from django.test import TestCase
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
 from django.urls import reverse
 
-from plants.species_autolinks import SpeciesAutoLinker
+from plants.caching import bump_cache_version, get_cache_version
+from plants.models import Collection, Species
+from plants.species_autolinks import (
+    SPECIES_AUTOLINK_VERSION_KEY,
+    SpeciesAutoLinker,
+    clear_species_autolinker_memo,
+    start_species_autolinker_memo,
+)
 from plants.tests.utils import get_family, get_genus, get_species
 
 
@@ -96,3 +105,58 @@ class SpeciesAutoLinkerTests(TestCase):
         linked_html = linker.link_html("<p>The maple is leafing out.</p>")
 
         self.assertNotIn("<a href=", linked_html)
+
+    def test_link_html_prefers_longest_whole_word_term(self):
+        self.species.autolink_aliases = "Acer\nrubrum is"
+        self.species.save(update_fields=["autolink_aliases"])
+        species_url = reverse("plants:species-detail", args=[self.species.pk])
+
+        linker = SpeciesAutoLinker.from_database()
+        linked_html = linker.link_html("<p>Acer rubrum is here, Acers are not.</p>")
+
+        self.assertEqual(
+            linked_html,
+            f'<p><a href="{species_url}">Acer rubrum</a> is here, Acers are not.</p>',
+        )
+
+    @override_settings(CACHES={
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "autolink-tests"},
+    })
+    def test_linker_is_cached_until_autolink_fields_change(self):
+        linker = SpeciesAutoLinker.for_rich_text_storage()
+
+        with self.assertNumQueries(0):
+            self.assertIs(SpeciesAutoLinker.for_rich_text_storage(), linker)
+
+        self.species.vernacular_name = "Scarlet Maple"
+        self.species.save(update_fields=["vernacular_name"])
+        # Collection saves touch the species' last_modified, which the linker ignores
+        Collection.objects.create(species=self.species, plant_id="AUTO-1")
+        self.assertIs(SpeciesAutoLinker.for_rich_text_storage(), linker)
+
+        self.species.autolink_aliases = "Scarlet Maple"
+        self.species.save(update_fields=["autolink_aliases"])
+        self.assertIsNot(SpeciesAutoLinker.for_rich_text_storage(), linker)
+
+    @override_settings(CACHES={
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "autolink-tests"},
+    })
+    def test_linker_is_rebuilt_after_a_change_in_another_process(self):
+        linker = SpeciesAutoLinker.from_database()
+
+        # As committed elsewhere, which only moves the shared version on
+        Species.objects.filter(pk=self.species.pk).update(autolink_aliases="Scarlet Maple")
+        bump_cache_version(SPECIES_AUTOLINK_VERSION_KEY)
+
+        self.assertIsNot(SpeciesAutoLinker.from_database(), linker)
+        self.assertIn("Scarlet Maple", SpeciesAutoLinker.from_database().link_html("<p>Scarlet Maple</p>"))
+
+    def test_version_is_read_once_per_request(self):
+        start_species_autolinker_memo()
+        self.addCleanup(clear_species_autolinker_memo)
+
+        with patch("plants.species_autolinks.get_cache_version", wraps=get_cache_version) as version:
+            linkers = {SpeciesAutoLinker.for_rich_text_storage() for _ in range(20)}
+
+        self.assertEqual(len(linkers), 1)
+        self.assertEqual(version.call_count, 1)
@@ -0,0 +1,73 @@
+from io import BytesIO, StringIO
+
+import pytest
+from django.core.files.images import ImageFile
+from django.core.management import call_command
+from PIL import Image as PILImage
+from wagtail.images.models import Image, Rendition
+
+from plants import renditions
+from plants.models import SpeciesImage
+from plants.renditions import SPECIES_IMAGE_RENDITION_FILTERS, get_missing_renditions, schedule_renditions
+from plants.tests.test_api import APITestSetup
+
+
+@pytest.fixture
+def render_inline(settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+    settings.PLANTS_RENDITION_WORKERS = 0
+
+
+def _jpeg(name, color=(255, 0, 0)):
+    file_obj = BytesIO()
+    PILImage.new('RGB', size=(40, 20), color=color).save(file_obj, 'jpeg')
+    file_obj.seek(0)
+    return ImageFile(file_obj, name=name)
+
+
+def _rendered_specs(image):
+    return set(Rendition.objects.filter(image=image).values_list('filter_spec', flat=True))
+
+
+@pytest.mark.django_db
+def test_set_image_renders_once_committed(species, render_inline, django_capture_on_commit_callbacks):
+    api_client = APITestSetup()
+
+    with django_capture_on_commit_callbacks(execute=True):
+        resp = api_client.auth_user.post(f'/plants/api/species/{species.pk}/set-image/', {'image': _jpeg('1.jpg')})
+    assert resp.json()['status'] == 'success'
+
+    assert _rendered_specs(Image.objects.get()) == set(SPECIES_IMAGE_RENDITION_FILTERS)
+
+
+@pytest.mark.django_db
+def test_failed_renditions_are_left_for_the_backfill(render_inline, monkeypatch, django_capture_on_commit_callbacks):
+    image = Image.objects.create(title='Rose', file=_jpeg('rose.jpg'))
+
+    def broken(image_id, filters=None):
+        raise OSError('Storage unavailable')
+
+    monkeypatch.setattr(renditions, 'render_image', broken)
+    with django_capture_on_commit_callbacks(execute=True):
+        schedule_renditions([image.pk])
+
+    assert get_missing_renditions([image.pk]) == {image.pk: list(SPECIES_IMAGE_RENDITION_FILTERS)}
+
+
+@pytest.mark.django_db
+def test_backfill_skips_existing_renditions(species, render_inline):
+    image = Image.objects.create(title='Rose', file=_jpeg('rose.jpg'))
+    SpeciesImage.objects.create(species=species, image=image)
+    image.get_rendition('height-100')
+    assert get_missing_renditions([image.pk]) == {
+        image.pk: [spec for spec in SPECIES_IMAGE_RENDITION_FILTERS if spec != 'height-100']
+    }
+
+    call_command('warm_species_image_renditions')
+    assert _rendered_specs(image) == set(SPECIES_IMAGE_RENDITION_FILTERS)
+    assert get_missing_renditions([image.pk]) == {}
+
+    # Nothing is left to do on a second run
+    out = StringIO()
+    call_command('warm_species_image_renditions', '--workers', '0', stdout=out)
+    assert 'Created 0 renditions' in out.getvalue()
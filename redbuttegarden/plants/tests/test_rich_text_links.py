@@ -0,0 +1,102 @@
+import re
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from wagtail.models import Page
+from wagtail.admin.rich_text.converters.contentstate import ContentstateConverter
+from wagtail.rich_text import expand_db_html
+
+from home.models import GeneralPage
+from plants.rich_text import (
+    clear_plant_link_url_memo,
+    find_plant_link_ids,
+    prefetch_plant_link_urls,
+    start_plant_link_url_memo,
+)
+from plants.tests.utils import get_collection, get_family, get_genus, get_species
+
+
+class PlantLinkBatchingTests(TestCase):
+    def setUp(self):
+        genus = get_genus(get_family(name="Sapindaceae"), name="Acer")
+        self.species = [
+            get_species(genus, name=name, full_name=f"Acer {name}", cultivar=None)
+            for name in ("rubrum", "saccharum", "negundo")
+        ]
+        self.collection = get_collection(plant_id="RG-1")
+        self.html = "".join(
+            f'<p><a linktype="species" id="{species.pk}">{species.full_name}</a></p>'
+            for species in self.species
+        ) + (
+            f'<p><a linktype="collection" id="{self.collection.pk}">RG-1</a></p>'
+            '<p><a linktype="species" id="0">Gone</a></p>'
+        )
+
+    def start_request(self):
+        # What the request_started/request_finished receivers do
+        start_plant_link_url_memo()
+        self.addCleanup(clear_plant_link_url_memo)
+
+    def test_links_resolve_with_one_query_per_model(self):
+        with self.assertNumQueries(2):
+            html = expand_db_html(self.html)
+
+        for species in self.species:
+            self.assertIn(f'<a href="{species.get_absolute_url()}">{species.full_name}</a>', html)
+        self.assertIn(f'<a href="{self.collection.get_absolute_url()}">RG-1</a>', html)
+        self.assertIn("<a>Gone</a>", html)
+
+    def test_urls_are_memoized_for_the_request(self):
+        self.start_request()
+        expand_db_html(self.html)
+
+        with self.assertNumQueries(0):
+            expand_db_html(self.html)
+
+    def test_editor_conversion_uses_prefetched_links(self):
+        self.start_request()
+        converter = ContentstateConverter(features=["plant-links", "link"])
+
+        with self.assertNumQueries(2):
+            prefetch_plant_link_urls(self.html)
+        with self.assertNumQueries(0):
+            contentstate = converter.from_database_format(self.html)
+
+        self.assertIn(self.species[0].get_absolute_url(), contentstate)
+
+    def test_find_plant_link_ids_reads_json_escaped_html(self):
+        ids = find_plant_link_ids('{"value": "<a linktype=\\"species\\" id=\\"12\\">x</a> <a data-id=\\"3\\">"}')
+
+        self.assertEqual(ids, {"species": {"12"}, "collection": set()})
+
+
+class PagePlantLinkPrefetchTests(TestCase):
+    def setUp(self):
+        genus = get_genus(get_family(name="Sapindaceae"), name="Acer")
+        self.species = [
+            get_species(genus, name=name, full_name=f"Acer {name}", cultivar=None)
+            for name in ("rubrum", "saccharum", "negundo")
+        ]
+        self.collection = get_collection(plant_id="RG-1")
+        links = [(species.pk, "species") for species in self.species] + [(self.collection.pk, "collection")]
+        self.page = GeneralPage(
+            title="Maples",
+            slug="maples",
+            body=[
+                ("paragraph", {"paragraph": f'<p><a linktype="{link_type}" id="{id_}">Link</a></p>'})
+                for id_, link_type in links
+            ],
+        )
+        Page.objects.get(id=2).add_child(instance=self.page)
+
+    def test_page_links_resolve_with_one_query_per_model(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.page.url)
+
+        self.assertEqual(response.status_code, 200)
+        for species in self.species:
+            self.assertContains(response, f'href="{species.get_absolute_url()}"')
+        self.assertContains(response, f'href="{self.collection.get_absolute_url()}"')
+        lookups = [query["sql"] for query in queries if re.search(r'"plants_\w+"\."id" IN', query["sql"])]
+        self.assertEqual(len(lookups), 2, lookups)
@@ -0,0 +1,66 @@
+import json
+import random
+from decimal import Decimal
+
+import pytest
+from django.urls import reverse
+
+from plants.models import Location
+from plants.spatial import SPATIAL_KEY_ZOOM, covering_key_ranges, spatial_key
+from plants.tests.utils import get_collection
+
+
+def test_spatial_key_prefix_matches_coarser_tile():
+    key = spatial_key(-111.823807, 40.766367)
+    coarse = spatial_key(-111.823807, 40.766367, zoom=10)
+
+    assert key >> (2 * (SPATIAL_KEY_ZOOM - 10)) == coarse
+
+
+def test_covering_ranges_contain_every_point_in_bbox():
+    rng = random.Random(0)
+    west, south, east, north = -111.83, 40.76, -111.81, 40.77
+    ranges = covering_key_ranges(west, south, east, north)
+
+    assert 0 < len(ranges) <= 16
+    for _ in range(500):
+        key = spatial_key(rng.uniform(west, east), rng.uniform(south, north))
+        assert any(lo <= key < hi for lo, hi in ranges)
+
+
+@pytest.mark.django_db
+def test_location_save_sets_spatial_key():
+    location = Location.objects.create(latitude=Decimal("40.766367"), longitude=Decimal("-111.823807"))
+
+    assert location.spatial_key == spatial_key(Decimal("-111.823807"), Decimal("40.766367"))
+
+    location.latitude = Decimal("40.5")
+    location.save(update_fields=["latitude"])
+    location.refresh_from_db()
+
+    assert location.spatial_key == spatial_key(Decimal("-111.823807"), Decimal("40.5"))
+
+
+@pytest.mark.django_db
+def test_geojson_bbox_uses_exact_bounds(client):
+    get_collection(latitude=40.766, longitude=-111.824, plant_id="IN")
+    get_collection(latitude=40.766, longitude=-111.700, plant_id="OUT")
+
+    response = client.get(
+        reverse("plants:api-collections-geojson"), {"bbox": "-111.83,40.76,-111.81,40.77"}
+    )
+
+    ids = [f["properties"]["id"] for f in json.loads(response.getvalue())["features"]]
+    assert len(ids) == 1
+
+
+@pytest.mark.django_db
+def test_geojson_bbox_crossing_antimeridian(client):
+    get_collection(latitude=10, longitude=179.5, plant_id="EAST")
+    get_collection(latitude=10, longitude=-179.5, plant_id="WEST")
+    get_collection(latitude=10, longitude=0, plant_id="MIDDLE")
+
+    response = client.get(reverse("plants:api-collections-geojson"), {"bbox": "179,9,-179,11"})
+
+    coordinates = sorted(float(f["geometry"]["coordinates"][0]) for f in json.loads(response.getvalue())["features"])
+    assert coordinates == [-179.5, 179.5]
@@ -0,0 +1,74 @@
+import json
+from io import BytesIO
+
+import pytest
+from django.core.files.images import ImageFile
+from PIL import Image as PILImage
+from wagtail.images.models import Image
+
+from plants.models import SpeciesImage
+from plants.tests.test_api import APITestSetup
+from plants.tests.utils import get_species
+
+
+def _jpeg(name, color=(255, 0, 0)):
+    file_obj = BytesIO()
+    PILImage.new('RGB', size=(1, 1), color=color).save(file_obj, 'jpeg')
+    file_obj.seek(0)
+    return ImageFile(file_obj, name=name)
+
+
+@pytest.mark.django_db
+def test_set_image_reuses_image_with_same_contents(species):
+    api_client = APITestSetup()
+    url = f'/plants/api/species/{species.pk}/set-image/'
+
+    resp = api_client.auth_user.post(url, {'image': _jpeg('1.jpg')})
+    assert resp.json()['image_created'] is True
+    assert Image.objects.get().file_hash
+
+    resp = api_client.auth_user.post(url, {'image': _jpeg('renamed.jpg')})
+    assert resp.json() == {'status': 'success', 'image_created': False, 'species_image_created': False}
+    assert Image.objects.count() == 1
+    assert species.species_images.count() == 1
+
+
+@pytest.mark.django_db
+def test_set_species_images_attaches_batch(species):
+    api_client = APITestSetup()
+    other = get_species(species.genus, name='other')
+    attachments = [
+        {'image': 'a', 'species': [species.pk, other.pk], 'copyright_info': 'RBG'},
+        {'image': 'b', 'species': [other.pk]},
+        # Same bytes as "a" under a different name
+        {'image': 'c', 'species': [species.pk], 'copyright_info': 'RBG'},
+        {'image': 'missing', 'species': [species.pk]},
+        {'image': 'b', 'species': [0]},
+    ]
+
+    resp = api_client.auth_user.post('/plants/api/species-images/batch/', {
+        'attachments': json.dumps(attachments),
+        'a': _jpeg('a.jpg'),
+        'b': _jpeg('b.jpg', color=(0, 0, 255)),
+        'c': _jpeg('c.jpg'),
+    })
+    assert resp.status_code == 200
+    results = resp.json()['results']
+
+    assert Image.objects.count() == 2
+    assert [r['status'] for r in results] == ['success', 'success', 'success', 'failure', 'success']
+    assert results[0]['image_created'] and results[1]['image_created']
+    assert results[2]['image_id'] == results[0]['image_id']
+    assert results[2]['image_created'] is False
+    assert results[2]['species'][0]['species_image_created'] is False
+    assert results[4]['species'] == [{'species': 0, 'status': 'failure'}]
+    assert SpeciesImage.objects.filter(species=species).count() == 1
+    assert SpeciesImage.objects.filter(species=other).count() == 2
+
+
+@pytest.mark.django_db
+def test_set_species_images_rejects_bad_attachments():
+    api_client = APITestSetup()
+
+    resp = api_client.auth_user.post('/plants/api/species-images/batch/', {'attachments': '{"a": 1}'})
+    assert resp.status_code == 400
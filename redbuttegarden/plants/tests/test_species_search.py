@@ -0,0 +1,67 @@
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+
+from plants.filters import CollectionFilter
+from plants.models import Collection, Genus, Species
+from plants.tests.utils import get_collection
+
+
+@pytest.mark.django_db
+def test_common_name_filter_uses_stored_vector():
+    get_collection(plant_id="S-1")
+    get_collection(
+        plant_id="S-2",
+        family_name="Rosaceae",
+        genus_name="Rosa",
+        species_name="woodsii",
+        full_name="Rosa woodsii",
+        cultivar=None,
+        vernacular_name="Woods' Rose",
+    )
+
+    def matches(value):
+        qs = CollectionFilter({"common_name": value}, queryset=Collection.objects.all()).qs
+        return set(qs.values_list("plant_id", flat=True))
+
+    assert matches("warminster broom") == {"S-1"}
+    assert matches("roses") == {"S-2"}
+    assert matches("Rosaceae") == {"S-2"}
+    assert matches("Allgold") == {"S-1"}
+
+
+@pytest.mark.django_db
+def test_search_vector_follows_saves_and_genus_renames(genus):
+    species = Species.objects.create(genus=genus, name="fremontii", full_name="Genus fremontii", vernacular_name="Cottonwood")
+    assert Species.objects.filter(search_vector="cottonwood").exists()
+
+    species.autolink_aliases = "Fremont poplar"
+    species.save(update_fields=["autolink_aliases"])
+    assert Species.objects.filter(search_vector="poplar").exists()
+
+    Genus.objects.filter(pk=genus.pk).update(name="Populus")
+    assert not Species.objects.filter(search_vector="populus").exists()
+    genus.name = "Populus"
+    genus.save()
+    assert Species.objects.filter(search_vector="populus").exists()
+
+
+@pytest.mark.django_db
+def test_backfill_command_fills_missing_vectors(species):
+    Species.objects.update(search_vector=None)
+
+    call_command("update_species_search_vectors", missing=True)
+
+    assert Species.objects.filter(search_vector__isnull=True).count() == 0
+
+
+@pytest.mark.django_db
+def test_species_list_search_param(drf_client_with_user, species):
+    Species.objects.create(genus=species.genus, name="other", full_name="Genus other", vernacular_name="Something else")
+
+    response = drf_client_with_user.get(reverse("plants:api-species-list"), {"search": "vernacular_name"})
+
+    assert response.status_code == 200
+    results = response.json()
+    results = results["results"] if isinstance(results, dict) else results
+    assert [r["full_name"] for r in results] == ["Genus species"]
@@ -2,7 +2,10 @@ import io
 
 import pytest
 from django.contrib.auth.models import Group, Permission
+from django.core.files.storage import FileSystemStorage
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from PIL import Image as PILImage
 from rest_framework.test import APIClient
@@ -162,4 +165,29 @@ class TestSpeciesImageAPILogic:
         assert data["description"] == "Example alt text"
 
         species_image.image.refresh_from_db()
-        assert species_image.image.description == "Example alt text"
\ No newline at end of file
+        assert species_image.image.description == "Example alt text"
+
+@pytest.mark.django_db
+def test_list_walks_images_with_cursor_and_cached_urls(authed_client, species, locmem_cache, monkeypatch):
+    ImageModel = get_image_model()
+    for i in range(5):
+        image = ImageModel.objects.create(title=f"Image {i}", file=_make_test_image_file(f"{i}.jpg"))
+        SpeciesImage.objects.create(species=species, image=image, sort_order=i)
+    url_calls = []
+    storage_url = FileSystemStorage.url
+    monkeypatch.setattr(FileSystemStorage, "url", lambda self, name: url_calls.append(name) or storage_url(self, name))
+    url = reverse("plants:speciesimage-list")
+
+    first = authed_client.get(url, {"page_size": 3}).json()
+    assert [item["sort_order"] for item in first["results"]] == [0, 1, 2]
+    assert len(url_calls) == 3
+    with CaptureQueriesContext(connection) as queries:
+        second = authed_client.get(first["next"]).json()
+    assert [item["sort_order"] for item in second["results"]] == [3, 4]
+    assert second["next"] is None
+    assert len(queries) == 1
+
+    # URLs come from the cache the second time round
+    again = authed_client.get(url, {"page_size": 3}).json()
+    assert again["results"] == first["results"]
+    assert len(url_calls) == 5
@@ -0,0 +1,48 @@
+import pytest
+from django.db import connection
+from django.urls import reverse
+
+from plants.models import Collection, Species
+from plants.tests.utils import get_collection
+
+
+@pytest.mark.django_db
+def test_suggest_ranks_species_and_plant_ids(client):
+    get_collection(plant_id="2000-1024*1")
+    get_collection(
+        plant_id="1999-0042*2",
+        family_name="Salicaceae",
+        genus_name="Populus",
+        species_name="fremontii",
+        full_name="Populus fremontii",
+        cultivar=None,
+        vernacular_name="Fremont Cottonwood",
+    )
+
+    results = client.get(reverse("plants:api-suggest"), {"q": "cottonwood"}).json()["results"]
+    assert [(r["type"], r["label"]) for r in results] == [("species", "Populus fremontii")]
+    assert results[0]["url"] == reverse("plants:species-detail", args=[results[0]["id"]])
+
+    results = client.get(reverse("plants:api-suggest"), {"q": "1024"}).json()["results"]
+    assert [(r["type"], r["label"]) for r in results] == [("collection", "2000-1024*1")]
+
+    assert client.get(reverse("plants:api-suggest"), {"q": "c"}).json() == {"results": []}
+
+
+@pytest.mark.django_db
+def test_suggest_queries_can_use_trigram_indexes():
+    plans = []
+    with connection.cursor() as cursor:
+        cursor.execute("SET LOCAL enable_seqscan = off")
+        for queryset in (
+            Species.objects.filter(full_name__icontains="fremont"),
+            # suggest sorts by rank, so leave out the default created_on ordering,
+            # which an ordered scan of collection_created_on_id would satisfy
+            Collection.objects.filter(plant_id__icontains="1024").order_by(),
+        ):
+            sql, params = queryset.query.sql_with_params()
+            cursor.execute(f"EXPLAIN {sql}", params)
+            plans.append("\n".join(row[0] for row in cursor.fetchall()))
+
+    assert "species_full_name_trgm" in plans[0]
+    assert "collection_plant_id_trgm" in plans[1]
@@ -15,6 +15,11 @@ urlpatterns = [
     path(
         "api/collections/", views.CollectionList.as_view(), name="api-collection-list"
     ),
+    path(
+        "api/collections/bulk/",
+        views.CollectionBulkUpsert.as_view(),
+        name="api-collection-bulk",
+    ),
     path(
         "api/collections/<int:pk>/",
         views.CollectionDetail.as_view(),
@@ -29,6 +34,11 @@ urlpatterns = [
     path(
         "api/species/<int:pk>/set-image/", views.set_image, name="api-set-species-image"
     ),
+    path(
+        "api/species-images/batch/",
+        views.set_species_images,
+        name="api-set-species-images",
+    ),
     path("species-images/", views.SpeciesImageListView.as_view(), name="speciesimage-list"),
     path(
         "api/species-images/<int:pk>/image-description/",
@@ -40,6 +50,18 @@ urlpatterns = [
         views.collections_geojson,
         name="api-collections-geojson",
     ),
+    path(
+        "api/collections-tiles/<int:z>/<int:x>/<int:y>.pbf",
+        views.collections_tiles,
+        name="api-collections-tiles",
+    ),
+    path("api/suggest/", views.suggest, name="api-suggest"),
+    path("api/in-bloom/", views.in_bloom_today, name="api-in-bloom"),
+    path(
+        "api/collections-facets/",
+        views.collection_facets,
+        name="api-collection-facets",
+    ),
     path(
         "collection/<int:collection_id>/",
         views.collection_detail,
@@ -1,9 +1,15 @@
+import json
 import logging
+import math
+from collections import Counter
 
 from django.contrib.postgres.search import SearchVector
 from django.core.exceptions import ValidationError
+from django.db.models import Avg, Count, FloatField, Max, Min
+from django.db.models.functions import Cast, Floor
 from django.http import QueryDict
 from django.urls import reverse
+from django.utils.dates import MONTHS
 from geojson import FeatureCollection, Feature, Point
 
 from .models import Collection
@@ -13,43 +19,238 @@ logger = logging.getLogger(__name__)
 
 TRUE_VALUES = {"1", "true", "t", "yes", "y", "on"}
 
+# Mapbox GL renders 512px tiles; clusters cover roughly this many pixels square.
+MAP_TILE_SIZE = 512
+CLUSTER_RADIUS_PX = 40
+CLUSTER_REFERENCE_LATITUDE = 40.766367
+
+
+# GeoJSON feature properties and the Collection fields they are read from. Rows
+# are fetched with values_list so no model instances are built per feature.
+FEATURE_PROPERTY_FIELDS = {
+    "id": "id",
+    "species_id": "species_id",
+    "family_name": "species__genus__family__name",
+    "genus_name": "species__genus__name",
+    "species_name": "species__name",
+    "species_full_name": "species__full_name",
+    "vernacular_name": "species__vernacular_name",
+    "habit": "species__habit",  # this is your icon key
+    "hardiness": "species__hardiness",
+    "water_regime": "species__water_regime",
+    "exposure": "species__exposure",
+    "bloom_time": "species__bloom_time",
+    "plant_size": "species__plant_size",
+    "garden_area": "garden__area",
+    "garden_name": "garden__name",
+    "garden_code": "garden__code",
+    "planted_on": "plant_date",
+}
+
+GEOJSON_CHUNK_SIZE = 2000
+
+_feature_encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+
+def get_feature_rows(collections):
+    return collections.values_list(
+        "location__longitude", "location__latitude", *FEATURE_PROPERTY_FIELDS.values()
+    )
+
+
+def feature_from_row(row):
+    longitude, latitude, *values = row
+    properties = dict(zip(FEATURE_PROPERTY_FIELDS, values))
+    if properties["planted_on"]:
+        properties["planted_on"] = properties["planted_on"].strftime("%m/%d/%Y")
+
+    return {
+        "type": "Feature",
+        "geometry": {"type": "Point", "coordinates": [float(longitude), float(latitude)]},
+        "properties": properties,
+    }
+
 
 def get_feature_collection(collections):
-    features = []
-    for collection in collections:
-        plant_date = (
-            collection.plant_date.strftime("%m/%d/%Y")
-            if collection.plant_date
-            else None
+    rows = get_feature_rows(collections).iterator(chunk_size=GEOJSON_CHUNK_SIZE)
+    return FeatureCollection([feature_from_row(row) for row in rows])
+
+
+def iter_feature_collection_json(collections, limit=None, chunk_size=GEOJSON_CHUNK_SIZE):
+    """
+    Yield a GeoJSON FeatureCollection as UTF-8 bytes, one database chunk at a
+    time, so memory use does not grow with the number of collections.
+    """
+    rows = get_feature_rows(collections)
+    if limit is not None:
+        rows = rows[:limit]
+
+    yield b'{"type":"FeatureCollection","features":['
+
+    separator = ""
+    buffer = []
+    for row in rows.iterator(chunk_size=chunk_size):
+        buffer.append(separator + _feature_encoder.encode(feature_from_row(row)))
+        separator = ","
+        if len(buffer) >= chunk_size:
+            yield "".join(buffer).encode("utf-8")
+            buffer = []
+
+    if buffer:
+        yield "".join(buffer).encode("utf-8")
+
+    yield b"]}"
+
+
+def get_cluster_cell_size(zoom):
+    """
+    Size in degrees of the (longitude, latitude) grid cell used to cluster
+    collections at the given zoom level. Latitude cells are scaled for the
+    garden's latitude so clusters stay roughly square on a web mercator map
+    while every zoom level still nests exactly inside the one above it.
+    """
+    cell_lon = CLUSTER_RADIUS_PX * 360 / (MAP_TILE_SIZE * 2**zoom)
+    cell_lat = cell_lon * math.cos(math.radians(CLUSTER_REFERENCE_LATITUDE))
+    return cell_lon, cell_lat
+
+
+def abbreviate_point_count(count):
+    """
+    Match Mapbox GL's point_count_abbreviated formatting.
+    """
+    # Math.round rounds halves up, unlike Python's round()
+    if count >= 10000:
+        return f"{math.floor(count / 1000 + 0.5)}k"
+    if count >= 1000:
+        return f"{math.floor(count / 100 + 0.5) / 10:g}k"
+    return str(count)
+
+
+def get_cluster_feature_collection(collections, zoom, limit=None):
+    """
+    Aggregate collections into grid clusters for the given zoom level in a single
+    GROUP BY. Each grid level nests inside the previous one, so a cluster at
+    zoom n splits cleanly into the clusters at zoom n + 1.
+
+    Cells holding a single collection are emitted as regular collection
+    features so the map can render their icon directly. At most limit of
+    those are emitted, newest first, as for unclustered responses.
+    """
+    cell_lon, cell_lat = get_cluster_cell_size(zoom)
+
+    cells = (
+        collections.order_by()
+        .annotate(
+            cell_x=Floor(Cast("location__longitude", FloatField()) / cell_lon),
+            cell_y=Floor(Cast("location__latitude", FloatField()) / cell_lat),
         )
+        .values("cell_x", "cell_y")
+        .annotate(
+            point_count=Count("id"),
+            first_id=Min("id"),
+            longitude=Avg("location__longitude"),
+            latitude=Avg("location__latitude"),
+            west=Min("location__longitude"),
+            south=Min("location__latitude"),
+            east=Max("location__longitude"),
+            north=Max("location__latitude"),
+        )
+    )
+
+    cluster_features = []
+    single_ids = []
+    for cell in cells:
+        if cell["point_count"] == 1:
+            single_ids.append(cell["first_id"])
+            continue
 
-        feature = Feature(
-            geometry=Point(
-                (collection.location.longitude, collection.location.latitude)
-            ),
-            properties={
-                "id": collection.id,
-                "species_id": collection.species.id,
-                "family_name": collection.species.genus.family.name,
-                "genus_name": collection.species.genus.name,
-                "species_name": collection.species.name,
-                "species_full_name": collection.species.full_name,
-                "vernacular_name": collection.species.vernacular_name,
-                "habit": collection.species.habit,  # this is your icon key
-                "hardiness": collection.species.hardiness,
-                "water_regime": collection.species.water_regime,
-                "exposure": collection.species.exposure,
-                "bloom_time": collection.species.bloom_time,
-                "plant_size": collection.species.plant_size,
-                "garden_area": collection.garden.area,
-                "garden_name": collection.garden.name,
-                "garden_code": collection.garden.code,
-                "planted_on": plant_date,
-            },
+        cluster_features.append(
+            Feature(
+                geometry=Point((float(cell["longitude"]), float(cell["latitude"]))),
+                properties={
+                    "cluster": True,
+                    "cluster_id": f"{zoom}/{int(cell['cell_x'])}/{int(cell['cell_y'])}",
+                    "point_count": cell["point_count"],
+                    "point_count_abbreviated": abbreviate_point_count(
+                        cell["point_count"]
+                    ),
+                    "bbox": [
+                        float(cell["west"]),
+                        float(cell["south"]),
+                        float(cell["east"]),
+                        float(cell["north"]),
+                    ],
+                },
+            )
         )
-        features.append(feature)
 
-    return FeatureCollection(features)
+    if limit is not None:
+        single_ids = sorted(single_ids, reverse=True)[:limit]
+    singles = get_feature_collection(collections.filter(id__in=single_ids))
+    return FeatureCollection(cluster_features + singles["features"])
+
+
+# Facet name (matching the CollectionFilter parameter) -> value path on Collection
+FACET_FIELDS = {
+    "habits": "species__habit",
+    "exposures": "species__exposure",
+    "water_needs": "species__water_regime",
+    "family_name": "species__genus__family_id",
+    "garden_name": "garden__name",
+}
+
+# Bloom time tokens are "Early May", "Mid May", "Late May" or plain "May"
+BLOOM_MONTH_BY_TOKEN = {
+    token: month
+    for month in MONTHS.values()
+    for token in [month] + [f"{mod} {month}" for mod in ("Early", "Mid", "Late")]
+}
+
+
+def get_facet_counts(collections):
+    """
+    Count collections per value of each facet in FACET_FIELDS and per bloom
+    month. The database groups collections by their distinct combination of
+    facet values in a single query; the much smaller grouped rows are then
+    folded into per-facet counters.
+
+    Returns (total, {facet: [{"value", "label", "count"}, ...]}) with each
+    facet ordered by descending count.
+    """
+    fields = list(FACET_FIELDS.values())
+    rows = (
+        collections.order_by()
+        .values(*fields, "species__bloom_time", "species__genus__family__name")
+        .annotate(count=Count("id"))
+    )
+
+    total = 0
+    counters = {facet: Counter() for facet in [*FACET_FIELDS, "bloom_months"]}
+    family_names = {}
+    for row in rows:
+        count = row["count"]
+        total += count
+        for facet, field in FACET_FIELDS.items():
+            if row[field] not in (None, ""):
+                counters[facet][row[field]] += count
+
+        family_names[row["species__genus__family_id"]] = row["species__genus__family__name"]
+        months = {BLOOM_MONTH_BY_TOKEN.get(token) for token in row["species__bloom_time"] or []}
+        for month in months - {None}:
+            counters["bloom_months"][month] += count
+
+    facets = {}
+    for facet, counter in counters.items():
+        facets[facet] = [
+            {
+                "value": value,
+                "label": family_names[value] if facet == "family_name" else value,
+                "count": count,
+            }
+            for value, count in sorted(counter.items(), key=lambda item: (-item[1], str(item[0])))
+        ]
+
+    return total, facets
 
 
 def style_message(request, species, collection, original_message):
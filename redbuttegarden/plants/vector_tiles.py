@@ -0,0 +1,147 @@
+"""
+Minimal Mapbox Vector Tile (MVT) encoder for point layers.
+
+Only the subset of the spec needed by the plant map is implemented: a single
+layer of POINT features with string/number/bool properties. See
+https://github.com/mapbox/vector-tile-spec/tree/master/2.1 for the format.
+"""
+import math
+import struct
+from decimal import Decimal
+
+TILE_EXTENT = 4096
+MAX_ZOOM = 22
+
+# Protobuf wire types
+_VARINT = 0
+_FIXED64 = 1
+_LENGTH_DELIMITED = 2
+
+# MVT geometry constants
+_GEOM_TYPE_POINT = 1
+_CMD_MOVE_TO = 1
+
+
+def _encode_varint(value):
+    out = bytearray()
+    while True:
+        to_write = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(to_write | 0x80)
+        else:
+            out.append(to_write)
+            return bytes(out)
+
+
+def _zigzag(value):
+    return (value << 1) ^ (value >> 63)
+
+
+def _key(field_number, wire_type):
+    return _encode_varint((field_number << 3) | wire_type)
+
+
+def _length_delimited(field_number, payload):
+    return _key(field_number, _LENGTH_DELIMITED) + _encode_varint(len(payload)) + payload
+
+
+def _packed_varints(field_number, values):
+    return _length_delimited(field_number, b"".join(_encode_varint(v) for v in values))
+
+
+def _encode_value(value):
+    """Encode a property value as an MVT ``Value`` message."""
+    if isinstance(value, bool):
+        return _key(7, _VARINT) + _encode_varint(int(value))
+    if isinstance(value, int):
+        if value < 0:
+            return _key(6, _VARINT) + _encode_varint(_zigzag(value))
+        return _key(5, _VARINT) + _encode_varint(value)
+    if isinstance(value, (float, Decimal)):
+        return _key(3, _FIXED64) + struct.pack("<d", float(value))
+    return _length_delimited(1, str(value).encode("utf-8"))
+
+
+def tile_is_valid(z, x, y):
+    if z < 0 or z > MAX_ZOOM:
+        return False
+    n = 1 << z
+    return 0 <= x < n and 0 <= y < n
+
+
+def tile_bounds(z, x, y):
+    """
+    Return the (west, south, east, north) bounds of a web mercator tile in degrees.
+    """
+    n = 1 << z
+
+    def lon(tx):
+        return tx / n * 360.0 - 180.0
+
+    def lat(ty):
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * ty / n))))
+
+    return lon(x), lat(y + 1), lon(x + 1), lat(y)
+
+
+def project_to_tile(z, x, y, longitude, latitude, extent=TILE_EXTENT):
+    """
+    Project a WGS84 coordinate to integer tile-local coordinates.
+    """
+    n = 1 << z
+    lat_rad = math.radians(float(latitude))
+    world_x = (float(longitude) + 180.0) / 360.0 * n
+    world_y = (1.0 - math.asinh(math.tan(lat_rad)) / math.pi) / 2.0 * n
+    return (
+        int(round((world_x - x) * extent)),
+        int(round((world_y - y) * extent)),
+    )
+
+
+def encode_point_layer(name, features, z, x, y, extent=TILE_EXTENT):
+    """
+    Encode an iterable of ``(feature_id, longitude, latitude, properties)`` tuples
+    as a single-layer vector tile. Returns ``b""`` when there are no features,
+    which clients treat as an empty tile.
+    """
+    keys = {}
+    values = {}
+    encoded_features = []
+
+    for feature_id, longitude, latitude, properties in features:
+        tags = []
+        for prop_key, prop_value in properties.items():
+            if prop_value is None:
+                continue
+            key_index = keys.setdefault(prop_key, len(keys))
+            value_key = (type(prop_value).__name__, prop_value)
+            value_index = values.setdefault(value_key, len(values))
+            tags.extend((key_index, value_index))
+
+        px, py = project_to_tile(z, x, y, longitude, latitude, extent)
+        geometry = ((_CMD_MOVE_TO & 0x7) | (1 << 3), _zigzag(px), _zigzag(py))
+
+        feature = b""
+        if feature_id is not None:
+            feature += _key(1, _VARINT) + _encode_varint(int(feature_id))
+        if tags:
+            feature += _packed_varints(2, tags)
+        feature += _key(3, _VARINT) + _encode_varint(_GEOM_TYPE_POINT)
+        feature += _packed_varints(4, geometry)
+        encoded_features.append(feature)
+
+    if not encoded_features:
+        return b""
+
+    layer = _key(15, _VARINT) + _encode_varint(2)
+    layer += _length_delimited(1, name.encode("utf-8"))
+    for feature in encoded_features:
+        layer += _length_delimited(2, feature)
+    for prop_key in keys:
+        layer += _length_delimited(3, prop_key.encode("utf-8"))
+    for _, prop_value in values:
+        layer += _length_delimited(4, _encode_value(prop_value))
+    layer += _key(5, _VARINT) + _encode_varint(extent)
+
+    return _length_delimited(3, layer)
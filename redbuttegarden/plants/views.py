@@ -1,7 +1,10 @@
+import hashlib
+import json
 import logging
 import re
 import requests
 
+from datetime import datetime, time
 from decimal import Decimal, InvalidOperation
 from django.conf import settings
 from django.contrib import messages
@@ -9,11 +12,22 @@ from django.contrib.auth import get_user_model
 from django.core.mail import EmailMessage
 from django.core.paginator import PageNotAnInteger, EmptyPage
 from django.db import IntegrityError
-from django.db.models import Q
-from django.http import JsonResponse, HttpResponseRedirect
+from django.contrib.postgres.search import SearchRank
+from django.db.models import F, Q
+from django.http import (
+    Http404,
+    HttpResponse,
+    HttpResponseRedirect,
+    JsonResponse,
+    StreamingHttpResponse,
+)
 from django.middleware.csrf import get_token
 from django.urls import reverse
 from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.functional import SimpleLazyObject
+from django.utils.http import http_date, quote_etag
+from django.views.decorators.cache import cache_control
 from django.views.decorators.http import require_GET
 from requests import HTTPError
 from urllib.parse import urlencode
@@ -28,12 +42,31 @@ from rest_framework.decorators import api_view
 from rest_framework.exceptions import PermissionDenied
 from rest_framework.response import Response
 from wagtail.models import Collection as WagtailCollection
-from wagtail.images.models import Image
 from wagtail.images.permissions import permission_policy as image_permission_policy
 
+from .api_fields import SerializerQueryMixin
+from .bulk import upsert_collections
+from .caching import (
+    DETAIL_FRAGMENT_CACHE_SECONDS,
+    GEOJSON_CACHE_SECONDS,
+    get_filter_cache_key,
+    get_geojson_cache_key,
+    get_plants_cache,
+    get_plants_cache_alias,
+    quantize_bbox,
+)
 from .tables import CollectionTable, TopTreesSpeciesTable
+from .exports import STREAMING_EXPORT_FORMATS, export_response
 from .filters import CollectionFilter, TopTreesSpeciesFilter
 from .forms import FeedbackReportForm
+from .in_bloom import get_in_bloom_index
+from .renditions import schedule_renditions
+from .images import (
+    get_brahms_collection,
+    get_or_create_brahms_image,
+    get_or_create_brahms_images,
+    get_or_create_species_image,
+)
 from .models import (
     Family,
     Genus,
@@ -41,7 +74,6 @@ from .models import (
     Collection,
     Location,
     SpeciesImage,
-    BloomEvent,
 )
 from .serializers import (
     FamilySerializer,
@@ -54,17 +86,53 @@ from .serializers import (
 )
 from .utils import (
     clean_querydict,
-    get_feature_collection,
+    get_cluster_feature_collection,
+    get_facet_counts,
+    iter_feature_collection_json,
     style_message,
 )
+from .pagination import (
+    CollectionCursorPagination,
+    InvalidCursor,
+    SpeciesImageCursorPagination,
+    get_approximate_count,
+    paginate_keyset,
+)
+from .search import species_search_query, suggest_collections, suggest_species
+from .spatial import covering_key_ranges
+from .sync import DeltaSyncMixin
+from .vector_tiles import encode_point_layer, tile_bounds, tile_is_valid
 
 logger = logging.getLogger(__name__)
 
 
 MAX_FEATURES = 5000
-
-
-class FamilyViewSet(viewsets.ModelViewSet):
+BULK_MAX_RECORDS = 20000
+SPECIES_IMAGES_MAX_ATTACHMENTS = 500
+SUGGEST_MIN_LENGTH = 2
+SUGGEST_DEFAULT_LIMIT = 10
+SUGGEST_MAX_LIMIT = 25
+# Above this zoom level collections_geojson returns individual collections
+# instead of clusters. Override with settings.PLANT_MAP_CLUSTER_MAX_ZOOM.
+DEFAULT_CLUSTER_MAX_ZOOM = 17
+TILE_CACHE_SECONDS = 60 * 60  # 1 hour
+TILE_CONTENT_TYPE = "application/vnd.mapbox-vector-tile"
+
+# Only what the map needs to render icons and listings is included in vector
+# tiles; everything else lives on the detail pages.
+TILE_PROPERTY_FIELDS = {
+    "id": "id",
+    "species_id": "species_id",
+    "family_name": "species__genus__family__name",
+    "genus_name": "species__genus__name",
+    "species_name": "species__name",
+    "species_full_name": "species__full_name",
+    "vernacular_name": "species__vernacular_name",
+    "habit": "species__habit",
+}
+
+
+class FamilyViewSet(SerializerQueryMixin, viewsets.ModelViewSet):
     """
     List, create, retrieve, update or delete families.
     """
@@ -73,7 +141,7 @@ class FamilyViewSet(viewsets.ModelViewSet):
     serializer_class = FamilySerializer
 
 
-class GenusViewSet(viewsets.ModelViewSet):
+class GenusViewSet(SerializerQueryMixin, viewsets.ModelViewSet):
     """
     List, create, retrieve, update or delete genera.
     """
@@ -82,12 +150,17 @@ class GenusViewSet(viewsets.ModelViewSet):
     serializer_class = GenusSerializer
 
 
-class SpeciesList(generics.ListCreateAPIView):
+class SpeciesList(SerializerQueryMixin, DeltaSyncMixin, generics.ListCreateAPIView):
+    """
+    List or create species. With ?since=, list the species changed or
+    deleted since then (see plants.sync).
+    """
+
     queryset = Species.objects.all()
     serializer_class = SpeciesSerializer
 
     def get_queryset(self):
-        queryset = Species.objects.all()
+        queryset = super().get_queryset()
 
         genus = self.request.query_params.get("genus", "unspecified")
         name = self.request.query_params.get("name", "unspecified")
@@ -118,15 +191,24 @@ class SpeciesList(generics.ListCreateAPIView):
         if cultivar != "unspecified":
             queryset = queryset.filter(cultivar=cultivar)
 
+        search = self.request.query_params.get("search")
+        if search:
+            query = species_search_query(search)
+            queryset = (
+                queryset.filter(search_vector=query)
+                .annotate(rank=SearchRank(F("search_vector"), query))
+                .order_by("-rank", "full_name")
+            )
+
         return queryset
 
 
-class SpeciesDetail(generics.RetrieveUpdateDestroyAPIView):
+class SpeciesDetail(SerializerQueryMixin, generics.RetrieveUpdateDestroyAPIView):
     queryset = Species.objects.all()
     serializer_class = SpeciesSerializer
 
 
-class LocationViewSet(viewsets.ModelViewSet):
+class LocationViewSet(SerializerQueryMixin, viewsets.ModelViewSet):
     """
     List, create, retrieve, update or delete locations.
     """
@@ -135,16 +217,57 @@ class LocationViewSet(viewsets.ModelViewSet):
     serializer_class = LocationSerializer
 
 
-class CollectionList(generics.ListCreateAPIView):
+class CollectionList(SerializerQueryMixin, DeltaSyncMixin, generics.ListCreateAPIView):
     """
-    List 100 most recently created collections, or create new collections.
+    List collections, most recently created first, or create new collections.
+    Pages of 100 are linked with "next" and "previous" cursors. With ?since=,
+    list the collections changed or deleted since then (see plants.sync).
     """
 
-    queryset = Collection.objects.all().order_by("-id")[:100]
+    queryset = Collection.objects.all()
     serializer_class = CollectionSerializer
+    pagination_class = CollectionCursorPagination
+
+
+class CollectionBulkUpsert(generics.GenericAPIView):
+    """
+    Create or update a list of collections in one request, with the same
+    matching rules as posting each one to the collection list endpoint.
+    Responds with one result per record, in order.
+    """
+
+    serializer_class = CollectionSerializer
+
+    def post(self, request):
+        if not isinstance(request.data, list):
+            return Response(
+                {"detail": "Expected a list of collections."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if len(request.data) > BULK_MAX_RECORDS:
+            return Response(
+                {"detail": f"At most {BULK_MAX_RECORDS} collections per request."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        items = []
+        for index, payload in enumerate(request.data):
+            serializer = self.get_serializer(data=payload)
+            plant_id = payload.get("plant_id") if isinstance(payload, dict) else None
+            if serializer.is_valid():
+                items.append((index, plant_id, serializer.validated_data, None))
+            else:
+                items.append((index, plant_id, None, serializer.errors))
+
+        results = upsert_collections(items)
+        summary = {
+            outcome: sum(1 for result in results if result["status"] == outcome)
+            for outcome in ("created", "updated", "error")
+        }
+        return Response({**summary, "results": results})
 
 
-class CollectionDetail(generics.RetrieveUpdateDestroyAPIView):
+class CollectionDetail(SerializerQueryMixin, generics.RetrieveUpdateDestroyAPIView):
     """
     Retrieve, update or delete a living plant collection.
     """
@@ -187,31 +310,18 @@ def set_image(request, pk):
 
         species = Species.objects.get(pk=pk)
         uploaded_image = request.FILES.get("image")
-        img_title = uploaded_image.name
 
         try:
-            image, img_created = Image.objects.get_or_create(
-                title=img_title,
-                defaults={
-                    "file": uploaded_image,
-                    "collection": WagtailCollection.objects.get(name="BRAHMS Data"),
-                },
-            )
+            image, img_created = get_or_create_brahms_image(uploaded_image)
         except WagtailCollection.DoesNotExist:
             logger.error(
                 '"BRAHMS DATA" Collection is missing. Unable to save new images.'
             )
             return JsonResponse({"status": "failure"})
 
-        if img_created:
-            image.tags.add("BRAHMS")
-
         try:
-            species_image, species_img_created = SpeciesImage.objects.get_or_create(
-                species=species,
-                image=image,
-                copyright=copyright_text,
-                defaults={"caption": species.full_name},
+            species_image, species_img_created = get_or_create_species_image(
+                species, image, copyright_text
             )
         except IntegrityError:
             logger.debug(
@@ -225,6 +335,7 @@ def set_image(request, pk):
                 }
             )
 
+        schedule_renditions([image.pk])
         return JsonResponse(
             {
                 "status": "success",
@@ -236,11 +347,109 @@ def set_image(request, pk):
     return JsonResponse({"status": "failure"})
 
 
+@api_view(["POST"])
+def set_species_images(request):
+    """
+    Attach several uploaded images to species in one request. Expects
+    multipart data with the image files and an "attachments" JSON list of
+    {"image": <file field name>, "species": [<species pk>, ...],
+    "copyright_info": <text>}. Files are matched to existing images by their
+    contents, as with set_image. Responds with one result per attachment.
+    """
+    try:
+        attachments = json.loads(request.data.get("attachments", ""))
+    except (TypeError, ValueError):
+        attachments = None
+    if not isinstance(attachments, list) or not all(
+        isinstance(a, dict)
+        and isinstance(a.get("image"), str)
+        and isinstance(a.get("species"), list)
+        for a in attachments
+    ):
+        return Response(
+            {"detail": 'Expected an "attachments" JSON list.'},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    if len(attachments) > SPECIES_IMAGES_MAX_ATTACHMENTS:
+        return Response(
+            {"detail": f"At most {SPECIES_IMAGES_MAX_ATTACHMENTS} attachments per request."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    uploads = {
+        a["image"]: request.FILES[a["image"]] for a in attachments if a["image"] in request.FILES
+    }
+    try:
+        images = get_or_create_brahms_images(uploads, collection=get_brahms_collection())
+    except WagtailCollection.DoesNotExist:
+        logger.error('"BRAHMS DATA" Collection is missing. Unable to save new images.')
+        return Response({"status": "failure"})
+
+    species_ids = {pk for a in attachments for pk in a["species"] if isinstance(pk, int)}
+    species_by_id = Species.objects.in_bulk(species_ids)
+
+    results = []
+    for attachment in attachments:
+        name = attachment["image"]
+        if name not in images:
+            results.append({"image": name, "status": "failure", "detail": "No such file."})
+            continue
+
+        image, img_created = images[name]
+        copyright_text = attachment.get("copyright_info", "")
+        species_results = []
+        for pk in attachment["species"]:
+            species = species_by_id.get(pk)
+            if species is None:
+                species_results.append({"species": pk, "status": "failure"})
+                continue
+            try:
+                _, species_img_created = get_or_create_species_image(
+                    species, image, copyright_text
+                )
+            except IntegrityError:
+                logger.debug(f"Failed to add image {image} for species {species} ({pk}).")
+                species_results.append({"species": pk, "status": "failure"})
+                continue
+            species_results.append(
+                {
+                    "species": pk,
+                    "status": "success",
+                    "species_image_created": species_img_created,
+                }
+            )
+
+        results.append(
+            {
+                "image": name,
+                "image_id": image.pk,
+                "image_created": img_created,
+                "status": "success",
+                "species": species_results,
+            }
+        )
+
+    schedule_renditions(r["image_id"] for r in results if r["status"] == "success")
+    return Response({"status": "success", "results": results})
+
+
 class SpeciesImageListView(generics.ListAPIView):
-    queryset = SpeciesImage.objects.select_related("species", "image").order_by(
-        "species_id", "sort_order", "id"
+    # Only what SpeciesImageListSerializer reads; ordered by the pagination
+    queryset = SpeciesImage.objects.select_related("species", "image").only(
+        "id",
+        "sort_order",
+        "species",
+        "species__full_name",
+        "image",
+        "image__file",
+        # Read by ImageField when the image is loaded
+        "image__width",
+        "image__height",
+        "image__file_hash",
+        "image__description",
     )
     serializer_class = SpeciesImageListSerializer
+    pagination_class = SpeciesImageCursorPagination
 
 
 class SpeciesImageEditImageDescriptionView(generics.RetrieveUpdateAPIView):
@@ -286,40 +495,185 @@ def _parse_bbox(bbox: str):
     return west, south, east, north
 
 
-@require_GET
-def collections_geojson(request):
-    qs = Collection.objects.exclude(location=None).select_related(
-        "location", "species", "species__genus", "species__genus__family", "garden"
+def _spatial_key_q(west, south, east, north):
+    query = Q()
+    for lo, hi in covering_key_ranges(west, south, east, north):
+        query |= Q(location__spatial_key__gte=lo, location__spatial_key__lt=hi)
+    return query
+
+
+def _filter_bbox(qs, west, south, east, north):
+    # Narrow with spatial key index range scans first, then apply the exact
+    # bounds since covering tiles can extend past the bbox.
+    if west <= east:
+        spatial_q = _spatial_key_q(west, south, east, north)
+        longitude_q = Q(location__longitude__gte=west, location__longitude__lte=east)
+    else:
+        # bbox crosses the dateline; split into two longitude ranges
+        spatial_q = _spatial_key_q(west, south, 180, north) | _spatial_key_q(
+            -180, south, east, north
+        )
+        longitude_q = Q(location__longitude__gte=west) | Q(location__longitude__lte=east)
+
+    return qs.filter(spatial_q).filter(
+        longitude_q,
+        location__latitude__gte=south,
+        location__latitude__lte=north,
     )
 
+
+@require_GET
+def collections_geojson(request):
     bbox = request.GET.get("bbox")
     if bbox:
         try:
-            west, south, east, north = _parse_bbox(bbox)
+            bbox = quantize_bbox(*_parse_bbox(bbox))
         except (ValueError, InvalidOperation):
             return JsonResponse({"message": "Invalid bbox."}, status=400)
 
-        # Handle antimeridian wrap (rare for you, but correct)
-        if west <= east:
-            qs = qs.filter(
-                location__longitude__gte=west,
-                location__longitude__lte=east,
-                location__latitude__gte=south,
-                location__latitude__lte=north,
-            )
-        else:
-            # bbox crosses the dateline; split into two longitude ranges
-            qs = qs.filter(
-                location__latitude__gte=south,
-                location__latitude__lte=north,
-            ).filter(
-                (Q(location__longitude__gte=west) | Q(location__longitude__lte=east))
-            )
+    zoom = request.GET.get("zoom") or None
+    if zoom:
+        try:
+            zoom = int(float(zoom))
+        except (ValueError, OverflowError):
+            return JsonResponse({"message": "Invalid zoom."}, status=400)
+
+    # Serialized responses are cached until any plant data changes
+    cache = get_plants_cache()
+    cache_key = get_geojson_cache_key(request.GET, bbox)
+    content = cache.get(cache_key)
+    if content is not None:
+        return HttpResponse(content, content_type="application/json")
+
+    qs = Collection.objects.exclude(location=None)
+    if bbox:
+        qs = _filter_bbox(qs, *bbox)
 
     qs = CollectionFilter(request.GET or None, queryset=qs).qs
 
-    qs = qs.order_by("-id")[:MAX_FEATURES]
-    return JsonResponse(get_feature_collection(qs), safe=False)
+    cluster_max_zoom = getattr(
+        settings, "PLANT_MAP_CLUSTER_MAX_ZOOM", DEFAULT_CLUSTER_MAX_ZOOM
+    )
+    if zoom is not None and 0 <= zoom <= cluster_max_zoom:
+        response = JsonResponse(
+            get_cluster_feature_collection(qs, zoom, limit=MAX_FEATURES), safe=False
+        )
+        cache.set(cache_key, response.content, GEOJSON_CACHE_SECONDS)
+        return response
+
+    chunks = iter_feature_collection_json(qs.order_by("-id"), limit=MAX_FEATURES)
+    return StreamingHttpResponse(
+        _cache_streamed_content(chunks, cache, cache_key, GEOJSON_CACHE_SECONDS),
+        content_type="application/json",
+    )
+
+
+def _cache_streamed_content(chunks, cache, cache_key, timeout):
+    """
+    Pass streamed chunks through and cache the full body once it has been sent.
+    """
+    sent = []
+    for chunk in chunks:
+        sent.append(chunk)
+        yield chunk
+    cache.set(cache_key, b"".join(sent), timeout)
+
+
+@require_GET
+@cache_control(public=True, max_age=TILE_CACHE_SECONDS)
+def collections_tiles(request, z, x, y):
+    """
+    Serve located collections as a Mapbox Vector Tile, honoring the same
+    CollectionFilter parameters as collections_geojson. Tiles are addressed by
+    URL only, so CloudFront can cache them without the 5000 feature ceiling.
+    """
+    if not tile_is_valid(z, x, y):
+        raise Http404("Tile out of range.")
+
+    west, south, east, north = (
+        Decimal(str(round(v, 6))) for v in tile_bounds(z, x, y)
+    )
+    qs = _filter_bbox(Collection.objects.exclude(location=None), west, south, east, north)
+    qs = CollectionFilter(request.GET or None, queryset=qs).qs
+
+    rows = qs.order_by().values_list(
+        "location__longitude", "location__latitude", *TILE_PROPERTY_FIELDS.values()
+    )
+    features = (
+        (row[2], row[0], row[1], dict(zip(TILE_PROPERTY_FIELDS, row[2:])))
+        for row in rows.iterator(chunk_size=2000)
+    )
+
+    tile = encode_point_layer("collections", features, z, x, y)
+    return HttpResponse(tile, content_type=TILE_CONTENT_TYPE)
+
+
+@require_GET
+def collection_facets(request):
+    """
+    Collection counts per habit, exposure, water needs, bloom month, family
+    and garden for the current CollectionFilter parameters.
+    """
+    cache = get_plants_cache()
+    cache_key = get_filter_cache_key("plants:facet-counts", request.GET)
+    content = cache.get(cache_key)
+    if content is not None:
+        return HttpResponse(content, content_type="application/json")
+
+    qs = CollectionFilter(request.GET or None, queryset=Collection.objects.all()).qs
+    total, facets = get_facet_counts(qs)
+
+    response = JsonResponse({"count": total, "facets": facets})
+    cache.set(cache_key, response.content, GEOJSON_CACHE_SECONDS)
+    return response
+
+
+@require_GET
+def in_bloom_today(request):
+    """
+    Ids of the species and collections in bloom today.
+    """
+    return JsonResponse(get_in_bloom_index().as_dict())
+
+
+@require_GET
+def suggest(request):
+    """
+    Typeahead suggestions for species names and collection plant IDs, ranked
+    by trigram word similarity to ?q=.
+    """
+    query = request.GET.get("q", "").strip()
+    limit = min(
+        _coerce_positive_int(request.GET.get("limit"), default=SUGGEST_DEFAULT_LIMIT),
+        SUGGEST_MAX_LIMIT,
+    )
+    if len(query) < SUGGEST_MIN_LENGTH:
+        return JsonResponse({"results": []})
+
+    results = [
+        {
+            "type": "species",
+            "id": row["id"],
+            "label": row["full_name"],
+            "detail": row["vernacular_name"],
+            "url": reverse("plants:species-detail", args=[row["id"]]),
+            "rank": row["rank"],
+        }
+        for row in suggest_species(Species.objects.all(), query, limit)
+    ] + [
+        {
+            "type": "collection",
+            "id": row["id"],
+            "label": row["plant_id"],
+            "detail": row["species__full_name"],
+            "url": reverse("plants:collection-detail", args=[row["id"]]),
+            "rank": row["rank"],
+        }
+        for row in suggest_collections(Collection.objects.all(), query, limit)
+    ]
+    results.sort(key=lambda result: -result["rank"])
+
+    return JsonResponse({"results": results[:limit]})
 
 
 def plant_map_view(request):
@@ -356,19 +710,58 @@ def plant_map_view(request):
     )
 
 
+def _detail_validators(key_parts, last_modified, today_local):
+    """
+    Return the fragment cache key, ETag and Last-Modified timestamp for a plant
+    detail page showing the given parts. Pages say whether the plant is in
+    bloom today, so they are never older than local midnight.
+    """
+    key_parts = tuple(key_parts) + (today_local,)
+    fragment_key = hashlib.sha1(repr(key_parts).encode("utf-8")).hexdigest()
+    midnight = timezone.make_aware(datetime.combine(today_local, time.min))
+    return fragment_key, quote_etag(fragment_key), int(max(last_modified, midnight).timestamp())
+
+
+def _render_detail(request, template_name, context, key_parts, last_modified):
+    """
+    Render a plant detail page, or a 304 if the client's copy is current. The
+    template caches its body under context["fragment_key"], so lazy context
+    values are only evaluated when the fragment has to be rendered.
+    """
+    today_local = timezone.localdate()
+    fragment_key, etag, last_modified = _detail_validators(key_parts, last_modified, today_local)
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        context.update({
+            "fragment_key": fragment_key,
+            "fragment_cache": get_plants_cache_alias(),
+            "fragment_timeout": DETAIL_FRAGMENT_CACHE_SECONDS,
+        })
+        response = render(request, template_name, context)
+
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(last_modified)
+    return response
+
+
 def collection_detail(request, collection_id):
     """
     View for displaying detailed info about a single Collection object.
     """
-    collection = get_object_or_404(Collection, pk=collection_id)
+    collection = get_object_or_404(
+        Collection.objects.select_related("species__genus__family", "garden", "location"),
+        pk=collection_id,
+    )
     mapbox_api_token = getattr(settings, "MAPBOX_API_TOKEN", None)
 
     # Check if there are any BloomEvents associated with the collection
-    today_local = timezone.localdate()
-    in_bloom = collection.bloomevent_set.filter(
-        bloom_start__lte=today_local, bloom_end__gte=today_local
-    ).exists()
-    return render(
+    in_bloom = SimpleLazyObject(
+        lambda: collection.pk in get_in_bloom_index().collection_ids
+    )
+    garden = collection.garden
+    location = collection.location
+    return _render_detail(
         request,
         "plants/collection_detail.html",
         {
@@ -376,7 +769,36 @@ def collection_detail(request, collection_id):
             "in_bloom": in_bloom,
             "mapbox_token": mapbox_api_token,
         },
+        key_parts=(
+            "collection",
+            collection.pk,
+            collection.last_modified,
+            collection.species.last_modified,
+            collection.species.genus.family.name,
+            (garden.area, garden.name, garden.code) if garden else None,
+            (location.latitude, location.longitude) if location else None,
+        ),
+        last_modified=max(collection.last_modified, collection.species.last_modified),
+    )
+
+
+def _get_species_collections_table(request, species):
+    species_collections = Collection.objects.filter(species=species).select_related(
+        "garden"
     )
+    if not species_collections.exists():
+        return None
+
+    collections_table = CollectionTable(species_collections, exclude=("species",))
+    RequestConfig(
+        request,
+        paginate={
+            "per_page": 50,
+            "paginator_class": LazyPaginator,
+            "silent": True,
+        },
+    ).configure(collections_table)
+    return collections_table
 
 
 def species_detail(request, species_id):
@@ -386,38 +808,34 @@ def species_detail(request, species_id):
     species = get_object_or_404(
         Species.objects.select_related("genus__family"), pk=species_id
     )
-    species_images = SpeciesImage.objects.filter(species=species)
-    species_collections = Collection.objects.filter(species=species).select_related(
-        "garden"
-    )
-    collections_table = None
-    if species_collections.exists():
-        collections_table = CollectionTable(
-            species_collections, exclude=("species",)
-        )
-        RequestConfig(
-            request,
-            paginate={
-                "per_page": 50,
-                "paginator_class": LazyPaginator,
-                "silent": True,
-            },
-        ).configure(collections_table)
 
     # Check if there are any BloomEvents associated with the species
-    today_local = timezone.localdate()
-    in_bloom = BloomEvent.objects.filter(
-        species=species, bloom_start__lte=today_local, bloom_end__gte=today_local
-    ).exists()
-    return render(
+    in_bloom = SimpleLazyObject(
+        lambda: species.pk in get_in_bloom_index().species_ids
+    )
+    family = species.genus.family
+    return _render_detail(
         request,
         "plants/species_detail.html",
         {
             "species": species,
             "in_bloom": in_bloom,
-            "images": species_images,
-            "collections_table": collections_table,
+            "images": SpeciesImage.objects.filter(species=species),
+            "collections_table": SimpleLazyObject(
+                lambda: _get_species_collections_table(request, species)
+            ),
         },
+        key_parts=(
+            "species",
+            species.pk,
+            species.last_modified,
+            species.genus.name,
+            family.name,
+            family.vernacular_name,
+            # The collections table pages and sorts by these
+            tuple(request.GET.get(param) for param in ("page", "sort", "per_page")),
+        ),
+        last_modified=species.last_modified,
     )
 
 
@@ -534,6 +952,33 @@ def _coerce_positive_int(value, default=1):
     return value if value > 0 else default
 
 
+def _cursor_url(request, cursor):
+    """
+    The current list URL pointing at another keyset page, or None if there is
+    no such page. An empty cursor is the first page.
+    """
+    if cursor is None:
+        return None
+    params = request.GET.copy()
+    for key in ("cursor", "page", "_hx", "_export"):
+        params.pop(key, None)
+    if cursor:
+        params["cursor"] = cursor
+    return f"{request.path}?{params.urlencode()}" if params else request.path
+
+
+def _filter_params(request):
+    """
+    The canonical filter params of a list request, without those that only
+    pick the page, order or layout, so that every page of a filter shares
+    one cached count.
+    """
+    params = clean_querydict(request.GET).copy()
+    for key in ("cursor", "page", "sort", "mode", "_hx", "_export"):
+        params.pop(key, None)
+    return params
+
+
 def collection_results(request):
     # HTMX detection
     is_htmx = (
@@ -577,66 +1022,18 @@ def collection_results(request):
         return render(request, "plants/collection_map.html", context)
 
     export_format = request.GET.get("_export", None)
+    if export_format in STREAMING_EXPORT_FORMATS:
+        return export_response(
+            export_format,
+            filtered_qs,
+            CollectionTable,
+            f"collections.{export_format}",
+        )
     if TableExport.is_valid_format(export_format):
         export_table = CollectionTable(filtered_qs)
         exporter = TableExport(export_format, export_table)
         return exporter.response(f"collections.{export_format}")
 
-    table = CollectionTable(filtered_qs)
-
-    per_page = 50
-    requested_page = _coerce_positive_int(request.GET.get("page"), default=1)
-
-    RequestConfig(
-        request,
-        paginate={
-            "per_page": per_page,
-            "paginator_class": LazyPaginator,
-            "silent": True,
-        },
-    ).configure(table)
-
-    # Use the actual resolved page number if pagination succeeded
-    page_number = requested_page
-    if getattr(table, "page", None) is not None:
-        try:
-            page_number = table.page.number
-        except Exception:
-            page_number = requested_page
-
-    try:
-        current_page_count = (
-            len(table.rows) if getattr(table, "rows", None) is not None else 0
-        )
-    except Exception:
-        current_page_count = 0
-
-    paginator = getattr(getattr(table, "page", None), "paginator", None)
-
-    # LazyPaginator does not support count()
-    if isinstance(paginator, LazyPaginator):
-        table_total = None
-        total_known = False
-    else:
-        try:
-            table_total = filtered_qs.count()
-            total_known = True
-        except Exception:
-            table_total = None
-            total_known = False
-
-    if current_page_count == 0:
-        table_start = 0
-        table_end = 0
-        if total_known and table_total is None:
-            table_total = 0
-    else:
-        table_start = (page_number - 1) * per_page + 1
-        if total_known and isinstance(table_total, int):
-            table_end = min(table_start + current_page_count - 1, table_total)
-        else:
-            table_end = table_start + current_page_count - 1
-
     querystring = ""
     if collection_filter.form.is_bound and collection_filter.form.is_valid():
         params = {}
@@ -651,6 +1048,48 @@ def collection_results(request):
 
         querystring = urlencode(params, doseq=True)
 
+    per_page = 50
+    rows_qs = filtered_qs.select_related("species", "garden")
+    next_url = previous_url = None
+    if request.GET.get("sort"):
+        # Column sorting can order by anything, which cursors can't follow,
+        # so sorted lists page by OFFSET
+        table = CollectionTable(rows_qs)
+        RequestConfig(
+            request,
+            paginate={
+                "per_page": per_page,
+                "paginator_class": LazyPaginator,
+                "silent": True,
+            },
+        ).configure(table)
+        page_start = (table.page.number - 1) * per_page
+        page_rows = len(table.page.object_list)
+    else:
+        try:
+            page = paginate_keyset(rows_qs, request.GET.get("cursor"), per_page)
+        except InvalidCursor:
+            logger.warning(
+                "Invalid cursor param from %s", request.META.get("REMOTE_ADDR")
+            )
+            page = paginate_keyset(rows_qs, None, per_page)
+        table = CollectionTable(page.object_list)
+        page_start = page.start
+        page_rows = len(page.object_list)
+        next_url = _cursor_url(request, page.next_cursor)
+        previous_url = _cursor_url(request, page.previous_cursor)
+
+    if page_rows:
+        table_start = page_start + 1
+        table_end = page_start + page_rows
+    else:
+        table_start = 0
+        table_end = 0
+
+    table_total, total_approximate = get_approximate_count(filtered_qs, _filter_params(request))
+    # Planner estimates and cached counts may trail the rows actually shown
+    table_total = max(table_total, table_end)
+
     context.update(
         {
             "table": table,
@@ -658,8 +1097,11 @@ def collection_results(request):
             "table_start": table_start,
             "table_end": table_end,
             "table_total": table_total,
-            "total_known": total_known,
+            "total_known": True,
+            "total_approximate": total_approximate,
             "per_page": per_page,
+            "next_url": next_url,
+            "previous_url": previous_url,
         }
     )
 
@@ -714,6 +1156,10 @@ def top_trees(request):
 
     # Export handling
     export_format = request.GET.get("_export", None)
+    if export_format in STREAMING_EXPORT_FORMATS:
+        return export_response(
+            export_format, f.qs, TopTreesSpeciesTable, f"top_trees.{export_format}"
+        )
     if TableExport.is_valid_format(export_format):
         export_table = TopTreesSpeciesTable(f.qs)
         exporter = TableExport(export_format, export_table)
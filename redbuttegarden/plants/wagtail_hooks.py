@@ -3,6 +3,7 @@ from django.urls import path
 from wagtail import hooks
 from wagtail.admin.rich_text.converters.editor_html import LinkTypeRule
 from wagtail.admin.rich_text.editors.draftail import features as draftail_features
+from wagtail.fields import RichTextField, StreamField
 from wagtail.rich_text import features as rich_text_features_registry
 from wagtail.snippets.models import register_snippet
 from wagtail.snippets.views.snippets import SnippetViewSet, SnippetViewSetGroup
@@ -15,6 +16,7 @@ from .chooser import (
 )
 from .forms import BloomEventSnippetForm
 from .models import Collection, Species, Genus, Family, BloomEvent
+from .renditions import schedule_renditions
 from .rich_text import (
     CollectionEditorHTMLLinkHandler,
     CollectionLinkElementHandler,
@@ -23,6 +25,7 @@ from .rich_text import (
     SpeciesLinkElementHandler,
     SpeciesLinkHandler,
     plant_link_entity,
+    prefetch_plant_link_urls,
 )
 
 class FamilyAdmin(SnippetViewSet):
@@ -203,6 +206,36 @@ if rich_text_features_registry.has_scanned_for_features:
     _register_plant_link_features(rich_text_features_registry)
 
 
+def _prefetch_page_plant_links(page):
+    prefetch_plant_link_urls(
+        "".join(
+            field.value_to_string(page)
+            for field in page._meta.concrete_fields
+            if isinstance(field, (RichTextField, StreamField))
+        )
+    )
+
+
+@hooks.register("before_edit_page")
+def prefetch_plant_links_for_page_editor(request, page):
+    # The editor converts stored links one at a time; resolve them all up front
+    _prefetch_page_plant_links(page)
+
+
+@hooks.register("before_serve_page")
+def prefetch_plant_links_for_page(page, request, serve_args, serve_kwargs):
+    # Each rich text block expands its own links; resolve the whole page's at once
+    _prefetch_page_plant_links(page)
+
+
+@hooks.register("after_create_snippet")
+@hooks.register("after_edit_snippet")
+def render_species_images_after_edit(request, instance):
+    # Images added in the Species Images panel; existing renditions are skipped
+    if isinstance(instance, Species):
+        schedule_renditions(instance.species_images.values_list("image_id", flat=True))
+
+
 @hooks.register("insert_global_admin_js")
 def include_rich_text_link_chooser_js():
     return format_html(
@@ -75,6 +75,7 @@ INSTALLED_APPS = [
     "django.contrib.auth",
     "django.contrib.contenttypes",
     "django.contrib.humanize",
+    "django.contrib.postgres",
     "django.contrib.sessions",
     "django.contrib.sites",
     "django.contrib.sitemaps",
@@ -128,6 +129,20 @@ TEMPLATES = [
 
 WSGI_APPLICATION = "redbuttegarden.wsgi.application"
 
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    # Plant map data and the versions that invalidate it must be seen by every
+    # Lambda, so they live in the database. The table is created by a plants migration
+    "plants": {
+        "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+        "LOCATION": "plants_cache",
+        "OPTIONS": {"MAX_ENTRIES": 100000},
+    },
+}
+PLANTS_CACHE_ALIAS = "plants"
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.0/ref/settings/#auth-password-validators
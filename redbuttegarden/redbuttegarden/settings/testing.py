@@ -19,6 +19,7 @@ CACHES = {
         'BACKEND': 'django.core.cache.backends.dummy.DummyCache'
     }
 }
+PLANTS_CACHE_ALIAS = 'default'
 
 SECRET_KEY = 'Testing'
 ALLOWED_HOSTS = ['localhost', '0.0.0.0']
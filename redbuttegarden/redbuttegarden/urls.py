@@ -16,24 +16,13 @@ from drf_spectacular.views import (
 from wagtail.admin import urls as wagtailadmin_urls
 
 from wagtail.contrib.sitemaps import views as wagtail_sitemap_views
-from wagtail.contrib.sitemaps.sitemap_generator import Sitemap as WagtailSitemap
 from wagtail import urls as wagtail_urls
 from wagtail.documents import urls as wagtaildocs_urls
 from wagtail.models import Site
 
 from search import views as search_views
-from sitemaps.sitemaps import (
-    PlantsStaticViewsSitemap,
-    CollectionDetailSitemap,
-    SpeciesDetailSitemap,
-)
-
-SITEMAPS = {
-    "wagtail": WagtailSitemap,
-    "plants-static": PlantsStaticViewsSitemap,
-    "collections": CollectionDetailSitemap,
-    "species": SpeciesDetailSitemap,
-}
+from sitemaps.publish import published_sitemap_response
+from sitemaps.sitemaps import SITEMAPS
 
 CACHE_SECONDS = 60 * 60  # 1 hour
 
@@ -54,6 +43,10 @@ def _force_default_site(request):
 @cache_page(CACHE_SECONDS)
 def sitemap_index(request):
     _force_default_site(request)
+    # Files written by the generate_sitemaps command; rendered here only until the first run
+    response = published_sitemap_response(request)
+    if response is not None:
+        return response
     return wagtail_sitemap_views.index(
         request,
         sitemaps=SITEMAPS,
@@ -64,6 +57,9 @@ def sitemap_index(request):
 @cache_page(CACHE_SECONDS)
 def sitemap_section(request, section):
     _force_default_site(request)
+    response = published_sitemap_response(request, section)
+    if response is not None:
+        return response
     return wagtail_sitemap_views.sitemap(request, sitemaps=SITEMAPS, section=section)
 
 
@@ -0,0 +1,211 @@
+"""
+Pre-generated sitemaps in the default storage backend.
+
+The generate_sitemaps command renders the sitemap index and every page of
+every section to gzipped XML under SITEMAP_STORAGE_PREFIX, named with the
+hash of their content, and records them in a manifest. A section is only
+rendered again when its watermark (see the get_watermark methods in
+sitemaps.sitemaps) has moved since it was published.
+
+The sitemap views answer from the published files, so a crawler request
+reads one file rather than walking the plant tables. With
+SITEMAP_REDIRECT_TO_STORAGE they redirect to the file's storage URL instead.
+"""
+import gzip
+import hashlib
+import re
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import storages
+from django.http import Http404, HttpResponse, HttpResponseRedirect
+from django.test import RequestFactory
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.cache import patch_vary_headers
+from wagtail.contrib.sitemaps import views as wagtail_sitemap_views
+from wagtail.contrib.sitemaps.views import prepare_sitemaps
+from wagtail.models import Site
+
+from plants.snapshots import read_json_file, replace_json_file
+
+from .sitemaps import SITEMAPS
+
+MANIFEST_NAME = "manifest.json"
+SITEMAP_URL_NAME = "sitemap-section"
+ROBOTS_TAG = "noindex, noodp, noarchive"  # as set by the django.contrib.sitemaps views
+
+ACCEPTS_GZIP = re.compile(r"\bgzip\b")
+
+
+def get_sitemap_storage():
+    return storages["default"]
+
+
+def get_sitemap_prefix():
+    return getattr(settings, "SITEMAP_STORAGE_PREFIX", "sitemaps").strip("/")
+
+
+def get_sitemap_protocol():
+    return getattr(settings, "SITEMAP_PROTOCOL", "https")
+
+
+def get_manifest_name():
+    return f"{get_sitemap_prefix()}/{MANIFEST_NAME}"
+
+
+def read_manifest(storage=None):
+    return read_json_file(get_manifest_name(), storage or get_sitemap_storage())
+
+
+def write_manifest(manifest, storage=None):
+    # Never leaves a moment without a readable manifest, which would send
+    # crawler requests to a live render
+    return replace_json_file(get_manifest_name(), manifest, storage or get_sitemap_storage())
+
+
+def save_sitemap_file(basename, response, storage=None):
+    """
+    Save a rendered sitemap response to storage as
+    <prefix>/<basename>.<hash>.xml.gz, unless that content is already there.
+    Returns a manifest entry for the file.
+    """
+    storage = storage or get_sitemap_storage()
+    content = response.content
+    content_hash = hashlib.sha256(content).hexdigest()[:16]
+    name = f"{get_sitemap_prefix()}/{basename}.{content_hash}.xml.gz"
+    if not storage.exists(name):
+        name = storage.save(name, ContentFile(gzip.compress(content, mtime=0), name=name))
+    return {
+        "name": name,
+        "url": storage.url(name),
+        "last_modified": response.get("Last-Modified"),
+    }
+
+
+def build_sitemap_request(site, protocol, path="/sitemap.xml", page=None):
+    """
+    A request for the default site's hostname, as the sitemap views get.
+    """
+    request = RequestFactory().get(
+        path,
+        {"p": page} if page else {},
+        HTTP_HOST=site.hostname,
+        secure=protocol == "https",
+    )
+    request._wagtail_site = site
+    request.site = site
+    return request
+
+
+def _render_index(site, protocol):
+    request = build_sitemap_request(site, protocol)
+    response = wagtail_sitemap_views.index(
+        request, sitemaps=SITEMAPS, sitemap_url_name=SITEMAP_URL_NAME
+    )
+    return response.render()
+
+
+def _render_section_page(site, protocol, section, page):
+    path = reverse(SITEMAP_URL_NAME, kwargs={"section": section})
+    request = build_sitemap_request(site, protocol, path, page)
+    response = wagtail_sitemap_views.sitemap(request, sitemaps=SITEMAPS, section=section)
+    return response.render()
+
+
+def publish_sitemaps(force=False, storage=None):
+    """
+    Render and save the sections whose watermark moved (every section with
+    force) and the index if anything changed. Returns the manifest and the
+    names of the sections that were rendered.
+    """
+    storage = storage or get_sitemap_storage()
+    site = Site.objects.get(is_default_site=True)
+    protocol = get_sitemap_protocol()
+    manifest = read_manifest(storage) or {}
+    if (manifest.get("hostname"), manifest.get("protocol")) != (site.hostname, protocol):
+        force = True  # every URL in the published files has changed
+
+    published = manifest.get("sections", {})
+    sections = {} if force else dict(published)
+    rendered = []
+    request = build_sitemap_request(site, protocol)
+    for section, sitemap in prepare_sitemaps(request, SITEMAPS).items():
+        if callable(sitemap):
+            sitemap = sitemap()  # as the django.contrib.sitemaps views do
+        # Taken before rendering; anything saved meanwhile moves it again for the next run
+        watermark = sitemap.get_watermark()
+        if section in sections and sections[section]["watermark"] == watermark:
+            continue
+
+        pages = [
+            save_sitemap_file(
+                f"{section}-{page}", _render_section_page(site, protocol, section, page), storage
+            )
+            for page in range(1, sitemap.paginator.num_pages + 1)
+        ]
+        sections[section] = {
+            "watermark": watermark,
+            "generated_at": timezone.now().isoformat(),
+            "pages": pages,
+        }
+        rendered.append(section)
+
+    # Drop sections that are no longer served
+    sections = {section: sections[section] for section in SITEMAPS if section in sections}
+    index = manifest.get("index")
+    if rendered or index is None or sections.keys() != published.keys():
+        index = save_sitemap_file("index", _render_index(site, protocol), storage)
+
+    manifest = {
+        "hostname": site.hostname,
+        "protocol": protocol,
+        "index": index,
+        "sections": sections,
+    }
+    write_manifest(manifest, storage)
+    return manifest, rendered
+
+
+def _get_published_entry(manifest, request, section):
+    if section is None:
+        return manifest.get("index")
+
+    pages = manifest.get("sections", {}).get(section, {}).get("pages")
+    if not pages:
+        return None
+    page = request.GET.get("p", "1")
+    if not page.isdigit():
+        raise Http404(f"No page '{page}'")
+    if not 1 <= int(page) <= len(pages):
+        raise Http404(f"Page {page} empty")
+    return pages[int(page) - 1]
+
+
+def published_sitemap_response(request, section=None):
+    """
+    Response for the published sitemap index (section None) or page of a
+    section, or None if it has not been published yet.
+    """
+    storage = get_sitemap_storage()
+    manifest = read_manifest(storage)
+    entry = _get_published_entry(manifest, request, section) if manifest else None
+    if entry is None:
+        return None
+
+    if getattr(settings, "SITEMAP_REDIRECT_TO_STORAGE", False):
+        response = HttpResponseRedirect(entry["url"])
+    else:
+        with storage.open(entry["name"], "rb") as f:
+            content = f.read()
+        if ACCEPTS_GZIP.search(request.headers.get("Accept-Encoding", "")):
+            response = HttpResponse(content, content_type="application/xml")
+            response["Content-Encoding"] = "gzip"
+        else:
+            response = HttpResponse(gzip.decompress(content), content_type="application/xml")
+        patch_vary_headers(response, ("Accept-Encoding",))
+        if entry["last_modified"]:
+            response["Last-Modified"] = entry["last_modified"]
+
+    response["X-Robots-Tag"] = ROBOTS_TAG
+    return response
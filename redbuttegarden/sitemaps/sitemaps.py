@@ -1,9 +1,31 @@
 from django.contrib.sitemaps import Sitemap
+from django.db.models import Count, Max
 from django.urls import reverse
+from wagtail.contrib.sitemaps.sitemap_generator import Sitemap as WagtailSitemap
+from wagtail.models import Page
 
 from plants.models import Collection, Species
 
 
+def _queryset_watermark(queryset, *fields):
+    """
+    A string that changes whenever a row of queryset is added, deleted or
+    has one of the timestamp fields moved on.
+    """
+    stats = queryset.aggregate(count=Count("id"), **{field: Max(field) for field in fields})
+    parts = [str(stats["count"])] + [
+        stats[field].isoformat() if stats[field] else "" for field in fields
+    ]
+    return "|".join(parts)
+
+
+class PageSitemap(WagtailSitemap):
+    def get_watermark(self):
+        return _queryset_watermark(
+            Page.objects.live().public(), "last_published_at", "latest_revision_created_at"
+        )
+
+
 class PlantsStaticViewsSitemap(Sitemap):
     changefreq = "weekly"
     priority = 0.5
@@ -18,6 +40,9 @@ class PlantsStaticViewsSitemap(Sitemap):
     def location(self, item):
         return reverse(item)
 
+    def get_watermark(self):
+        return "|".join(self.items())
+
 
 class CollectionDetailSitemap(Sitemap):
     limit = 5000
@@ -33,6 +58,9 @@ class CollectionDetailSitemap(Sitemap):
     def lastmod(self, obj):
         return obj.last_modified
 
+    def get_watermark(self):
+        return _queryset_watermark(Collection.objects.all(), "last_modified")
+
 
 class SpeciesDetailSitemap(Sitemap):
     limit = 5000
@@ -44,3 +72,14 @@ class SpeciesDetailSitemap(Sitemap):
 
     def location(self, obj):
         return reverse("plants:species-detail", kwargs={"species_id": obj.pk})
+
+    def get_watermark(self):
+        return _queryset_watermark(Species.objects.all(), "last_modified")
+
+
+SITEMAPS = {
+    "wagtail": PageSitemap,
+    "plants-static": PlantsStaticViewsSitemap,
+    "collections": CollectionDetailSitemap,
+    "species": SpeciesDetailSitemap,
+}
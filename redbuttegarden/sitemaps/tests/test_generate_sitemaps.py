@@ -0,0 +1,105 @@
+import gzip
+
+import pytest
+from django.core.files.storage import storages
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from wagtail.models import Site
+
+from plants.models import Collection
+from plants.tests.utils import get_collection
+from sitemaps.publish import publish_sitemaps, read_manifest
+
+
+@pytest.fixture
+def sitemap_storage(settings, tmp_path):
+    settings.STORAGES = {
+        **settings.STORAGES,
+        "default": {
+            "BACKEND": "django.core.files.storage.FileSystemStorage",
+            "OPTIONS": {"location": str(tmp_path), "base_url": "/media/"},
+        },
+    }
+    return storages["default"]
+
+
+@pytest.fixture
+def host():
+    return Site.objects.get(is_default_site=True).hostname
+
+
+@pytest.mark.django_db
+def test_only_changed_sections_are_rendered_again(sitemap_storage):
+    collection = get_collection(plant_id="MAP-1")
+
+    manifest, rendered = publish_sitemaps()
+    assert rendered == ["wagtail", "plants-static", "collections", "species"]
+    index = manifest["index"]
+
+    assert publish_sitemaps()[1] == []
+    assert read_manifest()["index"] == index
+
+    Collection.objects.filter(pk=collection.pk).update(last_modified=timezone.now())
+    manifest, rendered = publish_sitemaps()
+    assert rendered == ["collections"]
+    page = manifest["sections"]["collections"]["pages"][0]
+    with sitemap_storage.open(page["name"], "rb") as f:
+        content = gzip.decompress(f.read()).decode()
+    assert reverse("plants:collection-detail", args=[collection.pk]) in content
+
+
+@pytest.mark.django_db
+def test_sitemap_views_serve_published_files(client, sitemap_storage, host):
+    get_collection(plant_id="MAP-1")
+    call_command("generate_sitemaps")
+
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(reverse("sitemap-section", args=["collections"]), HTTP_HOST=host)
+    assert response.status_code == 200
+    assert "/plants/collection/" in response.content.decode()
+    assert not any("plants_" in query["sql"] for query in queries)
+
+    index = client.get(reverse("sitemap-index"), HTTP_HOST=host, HTTP_ACCEPT_ENCODING="gzip")
+    assert index["Content-Encoding"] == "gzip"
+    assert b"sitemap-species.xml" in gzip.decompress(index.content)
+
+    missing = client.get(reverse("sitemap-section", args=["collections"]), {"p": "2"}, HTTP_HOST=host)
+    assert missing.status_code == 404
+
+
+@pytest.mark.django_db
+def test_sitemap_views_can_redirect_to_storage(client, sitemap_storage, host, settings):
+    settings.SITEMAP_REDIRECT_TO_STORAGE = True
+    manifest, _ = publish_sitemaps()
+
+    response = client.get(reverse("sitemap-section", args=["species"]), HTTP_HOST=host)
+
+    assert response.status_code == 302
+    assert response["Location"] == manifest["sections"]["species"]["pages"][0]["url"]
+
+
+@pytest.mark.django_db
+def test_sitemap_views_render_until_published(client, sitemap_storage, host):
+    get_collection(plant_id="MAP-1")
+
+    response = client.get(reverse("sitemap-section", args=["collections"]), HTTP_HOST=host)
+
+    assert response.status_code == 200
+    assert "/plants/collection/" in response.content.decode()
+
+
+@pytest.mark.django_db
+def test_published_files_are_served_while_the_manifest_is_replaced(client, sitemap_storage, host):
+    get_collection(plant_id="MAP-1")
+    publish_sitemaps()
+    # As between the delete and the save of the next manifest
+    sitemap_storage.delete("sitemaps/manifest.json")
+
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(reverse("sitemap-section", args=["collections"]), HTTP_HOST=host)
+    assert response.status_code == 200
+    assert "/plants/collection/" in response.content.decode()
+    assert not any("plants_" in query["sql"] for query in queries)